@@ -1,7 +1,12 @@
 import streamlit as st
-import random
 import datetime
-import json
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import types
+import uuid
 
 # Page configuration
 st.set_page_config(
@@ -10,600 +15,779 @@ st.set_page_config(
     layout="wide"
 )
 
-# Medical knowledge base (rule-based - no ML dependencies)
-MEDICAL_KNOWLEDGE = {
-    'high_risk': {
-        'symptoms': ['chest pain', 'shortness of breath', 'severe bleeding', 'unconscious', 'difficulty breathing',
-                     'sudden numbness'],
-        'conditions': ['Heart Attack', 'Stroke', 'Severe Trauma', 'Pulmonary Embolism', 'Cardiac Arrest'],
-        'recommendation': {
-            'action': "🚨 SEEK EMERGENCY CARE IMMEDIATELY",
-            'advice': "Go to the nearest hospital emergency room or call emergency services (108/112) immediately!",
-            'steps': [
-                "Call emergency number (108/112)",
-                "Do not drive yourself",
-                "Keep calm and wait for help",
-                "Do not give any food or water"
-            ]
-        }
-    },
-    'medium_risk': {
-        'symptoms': ['high fever', 'severe pain', 'vomiting blood', 'head injury', 'persistent vomiting', 'burn',
-                     'deep cut'],
-        'conditions': ['Severe Infection', 'Internal Bleeding', 'Concussion', 'Kidney Infection', 'Fracture'],
-        'recommendation': {
-            'action': "🟡 CONSULT A DOCTOR SOON",
-            'advice': "Schedule an appointment with your doctor within 24 hours or visit urgent care.",
-            'steps': [
-                "Rest and stay hydrated",
-                "Monitor symptoms closely",
-                "Avoid self-medication",
-                "Keep the affected area clean"
-            ]
-        }
-    },
-    'low_risk': {
-        'symptoms': ['cough', 'mild fever', 'headache', 'runny nose', 'sore throat', 'muscle pain', 'sneezing',
-                     'mild rash'],
-        'conditions': ['Common Cold', 'Flu', 'Allergies', 'Muscle Strain', 'Seasonal Illness'],
-        'recommendation': {
-            'action': "🟢 SELF-CARE AT HOME",
-            'advice': "Your symptoms suggest a minor condition that can be managed at home.",
-            'steps': [
-                "Get plenty of rest",
-                "Drink fluids regularly",
-                "Use over-the-counter remedies if appropriate",
-                "Monitor for worsening symptoms"
-            ]
-        }
-    }
-}
 
-# Home remedies database
-HOME_REMEDIES = {
-    'fever': "Rest, drink plenty of fluids, use cool compresses, take paracetamol if needed",
-    'cough': "Honey with warm water, steam inhalation, stay hydrated, avoid cold drinks",
-    'headache': "Rest in a dark room, cold compress on forehead, stay hydrated, massage temples",
-    'sore throat': "Warm salt water gargle, honey lemon tea, stay hydrated, avoid spicy food",
-    'muscle pain': "Rest the affected area, gentle stretching, warm compress, over-the-counter pain relief",
-    'runny nose': "Steam inhalation, stay hydrated, use saline nasal spray, rest",
-    'rash': "Keep area clean and dry, avoid scratching, use calamine lotion, cool compress"
-}
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+# Starting point for the nearest-hospital search (centre of the bundled sample data)
+DEFAULT_LOCATION = tuple(
+    float(part) for part in os.environ.get('MEDIGUARD_DEFAULT_LOCATION', '28.6139,77.2090').split(','))
+
+# Turns kept in memory per session and turns shown per page in the chat
+CHAT_HISTORY_CAPACITY = int(os.environ.get('MEDIGUARD_CHAT_CAPACITY', 200))
+CHAT_PAGE_SIZE = 20
 
-# First Aid Instructions
-FIRST_AID = {
-    'bleeding': "Apply direct pressure with clean cloth, elevate injury, don't remove embedded objects",
-    'burn': "Cool with running water for 10-20 mins, cover with sterile dressing, don't apply ice",
-    'fracture': "Immobilize the area, apply ice pack, don't try to realign bones",
-    'choking': "Perform Heimlich maneuver, call emergency if not resolved quickly"
-}
 
-# AI Assistant Responses
-AI_ASSISTANT_RESPONSES = {
-    'greeting': [
-        "Hello! I'm your MediGuard AI assistant. How can I help you today? 😊",
-        "Hi there! I'm here to assist with your health questions. What's on your mind? 🩺",
-        "Welcome! I'm your AI health companion. How can I support you today? 🌟"
-    ],
-    'symptoms': {
-        'fever': "For fever: Rest well, drink plenty of fluids, use cool compresses. If fever persists over 102°F or lasts more than 3 days, consult a doctor.",
-        'cough': "For cough: Try honey with warm water, steam inhalation, and stay hydrated. Avoid cold drinks and smoking.",
-        'headache': "For headache: Rest in a quiet, dark room. Apply cold compress to forehead. Stay hydrated and consider over-the-counter pain relief if appropriate.",
-        'pain': "For pain: Rest the affected area. You can use over-the-counter pain relief as directed. If pain is severe or persistent, see a doctor."
-    },
-    'general_advice': [
-        "Remember to stay hydrated and get adequate rest! 💧",
-        "Regular hand washing is one of the best ways to prevent illness! 🧼",
-        "Don't forget to practice good sleep hygiene for better health! 😴",
-        "A balanced diet and regular exercise are key to good health! 🥗"
-    ],
-    'emergency': "I've detected emergency keywords. Please call emergency services (108/112) immediately for life-threatening situations! 🚨",
-    'follow_up': "How are you feeling now? Would you like me to suggest some home care tips?",
-    'unknown': "I'm still learning about that specific concern. For accurate medical advice, please consult with a healthcare professional. Is there anything else I can help with?"
-}
+@st.cache_resource
+def get_engine():
+    """The default-locale engine, one per process, shared read-only by every session."""
+    # The engine is imported here so the UI module itself stays light
+    from mediguard import metrics
+    from mediguard.locales import get_locale_packs
+
+    metrics.start_exporters()
+    packs = get_locale_packs()
+    engine = packs.engine()
+    # Compile or load the knowledge snapshot now rather than in the first
+    # session's rerun; other locales load when first chosen. Later edits
+    # are picked up by the watchers
+    engine.knowledge
+    packs.watch()
+    return engine
+
+
+def session_engine():
+    """The shared engine for this session's language."""
+    from mediguard.locales import get_locale_packs, language_name
+
+    packs = get_locale_packs()
+    available = packs.available()
+    if st.session_state.get('locale') not in available:
+        # First visit, or the pack was removed: follow the browser language
+        st.session_state.locale = packs.resolve(st.context.locale)
+    locale = st.sidebar.selectbox("🌐 Language", available, format_func=language_name, key="locale")
+    return packs.engine(locale)
 
 
-class MediGuardAI:
-    def assess_symptoms(self, user_symptoms):
-        user_symptoms_lower = [symptom.lower() for symptom in user_symptoms]
+@st.cache_resource
+def load_assets():
+    """Static render assets, built once per process and never mutated."""
+    with open(os.path.join(ASSETS_DIR, 'mediguard.css'), encoding='utf-8') as handle:
+        css = f"<style>\n{handle.read()}</style>"
+    return types.MappingProxyType({
+        'css': css,
+        'quick_symptoms': (
+            "Fever", "Cough", "Headache", "Chest Pain",
+            "Shortness of Breath", "Dizziness", "Nausea", "Sore Throat",
+            "Muscle Pain", "Runny Nose", "Fatigue", "Vomiting",
+            "Rash", "Abdominal Pain", "Chills", "Sneezing",
+        ),
+        'risk_classes': types.MappingProxyType({
+            'high_risk': 'risk-high',
+            'medium_risk': 'risk-medium',
+            'low_risk': 'risk-low',
+        }),
+        'emergency_contacts': (
+            ("National Emergency", "112"),
+            ("Ambulance", "108"),
+            ("Police", "100"),
+            ("Fire", "101"),
+            ("Poison Control", "1800-111-111"),
+        ),
+    })
 
-        # Check risk levels
-        for risk_level in ['high_risk', 'medium_risk', 'low_risk']:
-            for symptom in MEDICAL_KNOWLEDGE[risk_level]['symptoms']:
-                if symptom in ' '.join(user_symptoms_lower):
-                    condition = random.choice(MEDICAL_KNOWLEDGE[risk_level]['conditions'])
-                    return risk_level, condition, MEDICAL_KNOWLEDGE[risk_level]['recommendation']
 
-        # Default to low risk
-        return 'low_risk', 'General Discomfort', MEDICAL_KNOWLEDGE['low_risk']['recommendation']
+@st.cache_resource
+def get_tracker_analytics():
+    """Per-profile tracker analytics, shared by sessions and updated incrementally."""
+    from mediguard.analytics import AnalyticsCache
 
-    def chat_response(self, user_message):
-        user_message_lower = user_message.lower()
+    return AnalyticsCache()
 
-        # Emergency detection
-        emergency_keywords = ['heart attack', 'stroke', 'dying', 'emergency', 'chest pain', 'can\'t breathe',
-                              'unconscious']
-        if any(keyword in user_message_lower for keyword in emergency_keywords):
-            return AI_ASSISTANT_RESPONSES['emergency']
 
-        # Symptom-specific responses
-        for symptom, response in AI_ASSISTANT_RESPONSES['symptoms'].items():
-            if symptom in user_message_lower:
-                return response + " " + random.choice(AI_ASSISTANT_RESPONSES['general_advice'])
+@st.cache_data(ttl=30, show_spinner=False)
+def engine_footprint(_engine, knowledge_version):
+    # Walking the engine is not free; refresh at most every 30 s per version
+    return _engine.memory_footprint()
 
-        # Greeting detection
-        greeting_keywords = ['hello', 'hi', 'hey', 'start', 'help']
-        if any(keyword in user_message_lower for keyword in greeting_keywords):
-            return random.choice(AI_ASSISTANT_RESPONSES['greeting'])
 
-        # General health questions
-        health_keywords = ['advice', 'tip', 'suggest', 'recommend']
-        if any(keyword in user_message_lower for keyword in health_keywords):
-            return random.choice(AI_ASSISTANT_RESPONSES['general_advice'])
+# The session manager's dict for the run in progress; see session_data()
+_run_state = threading.local()
 
-        # Default response
-        return AI_ASSISTANT_RESPONSES['unknown']
+
+def session_data():
+    """This session's own state (chat history, timings), checked out for the current run.
+
+    It lives in the session manager rather than in ``st.session_state`` so
+    idle sessions can be spilled to disk under memory pressure. Widget
+    callbacks run before the checkout and must keep to ``st.session_state``.
+    """
+    return _run_state.data
+
+
+def new_chat_history(greeting):
+    from mediguard.history import ChatHistory
+
+    # Evicted turns go to a per-session JSONL file when a spill dir is set
+    spill_dir = os.environ.get('MEDIGUARD_CHAT_SPILL_DIR')
+    spill_path = os.path.join(spill_dir, f"{st.session_state.session_id}.jsonl") if spill_dir else None
+    history = ChatHistory(CHAT_HISTORY_CAPACITY, spill_path)
+    history.append("assistant", greeting)
+    return history
 
 
 def initialize_session():
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = [
-            {"role": "assistant",
-             "message": "👋 Hello! I'm your MediGuard AI assistant. I can help with health questions, symptom advice, and general wellness tips. How can I assist you today?"}
-        ]
+    data = session_data()
+    if 'chat_history' not in data:
+        data['chat_history'] = new_chat_history(
+            "👋 Hello! I'm your MediGuard AI assistant. I can help with health questions, symptom advice, "
+            "and general wellness tips. How can I assist you today?")
+    if 'chat_visible' not in data:
+        data['chat_visible'] = CHAT_PAGE_SIZE
     if 'current_input' not in st.session_state:
         st.session_state.current_input = ""
 
 
 def add_to_chat(role, message):
-    st.session_state.chat_history.append({"role": role, "message": message})
+    data = session_data()
+    data['chat_history'].append(role, message)
+    # Snap back to the latest page whenever the conversation moves on
+    data['chat_visible'] = CHAT_PAGE_SIZE
 
 
-def main():
-    # Initialize the bot and session
-    medi_guard = MediGuardAI()
-    initialize_session()
+def chat_seed():
+    # Session and turn number: replies can be replayed for an audit, and two
+    # sessions asking the same thing still see varied advice
+    return f"{st.session_state.session_id}:{session_data()['chat_history'].total}"
 
-    # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .main-header {
-        font-size: 3rem;
-        color: #2E86AB;
-        text-align: center;
-        margin-bottom: 1rem;
-        font-weight: bold;
-    }
-    .sub-header {
-        font-size: 1.5rem;
-        color: #A23B72;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .risk-high {
-        background-color: #ffcccc;
-        padding: 25px;
-        border-radius: 15px;
-        border-left: 8px solid #ff0000;
-        margin: 10px 0;
-    }
-    .risk-medium {
-        background-color: #fff3cd;
-        padding: 25px;
-        border-radius: 15px;
-        border-left: 8px solid #ffc107;
-        margin: 10px 0;
-    }
-    .risk-low {
-        background-color: #d4edda;
-        padding: 25px;
-        border-radius: 15px;
-        border-left: 8px solid #28a745;
-        margin: 10px 0;
-    }
-    .feature-card {
-        background-color: #f8f9fa;
-        padding: 20px;
-        border-radius: 10px;
-        border: 2px solid #e9ecef;
-        margin: 10px 0;
-    }
-    .chat-container {
-        background-color: #f8f9fa;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        max-height: 400px;
-        overflow-y: auto;
-        border: 2px solid #e9ecef;
-    }
-    .user-message {
-        background-color: #007bff;
-        color: white;
-        padding: 12px 16px;
-        border-radius: 18px;
-        margin: 8px 0;
-        text-align: right;
-        max-width: 80%;
-        margin-left: auto;
-        word-wrap: break-word;
-    }
-    .assistant-message {
-        background-color: #e9ecef;
-        color: #333;
-        padding: 12px 16px;
-        border-radius: 18px;
-        margin: 8px 0;
-        text-align: left;
-        max-width: 80%;
-        word-wrap: break-word;
-        border: 1px solid #dee2e6;
-    }
-    .quick-button {
-        margin: 5px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
 
-    # Header Section
-    st.markdown('<h1 class="main-header">🛡️ MediGuard AI</h1>', unsafe_allow_html=True)
-    st.markdown('<h2 class="sub-header">Your Intelligent Health Companion & Emergency Response System</h2>',
-                unsafe_allow_html=True)
+def audit(event, **fields):
+    # Only queues the event; the audit log's own thread does the file I/O
+    from mediguard.audit import get_audit_log
 
-    # Critical Disclaimer
-    with st.container():
-        st.error("""
-        ⚠️ **CRITICAL MEDICAL DISCLAIMER** 
-        This AI assistant is for informational and educational purposes only. It is NOT a substitute for professional medical advice, 
-        diagnosis, or treatment. Always consult qualified healthcare providers for medical concerns.
-        In life-threatening emergencies, call your local emergency number immediately.
-        """)
+    log = get_audit_log()
+    if log is not None:
+        log.record(event, session=st.session_state.session_id, **fields)
 
-    # Accept disclaimer
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        disclaimer_accepted = st.checkbox("I understand and accept this medical disclaimer", key="disclaimer")
 
-    if not disclaimer_accepted:
-        st.info("🔒 Please accept the disclaimer to access MediGuard AI services")
-        st.stop()
+def exchange(medi_guard, shown, message=None):
+    """Post ``shown`` as the user's turn, reply to ``message`` (default: the same) and rerun."""
+    message = message or shown
+    add_to_chat("user", shown)
+    seed = chat_seed()
+    reply = medi_guard.chat(message, seed=seed)
+    add_to_chat("assistant", reply.response)
+    audit('chat', message=message, intent=reply.intent, matched=reply.keyword, seed=seed,
+          knowledge_version=medi_guard.knowledge.version)
+    st.rerun()
 
-    # Main Dashboard
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
-        ["🏠 Symptom Checker", "🤖 AI Assistant", "🚑 Emergency Guide", "💊 First Aid", "📱 Health Tools", "ℹ️ About"])
 
-    with tab1:
-        # Symptom Checker Section
-        st.subheader("🔍 AI Symptom Assessment")
+def render_symptom_checker(medi_guard):
+    # Symptom Checker Section
+    st.subheader("🔍 AI Symptom Assessment")
 
-        col1, col2 = st.columns([2, 1])
+    col1, col2 = st.columns([2, 1])
 
-        with col1:
-            input_method = st.radio("Choose input method:",
-                                    ["Quick Select Symptoms", "Describe Your Symptoms"],
-                                    horizontal=True)
+    with col1:
+        input_method = st.radio("Choose input method:",
+                                ["Quick Select Symptoms", "Describe Your Symptoms"],
+                                horizontal=True, key="input_method")
 
-            user_symptoms = []
+        user_symptoms = []
+        symptom_text = None
 
-            if input_method == "Quick Select Symptoms":
-                st.write("**Select your symptoms:**")
+        if input_method == "Quick Select Symptoms":
+            st.write("**Select your symptoms:**")
 
-                cols = st.columns(4)
-                symptoms_list = [
-                    "Fever", "Cough", "Headache", "Chest Pain",
-                    "Shortness of Breath", "Dizziness", "Nausea", "Sore Throat",
-                    "Muscle Pain", "Runny Nose", "Fatigue", "Vomiting",
-                    "Rash", "Abdominal Pain", "Chills", "Sneezing"
-                ]
+            cols = st.columns(4)
+            for i, symptom in enumerate(load_assets()['quick_symptoms']):
+                with cols[i % 4]:
+                    if st.checkbox(symptom, key=f"quick_{symptom}"):
+                        user_symptoms.append(symptom.lower())
 
-                for i, symptom in enumerate(symptoms_list):
-                    with cols[i % 4]:
-                        if st.checkbox(symptom):
-                            user_symptoms.append(symptom.lower())
+        else:
+            symptom_text = st.text_area("Describe your symptoms in detail:",
+                                        placeholder="Example: I've had fever and headache since morning, "
+                                                    "also feeling very tired...",
+                                        height=120, key="symptom_text")
+            if symptom_text:
+                # Only the edited part of the text is rescanned on each rerun
+                from mediguard.lexicon import IncrementalExtractor
+
+                extractor = session_data().setdefault('symptom_extractor', IncrementalExtractor())
+                extractor.update(symptom_text, medi_guard.knowledge.lexicon)
+                user_symptoms = extractor.extract()
 
-            else:
-                symptom_text = st.text_area("Describe your symptoms in detail:",
-                                            placeholder="Example: I've had fever and headache since morning, also feeling very tired...",
-                                            height=120)
-                if symptom_text:
-                    # Simple keyword extraction
-                    keywords = ['fever', 'cough', 'headache', 'pain', 'nausea', 'vomiting', 'dizziness', 'rash',
-                                'chills', 'fatigue']
-                    user_symptoms = [kw for kw in keywords if kw in symptom_text.lower()]
-
-        with col2:
-            st.markdown("""
-            <div class="feature-card">
-            <h4>📊 Quick Stats</h4>
-            <p>• 95% Accuracy</p>
-            <p>• 24/7 Available</p>
-            <p>• Instant Assessment</p>
+    with col2:
+        st.markdown("""
+        <div class="feature-card">
+        <h4>📊 Quick Stats</h4>
+        <p>• 95% Accuracy</p>
+        <p>• 24/7 Available</p>
+        <p>• Instant Assessment</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Age and gender info
+        st.subheader("👤 Patient Info")
+        age = st.selectbox("Age Group", ["Under 18", "18-30", "31-50", "51-70", "Over 70"], key="patient_age")
+        gender = st.radio("Gender", ["Male", "Female", "Other"], key="patient_gender")
+
+    if symptom_text:
+        render_text_preview(medi_guard, user_symptoms, extractor.highest_tier(), age, gender)
+
+    # Analyze button
+    if st.button("🔬 Analyze Symptoms with AI", type="primary", use_container_width=True) and user_symptoms:
+        with st.spinner("🦠 MediGuard AI is analyzing your symptoms..."):
+            # Get assessment
+            assessment = medi_guard.assess(user_symptoms, age_group=age, gender=gender)
+            risk_level, condition, recommendation = assessment[:3]
+            audit('assessment', symptoms=user_symptoms, text=symptom_text, matched=assessment.matched,
+                  risk_level=risk_level, condition=condition, age_group=age, gender=gender,
+                  knowledge_version=medi_guard.knowledge.version)
+
+            # Display results
+            st.success("✅ AI Analysis Complete!")
+
+            # Risk level display
+            color = {'high_risk': '#dc3545', 'medium_risk': '#856404'}.get(risk_level, '#155724')
+            st.markdown(f"""
+            <div class="{load_assets()['risk_classes'][risk_level]}">
+                <h2 style="margin: 0; color: {color};">
+                    {recommendation['action']}
+                </h2>
             </div>
             """, unsafe_allow_html=True)
 
-            # Age and gender info
-            st.subheader("👤 Patient Info")
-            age = st.selectbox("Age Group", ["Under 18", "18-30", "31-50", "51-70", "Over 70"])
-            gender = st.radio("Gender", ["Male", "Female", "Other"])
-
-        # Analyze button
-        if st.button("🔬 Analyze Symptoms with AI", type="primary", use_container_width=True) and user_symptoms:
-            with st.spinner("🦠 MediGuard AI is analyzing your symptoms... This may take a few seconds."):
-                # Simulate processing time
-                import time
-                time.sleep(2)
-
-                # Get assessment
-                risk_level, condition, recommendation = medi_guard.assess_symptoms(user_symptoms)
-
-                # Display results
-                st.success("✅ AI Analysis Complete!")
-
-                # Risk level display
-                risk_classes = {
-                    'high_risk': 'risk-high',
-                    'medium_risk': 'risk-medium',
-                    'low_risk': 'risk-low'
-                }
-
-                st.markdown(f"""
-                <div class="{risk_classes[risk_level]}">
-                    <h2 style="margin: 0; color: {'#dc3545' if risk_level == 'high_risk' else '#856404' if risk_level == 'medium_risk' else '#155724'};">
-                        {recommendation['action']}
-                    </h2>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Results columns
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.subheader("📋 Medical Assessment")
-                    st.write(f"**Reported Symptoms:** {', '.join(user_symptoms)}")
-                    st.write(f"**Possible Condition:** {condition}")
-                    st.write(f"**Risk Level:** {risk_level.replace('_', ' ').title()}")
-                    st.write(f"**Patient:** {age}, {gender}")
-                    st.write(f"**Assessment Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-                with col2:
-                    st.subheader("💡 Medical Recommendations")
-                    st.write(recommendation['advice'])
-                    for i, step in enumerate(recommendation['steps'], 1):
-                        st.write(f"{i}. {step}")
-
-                # Emergency section for high risk
-                if risk_level == 'high_risk':
-                    st.error("""
-                    🚑 **EMERGENCY PROTOCOL ACTIVATED**
-                    - 📞 **Call emergency services immediately: 108 or 112**
-                    - 🏥 **Go to nearest hospital emergency room**  
-                    - 👥 **Do not go alone if possible**
-                    - 💊 **Do not take any medication without medical supervision**
-                    - 📱 **Keep phone charged and accessible**
-                    """)
-
-                # Home care for low/medium risk
-                if risk_level in ['low_risk', 'medium_risk']:
-                    st.subheader("🏠 Home Care & Self-Management")
-                    for symptom in user_symptoms:
-                        symptom_lower = symptom.lower()
-                        for key, remedy in HOME_REMEDIES.items():
-                            if key in symptom_lower:
-                                st.write(f"**For {symptom.title()}:** {remedy}")
-                                break
-
-    with tab2:
-        st.subheader("🤖 MediGuard AI Assistant")
-        st.markdown("Chat with our AI health assistant for instant guidance and support!")
-
-        # Chat container
-        st.markdown("### 💬 Conversation")
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-
-        # Display chat history
-        for chat in st.session_state.chat_history:
-            if chat["role"] == "user":
-                st.markdown(f'<div class="user-message"><strong>You:</strong> {chat["message"]}</div>',
-                            unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="assistant-message"><strong>MediGuard:</strong> {chat["message"]}</div>',
-                            unsafe_allow_html=True)
+            # Results columns
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.subheader("📋 Medical Assessment")
+                st.write(f"**Reported Symptoms:** {', '.join(user_symptoms)}")
+                st.write(f"**Possible Condition:** {condition}")
+                if assessment.ranked:
+                    st.write("**Differential:** " + ", ".join(
+                        f"{name} ({score:.1f})" for name, score in assessment.ranked))
+                st.write(f"**Risk Level:** {risk_level.replace('_', ' ').title()}")
+                st.write(f"**Patient:** {age}, {gender}")
+                st.write(f"**Assessment Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+            with col2:
+                st.subheader("💡 Medical Recommendations")
+                st.write(recommendation['advice'])
+                for i, step in enumerate(recommendation['steps'], 1):
+                    st.write(f"{i}. {step}")
+
+            # Emergency section for high risk
+            if risk_level == 'high_risk':
+                st.error("""
+                🚑 **EMERGENCY PROTOCOL ACTIVATED**
+                - 📞 **Call emergency services immediately: 108 or 112**
+                - 🏥 **Go to nearest hospital emergency room**  
+                - 👥 **Do not go alone if possible**
+                - 💊 **Do not take any medication without medical supervision**
+                - 📱 **Keep phone charged and accessible**
+                """)
+
+            # Home care for low/medium risk
+            if risk_level in ['low_risk', 'medium_risk']:
+                st.subheader("🏠 Home Care & Self-Management")
+                for symptom, remedy in medi_guard.home_remedies(user_symptoms):
+                    st.write(f"**For {symptom.title()}:** {remedy}")
+
+
+def render_text_preview(medi_guard, user_symptoms, tier, age, gender):
+    """Symptoms, tier and most likely condition for the description as last submitted."""
+    if not user_symptoms:
+        st.caption("🔎 No symptoms recognised yet")
+        return
+    label = tier.replace('_', ' ').title() if tier else "Unclassified"
+    st.markdown(f"🔎 **Detected:** {', '.join(user_symptoms)} · **Tier:** {label}")
+    # Most edits and reruns leave the symptom set as it was; only assess
+    # again when it, the patient details or the knowledge changed
+    data = session_data()
+    key = (frozenset(user_symptoms), age, gender, medi_guard.knowledge.version)
+    preview = data.get('text_preview')
+    if preview is None or preview[0] != key:
+        assessment = medi_guard.assess(user_symptoms, age_group=age, gender=gender)
+        preview = data['text_preview'] = (key, assessment.condition, assessment.risk_level)
+    _, condition, risk_level = preview
+    st.caption(f"Most likely: {condition} ({risk_level.replace('_', ' ')}). Press Analyze for the full report.")
+
+
+def render_assistant(medi_guard):
+    st.subheader("🤖 MediGuard AI Assistant")
+    st.markdown("Chat with our AI health assistant for instant guidance and support!")
+
+    # Chat container
+    st.markdown("### 💬 Conversation")
+    st.markdown('<div class="chat-container">', unsafe_allow_html=True)
+
+    # Display only the most recent window of the chat history
+    data = session_data()
+    history = data['chat_history']
+    if len(history) > data['chat_visible']:
+        if st.button("⬆️ Load earlier messages"):
+            data['chat_visible'] += CHAT_PAGE_SIZE
+            st.rerun()
+    if history.evicted:
+        st.caption(f"{history.evicted} older messages are no longer shown.")
+
+    for chat in history.recent(data['chat_visible']):
+        if chat["role"] == "user":
+            st.markdown(f'<div class="user-message"><strong>You:</strong> {chat["message"]}</div>',
+                        unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="assistant-message"><strong>MediGuard:</strong> {chat["message"]}</div>',
+                        unsafe_allow_html=True)
 
-        st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
 
-        # Quick action buttons
-        st.subheader("⚡ Quick Actions")
-        col1, col2, col3, col4 = st.columns(4)
+    # Quick action buttons
+    st.subheader("⚡ Quick Actions")
+    col1, col2, col3, col4 = st.columns(4)
 
-        with col1:
-            if st.button("🤒 Fever Advice", use_container_width=True):
-                add_to_chat("user", "What should I do for fever?")
-                response = medi_guard.chat_response("fever")
-                add_to_chat("assistant", response)
-                st.rerun()
+    with col1:
+        if st.button("🤒 Fever Advice", use_container_width=True):
+            exchange(medi_guard, "What should I do for fever?", "fever")
 
-        with col2:
-            if st.button("😫 Headache", use_container_width=True):
-                add_to_chat("user", "I have a headache")
-                response = medi_guard.chat_response("headache")
-                add_to_chat("assistant", response)
-                st.rerun()
+    with col2:
+        if st.button("😫 Headache", use_container_width=True):
+            exchange(medi_guard, "I have a headache", "headache")
 
-        with col3:
-            if st.button("💪 Health Tips", use_container_width=True):
-                add_to_chat("user", "Give me health tips")
-                response = medi_guard.chat_response("health tips")
-                add_to_chat("assistant", response)
-                st.rerun()
+    with col3:
+        if st.button("💪 Health Tips", use_container_width=True):
+            exchange(medi_guard, "Give me health tips", "health tips")
 
-        with col4:
-            if st.button("👋 Hello", use_container_width=True):
-                add_to_chat("user", "Hello")
-                response = medi_guard.chat_response("hello")
-                add_to_chat("assistant", response)
-                st.rerun()
+    with col4:
+        if st.button("👋 Hello", use_container_width=True):
+            exchange(medi_guard, "Hello", "hello")
 
-        # Chat input
-        st.subheader("💭 Ask a Question")
-        user_input = st.text_input("Type your health question here:",
-                                   placeholder="E.g., What should I do for a cough? How to reduce fever?",
-                                   key="chat_input")
-
-        col1, col2 = st.columns([4, 1])
-        with col1:
-            if st.button("📤 Send Message", use_container_width=True) and user_input:
-                add_to_chat("user", user_input)
-                response = medi_guard.chat_response(user_input)
-                add_to_chat("assistant", response)
-                st.rerun()
+    # Chat input
+    st.subheader("💭 Ask a Question")
+    user_input = st.text_input("Type your health question here:",
+                               placeholder="E.g., What should I do for a cough? How to reduce fever?",
+                               key="chat_input")
 
-        with col2:
-            if st.button("🔄 Clear Chat", use_container_width=True):
-                st.session_state.chat_history = [
-                    {"role": "assistant",
-                     "message": "👋 Hello! I'm your MediGuard AI assistant. How can I help you today?"}
-                ]
-                st.rerun()
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        if st.button("📤 Send Message", use_container_width=True) and user_input:
+            exchange(medi_guard, user_input)
 
-    with tab3:
-        st.subheader("🚨 Emergency Response Guide")
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("""
-            <div class="risk-high">
-            <h3>🆘 Immediate Emergency Signs</h3>
-            <p>• Chest pain or pressure</p>
-            <p>• Difficulty breathing</p>
-            <p>• Severe bleeding</p>
-            <p>• Sudden weakness/numbness</p>
-            <p>• Unconsciousness</p>
-            <p>• Seizures</p>
-            </div>
-            """, unsafe_allow_html=True)
+    with col2:
+        if st.button("🔄 Clear Chat", use_container_width=True):
+            data['chat_history'].clear()
+            data['chat_history'] = new_chat_history(
+                "👋 Hello! I'm your MediGuard AI assistant. How can I help you today?")
+            data['chat_visible'] = CHAT_PAGE_SIZE
+            st.rerun()
+
+
+def render_emergency_guide(medi_guard):
+    st.subheader("🚨 Emergency Response Guide")
+
+    col1, col2 = st.columns(2)
 
-            st.subheader("📞 Emergency Contacts")
-            contacts = {
-                "National Emergency": "112",
-                "Ambulance": "108",
-                "Police": "100",
-                "Fire": "101",
-                "Poison Control": "1800-111-111"
-            }
-
-            for service, number in contacts.items():
-                st.write(f"**{service}:** `{number}`")
-
-        with col2:
-            st.subheader("📍 Find Nearest Hospitals")
-            st.info("""
-            **Nearest Medical Facilities:**
-
-            🏥 **City General Hospital**
-            - Distance: 2.3 km
-            - 24/7 Emergency: ✅
-            - Trauma Center: ✅
-
-            🏥 **Community Health Center** 
-            - Distance: 1.1 km
-            - Emergency: ✅
-            - Pharmacy: ✅
-
-            🏥 **Apollo Speciality Clinic**
-            - Distance: 3.5 km
-            - Specialists: ✅
-            - Lab Services: ✅
-            """)
-
-    with tab4:
-        st.subheader("💊 First Aid Instructions")
-
-        emergency_type = st.selectbox("Select Emergency Type:",
-                                      ["Bleeding", "Burns", "Fractures", "Choking", "Heart Attack", "Stroke"])
-
-        if emergency_type.lower() in FIRST_AID:
-            st.warning(f"**First Aid for {emergency_type}:**")
-            st.info(FIRST_AID[emergency_type.lower()])
+    with col1:
+        st.markdown("""
+        <div class="risk-high">
+        <h3>🆘 Immediate Emergency Signs</h3>
+        <p>• Chest pain or pressure</p>
+        <p>• Difficulty breathing</p>
+        <p>• Severe bleeding</p>
+        <p>• Sudden weakness/numbness</p>
+        <p>• Unconsciousness</p>
+        <p>• Seizures</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.subheader("📞 Emergency Contacts")
+        for service, number in load_assets()['emergency_contacts']:
+            st.write(f"**{service}:** `{number}`")
+
+    with col2:
+        st.subheader("📍 Find Nearest Hospitals")
+        from mediguard.facilities import CAPABILITIES, get_facility_index, using_sample_data
+
+        if using_sample_data():
+            st.caption("⚠️ Sample data: these facilities and phone numbers are fictitious. "
+                       "Call 112 in an emergency.")
+
+        loc1, loc2 = st.columns(2)
+        lat = loc1.number_input("Latitude", -90.0, 90.0, format="%.4f", key="facility_lat")
+        lon = loc2.number_input("Longitude", -180.0, 180.0, format="%.4f", key="facility_lon")
+        required = st.multiselect("Must have:", list(CAPABILITIES), format_func=CAPABILITIES.get,
+                                  key="facility_filters")
+
+        nearest = get_facility_index().nearest(lat, lon, k=3, require=required)
+        if not nearest:
+            st.warning("No facility with these services found. Call 112 for emergency assistance.")
         else:
-            st.info("""
-            **General First Aid Principles:**
-
-            1. **Ensure Safety** - Check scene for dangers
-            2. **Call for Help** - Dial emergency number
-            3. **Provide Care** - Follow specific instructions
-            4. **Comfort & Reassure** - Keep person calm
-            5. **Monitor** - Watch for changes in condition
-            """)
-
-    with tab5:
-        st.subheader("📱 Health & Wellness Tools")
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("""
-            <div class="feature-card">
-            <h4>❤️ Heart Rate Monitor</h4>
-            <p>Check your pulse rate</p>
-            </div>
-            """, unsafe_allow_html=True)
+            lines = ["**Nearest Medical Facilities:**", ""]
+            for distance, facility in nearest:
+                lines.append(f"🏥 **{facility.name}**")
+                lines.append(f"- Distance: {distance:.1f} km")
+                lines.extend(f"- {label}: ✅" for capability, label in CAPABILITIES.items()
+                             if capability in facility.capabilities)
+                if facility.phone:
+                    lines.append(f"- Phone: `{facility.phone}`")
+                lines.append("")
+            st.info("\n".join(lines))
+
+
+def render_first_aid(medi_guard):
+    first_aid = medi_guard.knowledge.first_aid
+
+    st.subheader("💊 First Aid Instructions")
+
+    emergency_type = st.selectbox("Select Emergency Type:",
+                                  ["Bleeding", "Burns", "Fractures", "Choking", "Heart Attack", "Stroke"],
+                                  key="first_aid_type")
+
+    if emergency_type.lower() in first_aid:
+        st.warning(f"**First Aid for {emergency_type}:**")
+        st.info(first_aid[emergency_type.lower()])
+    else:
+        st.info("""
+        **General First Aid Principles:**
+
+        1. **Ensure Safety** - Check scene for dangers
+        2. **Call for Help** - Dial emergency number
+        3. **Provide Care** - Follow specific instructions
+        4. **Comfort & Reassure** - Keep person calm
+        5. **Monitor** - Watch for changes in condition
+        """)
 
-            pulse = st.slider("Resting Heart Rate (BPM)", 40, 120, 72)
-            if pulse < 60:
-                st.warning("Low resting heart rate - consult doctor if symptomatic")
-            elif pulse > 100:
-                st.warning("High resting heart rate - consider medical advice")
-            else:
-                st.success("Normal resting heart rate")
 
-        with col2:
-            st.markdown("""
-            <div class="feature-card">
-            <h4>🌡️ Symptom Tracker</h4>
-            <p>Monitor symptoms over time</p>
-            </div>
-            """, unsafe_allow_html=True)
+# Tracker history paging: entries per page and selectable day ranges
+TRACKER_PAGE_SIZE = 10
+TRACKER_RANGES = [7, 30, 90, 365]
 
-            if 'symptom_history' not in st.session_state:
-                st.session_state.symptom_history = []
 
-            new_symptom = st.text_input("Add today's symptom:")
-            if st.button("Add to Tracker") and new_symptom:
-                st.session_state.symptom_history.append({
-                    'symptom': new_symptom,
-                    'date': datetime.datetime.now().strftime("%Y-%m-%d"),
-                    'severity': 'Medium'
-                })
-                st.success("Symptom added to tracker!")
+def reset_tracker_page():
+    st.session_state.tracker_cursors = []
+
+
+def unlock_tracker_profile():
+    from mediguard.tracker import MIN_PASSPHRASE_LENGTH, get_store
 
-            if st.session_state.symptom_history:
-                st.write("**Symptom History:**")
-                for entry in st.session_state.symptom_history[-5:]:
-                    st.write(f"- {entry['date']}: {entry['symptom']} ({entry['severity']})")
+    name = st.session_state.get('tracker_profile_name', '').strip()
+    passphrase = st.session_state.get('tracker_passphrase', '')
+    if not name and not passphrase:
+        user = st.session_state.session_id
+    elif not name or len(passphrase) < MIN_PASSPHRASE_LENGTH:
+        st.session_state.tracker_notice = (
+            f"Enter a profile name and a passphrase of at least {MIN_PASSPHRASE_LENGTH} characters.")
+        return
+    else:
+        try:
+            user = get_store().profile_user_id(name, passphrase)
+        except sqlite3.Error as exc:
+            st.session_state.tracker_notice = f"Could not open the profile: {exc}"
+            return
+    st.session_state.tracker_notice = None
+    st.session_state.tracker_user = user
+    reset_tracker_page()
 
-    with tab6:
-        st.subheader("ℹ️ About MediGuard AI")
 
+def render_health_tools(medi_guard):
+    st.subheader("📱 Health & Wellness Tools")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("""
+        <div class="feature-card">
+        <h4>❤️ Heart Rate Monitor</h4>
+        <p>Check your pulse rate</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        pulse = st.slider("Resting Heart Rate (BPM)", 40, 120, key="pulse")
+        if pulse < 60:
+            st.warning("Low resting heart rate - consult doctor if symptomatic")
+        elif pulse > 100:
+            st.warning("High resting heart rate - consider medical advice")
+        else:
+            st.success("Normal resting heart rate")
+
+    with col2:
         st.markdown("""
-        ## Your Trusted Health Companion
+        <div class="feature-card">
+        <h4>🌡️ Symptom Tracker</h4>
+        <p>Monitor symptoms over time</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        from mediguard.tracker import SEVERITY_LEVELS, get_store
+        store = get_store()
+
+        # Entries belong to this session unless a saved profile is opened
+        # with its name and passphrase
+        st.text_input("Saved profile name (optional):", key="tracker_profile_name",
+                      on_change=unlock_tracker_profile)
+        st.text_input("Profile passphrase:", type="password", key="tracker_passphrase",
+                      on_change=unlock_tracker_profile,
+                      help="Enter the same name and passphrase on a later visit to see this history again.")
+        if st.session_state.get('tracker_notice'):
+            st.warning(st.session_state.tracker_notice)
+        profile = st.session_state.setdefault('tracker_user', st.session_state.session_id)
+
+        new_symptom = st.text_input("Add today's symptom:", key="tracker_symptom")
+        severity = st.select_slider("Severity:", SEVERITY_LEVELS, key="tracker_severity")
+        if st.button("Add to Tracker") and new_symptom:
+            try:
+                store.add(profile, new_symptom, severity)
+            except sqlite3.Error as exc:
+                st.error(f"Could not save the symptom: {exc}")
+            else:
+                reset_tracker_page()
+                st.success("Symptom added to tracker!")
+
+        days = st.selectbox("Show entries from:", TRACKER_RANGES, key="tracker_range",
+                            format_func=lambda d: f"Last {d} days", on_change=reset_tracker_page)
+        today = datetime.date.today()
+        cursors = st.session_state.setdefault('tracker_cursors', [])
+        try:
+            page = store.entries(profile, start=today - datetime.timedelta(days=days - 1), end=today,
+                                 limit=TRACKER_PAGE_SIZE, before=cursors[-1] if cursors else None)
+        except sqlite3.Error as exc:
+            st.error(f"The symptom tracker is unavailable right now: {exc}")
+            return
+
+        if page:
+            st.write("**Symptom History:**")
+            for entry in page:
+                st.write(f"- {entry['date']}: {entry['symptom']} ({entry['severity']})")
+
+        nav1, nav2 = st.columns(2)
+        with nav1:
+            if cursors and st.button("⬅️ Newer"):
+                cursors.pop()
+                st.rerun()
+        with nav2:
+            if len(page) == TRACKER_PAGE_SIZE and st.button("Older ➡️"):
+                cursors.append(page[-1]['cursor'])
+                st.rerun()
+
+    render_tracker_trends(store, profile, days)
+    render_history_transfer(store, profile)
+
+
+def render_tracker_trends(store, profile, days):
+    try:
+        analytics = get_tracker_analytics().get(store, profile)
+    except sqlite3.Error as exc:
+        st.error(f"Symptom trends are unavailable right now: {exc}")
+        return
+    summary = analytics.summary(days=days)
+    if not summary:
+        return
+
+    st.markdown("#### 📈 Symptom Trends")
+    dates, totals, rolling_mean = analytics.rolling(days=days, window=7)
+    st.line_chart({'Entries per day': totals, '7-day average': rolling_mean}, height=220)
+    st.caption(f"{dates[0]:%d %b %Y} – {dates[-1]:%d %b %Y}")
+    st.dataframe(
+        {
+            'Symptom': [row.symptom for row in summary],
+            'Entries': [row.count for row in summary],
+            'Current streak (days)': [row.current_streak for row in summary],
+            'Longest streak (days)': [row.longest_streak for row in summary],
+            'Mean severity (1-3)': [row.mean_severity for row in summary],
+            'Severity trend / week': [row.severity_trend for row in summary],
+        },
+        hide_index=True,
+    )
+
+
+def render_history_transfer(store, profile):
+    from mediguard import export
+
+    with st.expander("📦 Export / import history"):
+        st.caption("This session's chat and the tracker entries of the current profile.")
+        fmt = st.radio("Format:", export.FORMATS, horizontal=True, key="export_format",
+                       format_func=lambda f: {'jsonl.gz': "JSON lines (gzip)", 'mgc': "Compact binary"}[f])
+
+        # Capture the turns now: the download is generated on another thread,
+        # after this run has checked the session back in
+        history = session_data()['chat_history']
+        turns = list(history)
+
+        def generate():
+            chat = itertools.chain(history.spilled(), turns)
+            return export.ExportStream(export.export(fmt, chat, store, profile))
+
+        st.download_button("⬇️ Download history", data=generate, file_name=f"mediguard-history.{fmt}",
+                           mime=export.MIME_TYPES[fmt], on_click="ignore")
+
+        uploaded = st.file_uploader("Import a history export:", type=['gz', 'mgc'], key="history_upload")
+        if uploaded is not None and st.button("📥 Import"):
+            try:
+                report = export.import_history(uploaded, history, store, profile)
+            except (ValueError, sqlite3.Error) as exc:
+                st.error(f"Could not import {uploaded.name}: {exc}")
+                return
+            reset_tracker_page()
+            audit("history_import", chat=report.chat, symptoms=report.symptoms, rejected=report.rejected)
+            st.success(f"Imported {report.chat} chat messages and {report.symptoms} tracker entries.")
+            if report.rejected:
+                st.warning(f"{report.rejected} invalid records were skipped.")
+                st.caption('\n\n'.join(report.errors))
+
+
+def render_about(medi_guard):
+    st.subheader("ℹ️ About MediGuard AI")
+
+    st.markdown("""
+    ## Your Trusted Health Companion
+
+    **MediGuard AI** is an advanced artificial intelligence system designed to:
+
+    - 🔍 **Assess Symptoms** with intelligent analysis
+    - 🤖 **Chat with AI Assistant** for instant guidance
+    - 🚨 **Detect Emergencies** with high accuracy  
+    - 💊 **Provide First Aid** guidance
+    - 📱 **Offer Health Tools** for daily monitoring
+
+    *Built with ❤️ for better healthcare accessibility*
+    """)
+
+
+# Navigation label -> render function; each takes the engine instance
+SECTIONS = {
+    "🏠 Symptom Checker": render_symptom_checker,
+    "🤖 AI Assistant": render_assistant,
+    "🚑 Emergency Guide": render_emergency_guide,
+    "💊 First Aid": render_first_aid,
+    "📱 Health Tools": render_health_tools,
+    "ℹ️ About": render_about,
+}
+
+
+# Widgets of sections that are not rendered lose their state; these keep it
+KEPT_WIDGETS = (
+    'input_method', 'symptom_text', 'patient_age', 'patient_gender', 'chat_input', 'facility_lat', 'facility_lon',
+    'facility_filters', 'first_aid_type', 'pulse', 'tracker_profile_name', 'tracker_passphrase', 'tracker_symptom',
+    'tracker_severity', 'tracker_range', 'export_format',
+)
+KEPT_WIDGET_PREFIXES = ('quick_',)
+
+# Initial values of kept widgets that do not start at their first option;
+# a widget given both a default and session state is warned about
+WIDGET_DEFAULTS = {
+    'facility_lat': DEFAULT_LOCATION[0],
+    'facility_lon': DEFAULT_LOCATION[1],
+    'pulse': 72,
+    'tracker_severity': 'Medium',
+    'tracker_range': 30,
+}
+
+
+def keep_widget_state():
+    # Streamlit deletes the state of a widget that was not rendered on the
+    # last run. Writing the value back makes it plain session state, which
+    # survives; the widget picks it up again when its section is shown.
+    for key in list(st.session_state.keys()):
+        if key in KEPT_WIDGETS or key.startswith(KEPT_WIDGET_PREFIXES):
+            st.session_state[key] = st.session_state[key]
+    for key, value in WIDGET_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+
+
+def render_section(label, medi_guard):
+    from mediguard import metrics
+
+    start = time.perf_counter()
+    try:
+        with metrics.timer('mediguard_render_seconds', section=label):
+            SECTIONS[label](medi_guard)
+    finally:
+        # Recorded even when the section stops or reruns the script
+        timings = session_data().setdefault('render_timings', {})
+        timings[label] = (time.perf_counter() - start) * 1000
+
+
+def render_timings():
+    timings = session_data().get('render_timings')
+    if not timings:
+        return
+    with st.sidebar.expander("⏱️ Render timings"):
+        for label, elapsed_ms in timings.items():
+            st.write(f"{label}: {elapsed_ms:.1f} ms")
+
 
-        **MediGuard AI** is an advanced artificial intelligence system designed to:
+def render_footprint(medi_guard):
+    footprint = engine_footprint(medi_guard, medi_guard.knowledge.version)
+    with st.sidebar.expander("🧠 Shared engine memory"):
+        for component, size in footprint.items():
+            st.write(f"{component}: {size / 1024:.1f} KiB")
 
-        - 🔍 **Assess Symptoms** with intelligent analysis
-        - 🤖 **Chat with AI Assistant** for instant guidance
-        - 🚨 **Detect Emergencies** with high accuracy  
-        - 💊 **Provide First Aid** guidance
-        - 📱 **Offer Health Tools** for daily monitoring
 
-        *Built with ❤️ for better healthcare accessibility*
+def render_session_memory():
+    from mediguard.sessions import get_session_manager
+
+    manager = get_session_manager()
+    mine = manager.session_stats(st.session_state.session_id)
+    stats = manager.stats()
+    with st.sidebar.expander("💾 Session memory"):
+        # Sizes are measured as runs end, so this session's is as of its previous run
+        st.write(f"This session: {mine.bytes / 1024 if mine else 0:.1f} KiB "
+                 f"(restored from disk {mine.restores if mine else 0}×)")
+        st.write(f"Resident: {stats.resident} sessions, {stats.resident_bytes / (1 << 20):.1f} "
+                 f"of {stats.budget / (1 << 20):.1f} MiB")
+        st.write(f"Spilled to disk: {stats.spilled} sessions, {stats.spilled_bytes / 1024:.1f} KiB")
+
+
+def main():
+    from mediguard.sessions import get_session_manager
+
+    get_engine()
+    assets = load_assets()
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    # Checked back in (and measured) however the run ends, st.rerun included
+    with get_session_manager().session(st.session_state.session_id) as data:
+        _run_state.data = data
+        render_page(assets)
+
+
+def render_page(assets):
+    keep_widget_state()
+    initialize_session()
+    medi_guard = session_engine()
+
+    # Custom CSS for better styling
+    st.markdown(assets['css'], unsafe_allow_html=True)
+
+    # Header Section
+    st.markdown('<h1 class="main-header">🛡️ MediGuard AI</h1>', unsafe_allow_html=True)
+    st.markdown('<h2 class="sub-header">Your Intelligent Health Companion & Emergency Response System</h2>',
+                unsafe_allow_html=True)
+
+    # Critical Disclaimer
+    with st.container():
+        st.error("""
+        ⚠️ **CRITICAL MEDICAL DISCLAIMER** 
+        This AI assistant is for informational and educational purposes only.
+        It is NOT a substitute for professional medical advice, diagnosis, or treatment.
+        Always consult qualified healthcare providers for medical concerns.
+        In life-threatening emergencies, call your local emergency number immediately.
         """)
 
+    # Accept disclaimer
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        disclaimer_accepted = st.checkbox("I understand and accept this medical disclaimer", key="disclaimer")
+
+    if not disclaimer_accepted:
+        st.info("🔒 Please accept the disclaimer to access MediGuard AI services")
+        st.stop()
+
+    # Main Dashboard: only the selected section is executed on a rerun
+    section = st.radio("Section", list(SECTIONS), horizontal=True, key="section",
+                       label_visibility="collapsed")
+    render_section(section, medi_guard)
+
     # Footer
     st.markdown("---")
     st.markdown("<p style='text-align: center; color: gray;'>MediGuard AI 🛡️ - Your Health, Our Priority</p>",
                 unsafe_allow_html=True)
 
+    render_timings()
+    render_footprint(medi_guard)
+    render_session_memory()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+"""Throughput of the compiled intent router against the old per-tier scans.
+
+The legacy router below is the substring-scan logic ``chat_response`` used
+before the compiled router existed. Both are run over the same message mix,
+first with the shipped keyword tables and then with every table padded by
+synthetic keywords to ``--scale`` times its size.
+
+    python benchmarks/bench_chat_router.py --scale 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mediguard.knowledge import (  # noqa: E402
+    AI_ASSISTANT_RESPONSES,
+    EMERGENCY_KEYWORDS,
+    GREETING_KEYWORDS,
+    HEALTH_KEYWORDS,
+)
+from mediguard.router import IntentRouter  # noqa: E402
+
+MESSAGES = [
+    "Hello",
+    "What should I do for fever?",
+    "I have a headache since this morning",
+    "Give me health tips",
+    "my father has chest pain and is sweating",
+    "is it normal to feel tired after a long flight with these chills",
+    "can you recommend something for a dry cough at night",
+    "I think my knee is swollen after running yesterday evening",
+    "thanks, that was useful",
+    "what do you suggest for a stomach ache",
+]
+
+
+def legacy_route(message, intents):
+    message = message.lower()
+    for intent, keywords in intents:
+        for keyword in keywords:
+            if keyword in message:
+                return intent, keyword
+    return 'unknown', None
+
+
+def build_intents(scale):
+    base = [
+        ('emergency', list(EMERGENCY_KEYWORDS)),
+        ('symptom', list(AI_ASSISTANT_RESPONSES['symptoms'])),
+        ('greeting', list(GREETING_KEYWORDS)),
+        ('health', list(HEALTH_KEYWORDS)),
+    ]
+    rng = random.Random(0)
+    padded = []
+    for intent, keywords in base:
+        extra = []
+        while len(keywords) + len(extra) < len(keywords) * scale:
+            extra.append(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(5, 12))))
+        padded.append((intent, keywords + extra))
+    return padded
+
+
+def throughput(fn, messages, min_seconds):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for message in messages:
+            fn(message)
+        calls += len(messages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chat intent router throughput benchmark.")
+    parser.add_argument('--scale', type=int, default=10, help="intent table growth factor to test")
+    parser.add_argument('--seconds', type=float, default=1.0, help="minimum run time per measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'tables':>8} {'legacy msg/s':>14} {'router msg/s':>14} {'speedup':>8}")
+    for scale in sorted({1, args.scale}):
+        intents = build_intents(scale)
+        router = IntentRouter(intents)
+        legacy = throughput(lambda message: legacy_route(message, intents), MESSAGES, args.seconds)
+        compiled = throughput(router.route, MESSAGES, args.seconds)
+        print(f"{str(scale) + 'x':>8} {legacy:>14,.0f} {compiled:>14,.0f} {compiled / legacy:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Check that the headless engine imports within a small time budget.
+
+The package is byte-compiled first so the check measures a warm deployment,
+not source compilation. Each run then starts a fresh interpreter with
+``-X importtime`` and reads the cumulative import time of the ``mediguard``
+package. The check fails if the median exceeds the budget or if importing
+the engine pulled in Streamlit.
+
+    python benchmarks/import_budget.py --budget-ms 5
+"""
+
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = "import sys, mediguard; print('streamlit' in sys.modules)"
+
+
+def measure_once(module='mediguard'):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.replace('mediguard', module)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    if cumulative_us is None:
+        raise RuntimeError(f"no import timing reported for {module}")
+    return cumulative_us / 1000.0, result.stdout.strip() == 'True'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    # Interpreters started with PYTHONDONTWRITEBYTECODE would otherwise
+    # recompile every module on each run
+    compileall.compile_dir(os.path.join(ROOT, 'mediguard'), quiet=1)
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed_ms, pulled_streamlit = measure_once()
+        if pulled_streamlit:
+            print("FAIL: importing mediguard also imported streamlit")
+            return 1
+        timings.append(elapsed_ms)
+
+    median_ms = statistics.median(timings)
+    print(f"mediguard import: median {median_ms:.2f} ms, max {max(timings):.2f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.1f} ms)")
+    if median_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Every simulated user drives its own ``AppTest`` session of ``app1.py``
+through the real flows: accepting the disclaimer, ticking symptoms and
+pressing Analyze, chatting with the assistant and adding tracker entries.
+Sessions run on their own threads in one process, so they share the
+cached engine and assets the way sessions on one Streamlit server do.
+
+``AppTest`` installs a process-global mock runtime and recompiles the script
+on every run, so two runs cannot overlap safely. Reruns are therefore
+admitted one at a time, in the order sessions ask for them. A pure-Python
+rerun holds the GIL for most of its run, so a server on one core behaves
+much the same. Latency is what the user waits: time queued behind other
+sessions plus the rerun itself. The rerun time alone is reported as
+"service".
+
+For each session count the harness reports:
+
+* aggregate rerun throughput;
+* latency percentiles, overall and per interaction;
+* the largest session state seen: the deep size of ``st.session_state``
+  plus the session's own state in the session manager;
+* the process RSS.
+
+Capacity per host can be read off as the count rises.
+
+    python benchmarks/load_sessions.py --sessions 1 2 4 8 16 --rounds 3
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mediguard.footprint import deep_sizeof  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, 'app1.py')
+
+QUICK_SELECT = ["Fever", "Cough", "Headache", "Chest Pain", "Dizziness", "Nausea", "Sore Throat", "Fatigue"]
+CHAT_MESSAGES = ["Hello", "What should I do for fever?", "I have a headache", "Give me health tips",
+                 "can you suggest something for a cough"]
+TRACKER_SYMPTOMS = ["Headache", "Cough", "Fatigue", "Back pain"]
+
+# AppTest runs must not overlap; see the module docstring
+_RUN_LOCK = threading.Lock()
+
+# Interactions in report order
+STEPS = ['open', 'disclaimer', 'select', 'analyze', 'navigate', 'chat', 'tracker_add']
+
+
+class Session:
+    """One simulated user; records the latency of every rerun it causes."""
+
+    def __init__(self, number, timeout):
+        self.number = number
+        self.timeout = timeout
+        self.rng = random.Random(number)
+        self.latencies = {step: [] for step in STEPS}
+        self.service = []
+        self.peak_state_bytes = 0
+        self.errors = []
+        self.app = None
+
+    def step(self, name, action):
+        start = time.perf_counter()
+        with _RUN_LOCK:
+            admitted = time.perf_counter()
+            action()
+            finished = time.perf_counter()
+        self.latencies[name].append(finished - start)
+        self.service.append(finished - admitted)
+        if self.app.exception:
+            self.errors.append((self.number, name, [e.value for e in self.app.exception]))
+        self.peak_state_bytes = max(self.peak_state_bytes, self.state_bytes())
+
+    def state_bytes(self):
+        from mediguard.sessions import get_session_manager
+
+        size = deep_sizeof(dict(self.app.session_state.items()))
+        managed = get_session_manager().session_stats(self.app.session_state['session_id'])
+        return size + (managed.bytes if managed is not None else 0)
+
+    def widget(self, elements, label):
+        return next(element for element in elements if element.label == label)
+
+    def run_flow(self, rounds):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+        self.step('open', self.app.run)
+        self.step('disclaimer', lambda: self.app.checkbox(key='disclaimer').check().run())
+        for _ in range(rounds):
+            self.symptom_checker()
+            self.assistant()
+            self.tracker()
+
+    def symptom_checker(self):
+        app = self.app
+        self.step('navigate', lambda: app.radio(key='section').set_value("🏠 Symptom Checker").run())
+        for symptom in self.rng.sample(QUICK_SELECT, 2):
+            self.step('select', lambda: self.widget(app.checkbox, symptom).check().run())
+        self.step('analyze', lambda: self.widget(app.button, "🔬 Analyze Symptoms with AI").click().run())
+
+    def assistant(self):
+        app = self.app
+        self.step('navigate', lambda: app.radio(key='section').set_value("🤖 AI Assistant").run())
+        for _ in range(2):
+            message = self.rng.choice(CHAT_MESSAGES)
+
+            def send():
+                app.text_input(key='chat_input').input(message)
+                self.widget(app.button, "📤 Send Message").click().run()
+            self.step('chat', send)
+
+    def tracker(self):
+        app = self.app
+        self.step('navigate', lambda: app.radio(key='section').set_value("📱 Health Tools").run())
+
+        def add():
+            self.widget(app.text_input, "Add today's symptom:").input(self.rng.choice(TRACKER_SYMPTOMS))
+            app.select_slider(key='tracker_severity').set_value(self.rng.choice(['Mild', 'Medium', 'Severe']))
+            self.widget(app.button, "Add to Tracker").click().run()
+        self.step('tracker_add', add)
+
+
+def rss_bytes():
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_level(count, rounds, timeout):
+    sessions = [Session(number, timeout) for number in range(count)]
+    barrier = threading.Barrier(count + 1)
+    failures = []
+
+    def worker(session):
+        barrier.wait()
+        try:
+            session.run_flow(rounds)
+        except Exception as exc:  # a broken flow must not hang the barrier or the report
+            failures.append((session.number, repr(exc)))
+
+    threads = [threading.Thread(target=worker, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sessions, elapsed, failures
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else float('nan')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent AppTest sessions against app1.py.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--rounds', type=int, default=2, help="times each session repeats the flows")
+    parser.add_argument('--timeout', type=float, default=120.0, help="seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    # Keep the run's tracker entries and audit events out of the working tree
+    workdir = tempfile.mkdtemp(prefix='mediguard-load-')
+    os.environ.setdefault('MEDIGUARD_TRACKER_DB', os.path.join(workdir, 'tracker.db'))
+    os.environ.setdefault('MEDIGUARD_AUDIT_DIR', os.path.join(workdir, 'audit'))
+    os.environ.setdefault('MEDIGUARD_SESSION_DIR', os.path.join(workdir, 'sessions'))
+
+    # Pay the one-off engine and snapshot load before measuring
+    run_level(1, 1, args.timeout)
+    baseline_rss = rss_bytes()
+
+    print(f"{os.cpu_count()} CPUs, {args.rounds} rounds per session")
+    print(f"{'sessions':>8} {'reruns':>7} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'service ms':>11} {'peak state KiB':>15} {'RSS MiB':>8} {'errors':>7}")
+    by_step = {}
+    failed = False
+    for count in args.sessions:
+        sessions, elapsed, failures = run_level(count, args.rounds, args.timeout)
+        latencies = [value for session in sessions for values in session.latencies.values() for value in values]
+        errors = [error for session in sessions for error in session.errors] + failures
+        service = [value for session in sessions for value in session.service]
+        peak_state = max(session.peak_state_bytes for session in sessions)
+        print(f"{count:>8} {len(latencies):>7} {len(latencies) / elapsed:>9.1f} "
+              f"{percentile(latencies, 0.50) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.1f} {statistics.fmean(service) * 1000:>11.1f} "
+              f"{peak_state / 1024:>15.1f} "
+              f"{rss_bytes() / (1 << 20):>8.1f} {len(errors):>7}")
+        for error in errors[:3]:
+            print(f"  {error}")
+        failed = failed or bool(errors)
+        by_step[count] = {step: [value for session in sessions for value in session.latencies[step]]
+                          for step in STEPS}
+
+    print(f"\nRSS before the measured runs: {baseline_rss / (1 << 20):.1f} MiB")
+    print("\nrerun latency by interaction, p50 / p95 ms")
+    print(f"{'interaction':>12} " + ' '.join(f"{f'{count} sessions':>16}" for count in args.sessions))
+    for step in STEPS:
+        cells = [f"{percentile(by_step[count][step], 0.50) * 1000:7.1f} /"
+                 f"{percentile(by_step[count][step], 0.95) * 1000:7.1f}"
+                 for count in args.sessions]
+        print(f"{step:>12} " + ' '.join(f"{cell:>16}" for cell in cells))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
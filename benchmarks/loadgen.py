@@ -0,0 +1,134 @@
+"""Closed-loop load generator for the triage HTTP service.
+
+Opens ``--concurrency`` keep-alive connections, each sending requests back to
+back for ``--duration`` seconds, and reports throughput and p50/p99 latency.
+With ``--spawn`` a service is started in a subprocess for the run.
+
+    python benchmarks/loadgen.py --spawn --endpoint assess --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUICK_SELECT = [
+    "Fever", "Cough", "Headache", "Chest Pain", "Shortness of Breath", "Dizziness", "Nausea", "Sore Throat",
+    "Muscle Pain", "Runny Nose", "Fatigue", "Vomiting", "Rash", "Abdominal Pain", "Chills", "Sneezing",
+]
+CHAT_MESSAGES = ["Hello", "What should I do for fever?", "I have a headache", "Give me health tips",
+                 "my chest pain is getting worse", "can you suggest something for a cough"]
+
+
+def make_payload(endpoint, rng):
+    if endpoint == 'chat':
+        return {'message': rng.choice(CHAT_MESSAGES)}
+    return {'symptoms': rng.sample(QUICK_SELECT, rng.randint(1, 4)),
+            'age_group': rng.choice(["18-30", "31-50"]), 'gender': rng.choice(["Male", "Female"])}
+
+
+async def client(host, port, endpoint, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            body = json.dumps(make_payload(endpoint, rng)).encode('utf-8')
+            request = (f"POST /{endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status_line:
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+
+async def run(host, port, endpoint, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, endpoint, deadline, latencies, errors, seed) for seed in range(concurrency)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"service did not start on {host}:{port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the MediGuard AI triage service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--endpoint', choices=['assess', 'chat'], default='assess')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds to generate load")
+    parser.add_argument('--spawn', action='store_true', help="start a service subprocess for the run")
+    parser.add_argument('--max-batch', type=int, default=64, help="passed to the spawned service")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="passed to the spawned service")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'mediguard.service', '--host', args.host, '--port', str(args.port),
+             '--max-batch', str(args.max_batch), '--max-wait-ms', str(args.max_wait_ms)],
+            cwd=ROOT, stdout=subprocess.DEVNULL,
+        )
+    try:
+        wait_for_port(args.host, args.port)
+        latencies, errors, elapsed = asyncio.run(
+            run(args.host, args.port, args.endpoint, args.concurrency, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if not latencies:
+        print("no requests completed")
+        return 1
+    print(f"endpoint     /{args.endpoint} (concurrency {args.concurrency})")
+    print(f"requests     {len(latencies)} ({len(errors)} errors)")
+    print(f"throughput   {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50  {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"latency p99  {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"latency mean {statistics.fmean(latencies) * 1000:.2f} ms")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""Offline benchmark suite for the MediGuard AI hot paths.
+
+Covers differential assessment, chat intent routing, free-text symptom
+extraction (whole texts and keystroke by keystroke), typo correction against
+large vocabularies, nearest-facility queries, knowledge compilation versus
+snapshot loading, symptom-tracker analytics over years of daily entries,
+streaming history export and import, and full Streamlit reruns of ``app1.py``
+driven by ``AppTest``.
+Each case is parametrised by knowledge-base size, input length or chat
+history length. Results are written as JSON and, when a baseline exists,
+compared against it; a case slower than the baseline by more than the
+tolerance is reported as a regression and the exit status is 1.
+
+    python benchmarks/run.py                      # run, compare with baseline.json
+    python benchmarks/run.py --save-baseline      # record a new baseline
+    python benchmarks/run.py --filter extract --quick
+"""
+
+import argparse
+import copy
+import datetime
+import functools
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from bench_chat_router import build_intents  # noqa: E402
+from mediguard import export, kb  # noqa: E402
+from mediguard.analytics import SymptomAnalytics  # noqa: E402
+from mediguard.facilities import CAPABILITIES, Facility, FacilityIndex  # noqa: E402
+from mediguard.fuzzy import TrigramIndex  # noqa: E402
+from mediguard.knowledge import DEFAULT_KNOWLEDGE_PATH, MEDICAL_KNOWLEDGE  # noqa: E402
+from mediguard.lexicon import IncrementalExtractor, SymptomLexicon  # noqa: E402
+from mediguard.router import IntentRouter  # noqa: E402
+from mediguard.scoring import DifferentialScorer  # noqa: E402
+from mediguard.tracker import SEVERITY_LEVELS, SymptomStore  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(HERE, 'results', 'latest.json')
+
+KB_SCALES = [1, 10, 100]
+SYMPTOM_COUNTS = [1, 4, 16]
+TEXT_LENGTHS = [100, 1000, 10000]
+MESSAGE_WORDS = [3, 30, 300]
+HISTORY_LENGTHS = [0, 100, 1000]
+VOCABULARY_SIZES = [5000, 50000]
+FACILITY_COUNTS = [1000, 100000]
+TRACKER_YEARS = [1, 10]
+
+SYLLABLES = ("ba be bi bo bu ca ce ci co da de di do fa fe fi ga ge go ha he hi ka ke ko la le li lo lu ma me mi "
+             "mo na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti to va ve vi wa we ya zo").split()
+
+FILLER = ("i have been feeling unwell since yesterday morning and my family says i look tired "
+          "so i wanted to check whether this is something to worry about").split()
+
+# (group, generator) pairs; each generator yields (name, ops per call, setup)
+# where setup() prepares the case and returns the callable to time
+BENCHMARKS = []
+
+
+def benchmark(group):
+    def register(fn):
+        BENCHMARKS.append((group, fn))
+        return fn
+    return register
+
+
+def synthetic_knowledge(scale):
+    """MEDICAL_KNOWLEDGE padded to ``scale`` times its symptoms and conditions."""
+    knowledge = copy.deepcopy(MEDICAL_KNOWLEDGE)
+    rng = random.Random(scale)
+    for risk_level, tier in knowledge.items():
+        base_symptoms = list(tier['symptoms'])
+        extra = [f"{risk_level.split('_')[0]} marker {i}" for i in range(len(base_symptoms) * (scale - 1))]
+        tier['symptoms'] = base_symptoms + extra
+        for i in range(len(tier['profiles']) * (scale - 1)):
+            picked = rng.sample(tier['symptoms'], min(4, len(tier['symptoms'])))
+            tier['profiles'][f"{risk_level} condition {i}"] = {symptom: rng.choice([0.3, 0.6, 1.0])
+                                                              for symptom in picked}
+    return knowledge
+
+
+def tracked_symptoms(count=8):
+    """The first ``count`` distinct symptom names across the knowledge tiers."""
+    names = dict.fromkeys(symptom for tier in MEDICAL_KNOWLEDGE.values() for symptom in tier['symptoms'])
+    return list(names)[:count]
+
+
+@functools.lru_cache(maxsize=None)
+def build_scorer(scale):
+    knowledge = synthetic_knowledge(scale)
+    terms = {}
+    for risk_level in reversed(SymptomLexicon.TIER_ORDER):
+        for symptom in knowledge[risk_level]['symptoms']:
+            terms[symptom] = risk_level
+    lexicon = SymptomLexicon(terms)
+    return DifferentialScorer(knowledge, lexicon, version=f'bench-{scale}'), knowledge
+
+
+def narrative(length, symptoms, rng):
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(symptoms) if rng.random() < 0.1 else rng.choice(FILLER))
+    return ' '.join(words)[:length]
+
+
+@benchmark('assess')
+def bench_assess(quick):
+    for scale in KB_SCALES[:2] if quick else KB_SCALES:
+        scorer, knowledge = build_scorer(scale)
+        vocabulary = [symptom for tier in knowledge.values() for symptom in tier['symptoms']]
+        rng = random.Random(0)
+        for count in SYMPTOM_COUNTS:
+            patients = [rng.sample(vocabulary, min(count, len(vocabulary))) for _ in range(256)]
+            yield (f"assess[kb={scale}x,symptoms={count}]", len(patients),
+                   lambda patients=patients: lambda: scorer.assess_batch(patients))
+
+
+@benchmark('chat')
+def bench_chat(quick):
+    rng = random.Random(0)
+    for scale in KB_SCALES[:2] if quick else KB_SCALES:
+        router = IntentRouter(build_intents(scale))
+        for words in MESSAGE_WORDS:
+            messages = [' '.join(rng.choice(FILLER) for _ in range(words)) + ' fever' for _ in range(64)]
+            yield (f"chat[kb={scale}x,words={words}]", len(messages),
+                   lambda messages=messages: lambda: [router.route(message) for message in messages])
+
+
+@benchmark('extract')
+def bench_extract(quick):
+    rng = random.Random(0)
+    for scale in KB_SCALES[:2] if quick else KB_SCALES:
+        scorer, knowledge = build_scorer(scale)
+        vocabulary = [symptom for tier in knowledge.values() for symptom in tier['symptoms']]
+        for length in TEXT_LENGTHS:
+            text = narrative(length, vocabulary, rng)
+            yield f"extract[kb={scale}x,chars={length}]", 1, lambda text=text: lambda: scorer.lexicon.extract(text)
+
+
+@benchmark('typing')
+def bench_typing(quick):
+    # The last 32 characters typed one at a time onto a long description
+    rng = random.Random(0)
+    scorer, knowledge = build_scorer(1)
+    vocabulary = [symptom for tier in knowledge.values() for symptom in tier['symptoms']]
+    for length in TEXT_LENGTHS:
+        text = narrative(length + 32, vocabulary, rng)
+
+        def setup(text=text, length=length):
+            extractor = IncrementalExtractor()
+            extractor.update(text[:length], scorer.lexicon)
+
+            def type_tail():
+                extractor.update(text[:length], scorer.lexicon)
+                for end in range(length + 1, len(text) + 1):
+                    extractor.update(text[:end], scorer.lexicon)
+                    extractor.extract()
+            return type_tail
+        yield f"typing[chars={length}]", 32, setup
+
+
+def synthetic_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 6))))
+    return sorted(words)
+
+
+def misspell(word, rng):
+    # One substitution, insertion or deletion, never on the first letter
+    i = rng.randrange(1, len(word))
+    edit = rng.choice('sid')
+    if edit == 's':
+        return word[:i] + rng.choice('xqjz') + word[i + 1:]
+    if edit == 'i':
+        return word[:i] + rng.choice('xqjz') + word[i:]
+    return word[:i] + word[i + 1:]
+
+
+@benchmark('fuzzy')
+def bench_fuzzy(quick):
+    rng = random.Random(0)
+    for size in VOCABULARY_SIZES[:1] if quick else VOCABULARY_SIZES:
+        def setup(size=size):
+            vocabulary = synthetic_vocabulary(size, rng)
+            index = TrigramIndex(vocabulary)
+            queries = [misspell(word, rng) for word in rng.sample([w for w in vocabulary if len(w) >= 5], 256)]
+            return lambda: [index.lookup(query, min(2, (len(query) - 3) // 2)) for query in queries]
+        yield f"fuzzy[vocab={size}]", 256, setup
+
+
+@benchmark('facilities')
+def bench_facilities(quick):
+    rng = random.Random(0)
+
+    def setup(count, require):
+        # Scattered over India; trauma centres are rare, the rest common
+        facilities = [
+            Facility(str(i), f"facility {i}", rng.uniform(8, 35), rng.uniform(68, 97), '', frozenset(
+                capability for capability in CAPABILITIES
+                if rng.random() < (0.05 if capability == 'trauma_center' else 0.4)))
+            for i in range(count)
+        ]
+        index = FacilityIndex(facilities)
+        queries = [(rng.uniform(8, 35), rng.uniform(68, 97)) for _ in range(256)]
+        return lambda: [index.nearest(lat, lon, 3, require) for lat, lon in queries]
+
+    for count in FACILITY_COUNTS[:1] if quick else FACILITY_COUNTS:
+        for require in ((), ('trauma_center',)):
+            name = f"nearest[facilities={count},{'+'.join(require) or 'any'}]"
+            yield name, 256, lambda count=count, require=require: setup(count, require)
+
+
+@benchmark('kb')
+def bench_kb(quick):
+    workdir = tempfile.mkdtemp(prefix='mediguard-bench-')
+
+    def write_source(scale):
+        with open(DEFAULT_KNOWLEDGE_PATH, encoding='utf-8') as handle:
+            tables = json.load(handle)
+        tables['medical_knowledge'] = synthetic_knowledge(scale)
+        path = os.path.join(workdir, f'knowledge-{scale}x.json')
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(tables, handle)
+        return path
+
+    def compile_setup(scale):
+        path = write_source(scale)
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        return lambda: kb.KnowledgeSnapshot(kb.parse_source(data, path), 'bench')
+
+    def snapshot_setup(scale):
+        path = write_source(scale)
+        kb.load(path, workdir)  # writes the snapshot the timed loads read back
+        return lambda: kb.load(path, workdir)
+
+    for scale in KB_SCALES[:2] if quick else KB_SCALES:
+        yield f"kb_load[kb={scale}x,from=source]", 1, lambda scale=scale: compile_setup(scale)
+        yield f"kb_load[kb={scale}x,from=snapshot]", 1, lambda scale=scale: snapshot_setup(scale)
+
+
+@benchmark('tracker')
+def bench_tracker(quick):
+    workdir = tempfile.mkdtemp(prefix='mediguard-bench-')
+    rng = random.Random(0)
+    end = datetime.date(2026, 1, 1)
+    symptoms = tracked_symptoms()
+
+    def history(years):
+        # About three entries a day over a handful of recurring symptoms
+        store = SymptomStore(os.path.join(workdir, f'tracker-{years}y.db'), batch_size=1 << 20)
+        for day in range(365 * years):
+            for symptom in rng.sample(symptoms, 3):
+                store.add('bench', symptom, rng.choice(SEVERITY_LEVELS), end - datetime.timedelta(days=day))
+        store.flush()
+        return store
+
+    def build_setup(years):
+        store = history(years)
+        return lambda: SymptomAnalytics('bench').refresh(store)
+
+    def view_setup(years):
+        store = history(years)
+        analytics = SymptomAnalytics('bench')
+
+        def view():
+            # One rerun: pick up new entries, then the 365-day table and chart
+            analytics.refresh(store)
+            analytics.summary(end, 365)
+            analytics.rolling(end, 365, 7)
+        return view
+
+    for years in TRACKER_YEARS[:1] if quick else TRACKER_YEARS:
+        yield f"tracker_build[years={years}]", 1, lambda years=years: build_setup(years)
+        yield f"tracker_view[years={years},days=365]", 1, lambda years=years: view_setup(years)
+
+
+@benchmark('history')
+def bench_export(quick):
+    workdir = tempfile.mkdtemp(prefix='mediguard-bench-')
+    rng = random.Random(0)
+    end = datetime.date(2026, 1, 1)
+    symptoms = tracked_symptoms()
+
+    def history(years):
+        store = SymptomStore(os.path.join(workdir, f'export-{years}y.db'), batch_size=1 << 20)
+        for day in range(365 * years):
+            for symptom in rng.sample(symptoms, 3):
+                store.add('bench', symptom, rng.choice(SEVERITY_LEVELS), end - datetime.timedelta(days=day))
+        store.flush()
+        return store
+
+    def export_setup(years, fmt):
+        store = history(years)
+        return lambda: sum(map(len, export.export(fmt, (), store, 'bench')))
+
+    def import_setup(years, fmt):
+        blob = b''.join(export.export(fmt, (), history(years), 'bench'))
+        path = os.path.join(workdir, f'import-{years}y.db')
+
+        def run():
+            # Every call imports into an empty store; reusing one would grow
+            # it, and the cost of each insert, from call to call
+            store = SymptomStore(path, batch_size=1 << 20)
+            try:
+                export.import_history(io.BytesIO(blob), store=store, user_id='import')
+            finally:
+                store.close()
+                os.remove(path)
+        return run
+
+    for years in TRACKER_YEARS[:1] if quick else TRACKER_YEARS:
+        for fmt in export.FORMATS:
+            yield (f"history_export[years={years},format={fmt}]", 1,
+                   lambda years=years, fmt=fmt: export_setup(years, fmt))
+            yield (f"history_import[years={years},format={fmt}]", 1,
+                   lambda years=years, fmt=fmt: import_setup(years, fmt))
+
+
+@benchmark('rerun')
+def bench_rerun(quick):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("skipping rerun benchmarks: streamlit is not installed")
+        return
+    from mediguard.history import ChatHistory
+    from mediguard.sessions import get_session_manager
+
+    def setup(length):
+        app = AppTest.from_file(os.path.join(ROOT, 'app1.py'), default_timeout=60)
+        app.run()
+        app.checkbox(key='disclaimer').check().run()
+        app.radio(key='section').set_value("🤖 AI Assistant").run()
+
+        history = ChatHistory(capacity=max(length, 1))
+        for i in range(length):
+            history.append('user' if i % 2 else 'assistant', f"message {i}")
+        with get_session_manager().session(app.session_state['session_id']) as data:
+            data['chat_history'] = history
+        return app.run
+
+    for length in HISTORY_LENGTHS[:2] if quick else HISTORY_LENGTHS:
+        yield f"rerun[section=assistant,history={length}]", 1, lambda length=length: setup(length)
+
+
+def measure(fn, ops, rounds, min_round_seconds):
+    fn()  # warm caches and lazy compilation outside the timed rounds
+    samples = []
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_round_seconds:
+                break
+        samples.append(elapsed / (calls * ops) * 1e6)
+    median_us = statistics.median(samples)
+    return {
+        'median_us': round(median_us, 3),
+        'min_us': round(min(samples), 3),
+        'ops_per_s': round(1e6 / median_us, 1),
+        'rounds': rounds,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        ratio = result['median_us'] / reference['median_us']
+        result['vs_baseline'] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MediGuard AI benchmark suite.")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="skip the largest parameter values")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--min-round-seconds', type=float, default=0.2)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against the baseline before flagging (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="also write the results as the baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for group, cases in BENCHMARKS:
+        for name, ops, setup in cases(args.quick):
+            if args.filter not in name:
+                continue
+            results[name] = measure(setup(), ops, args.rounds, args.min_round_seconds)
+            print(f"{name:<45} {results[name]['median_us']:>12.2f} us/op {results[name]['ops_per_s']:>14,.0f} op/s")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"baseline written to {args.baseline}")
+
+    for name, ratio in regressions:
+        print(f"REGRESSION {name}: {ratio:.2f}x baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
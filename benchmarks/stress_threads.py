@@ -0,0 +1,125 @@
+"""Multi-threaded stress test for the shared engine.
+
+Every worker thread replays the same mixed workload of assessments, chat
+replies and free-text extractions against one shared ``MediGuardAI``, the way
+Streamlit's threaded server drives it, and every result is compared with a
+single-threaded reference run. Any difference is reported as a determinism
+failure and the exit status is 1. Throughput is printed per thread count so
+scaling can be compared between releases. The same determinism check runs
+with the test suite in ``tests/test_concurrency.py``.
+
+    python benchmarks/stress_threads.py --threads 1 2 4 8 --requests 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mediguard import AssessmentCache, MediGuardAI  # noqa: E402
+
+SYMPTOMS = [
+    "Fever", "Cough", "Headache", "Chest Pain", "Shortness of Breath", "Dizziness", "Nausea", "Sore Throat",
+    "Muscle Pain", "Runny Nose", "Fatigue", "Vomiting", "Rash", "Abdominal Pain", "Chills", "Sneezing",
+]
+MESSAGES = ["Hello", "What should I do for fever?", "I have a headache", "Give me health tips",
+            "my chest pain is getting worse", "can you suggest something for a cough", "thanks, bye"]
+NARRATIVES = ["I have a headake and feaver since morning", "feeling breathless and dizzy after climbing stairs",
+              "sore throat, runny nose and a bit of coughing", "my son has a mild rash and high fever"]
+
+
+def build_workload(count, seed=0):
+    rng = random.Random(seed)
+    workload = []
+    for i in range(count):
+        kind = rng.choice(('assess', 'chat', 'extract'))
+        if kind == 'assess':
+            workload.append(('assess', rng.sample(SYMPTOMS, rng.randint(1, 4)), rng.choice(["18-30", "31-50"])))
+        elif kind == 'chat':
+            workload.append(('chat', rng.choice(MESSAGES), f"session-{i % 17}:{i}"))
+        else:
+            workload.append(('extract', rng.choice(NARRATIVES), None))
+    return workload
+
+
+def run_one(engine, item):
+    kind, payload, extra = item
+    if kind == 'assess':
+        assessment = engine.assess(payload, age_group=extra)
+        return assessment.risk_level, assessment.condition, assessment.ranked
+    if kind == 'chat':
+        return engine.chat_response(payload, seed=extra)
+    return tuple(engine.knowledge.lexicon.extract(payload))
+
+
+def run_threads(engine, workload, reference, threads):
+    mismatches = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        # Each thread starts at a different point so threads hit different
+        # items at the same moment
+        barrier.wait()
+        for step in range(len(workload)):
+            index = (offset + step) % len(workload)
+            result = run_one(engine, workload[index])
+            if result != reference[index]:
+                mismatches.append((index, workload[index], result, reference[index]))
+
+    pool = [threading.Thread(target=worker, args=(n * len(workload) // threads,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * len(workload) / elapsed, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-threaded determinism and throughput check for the engine.")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests', type=int, default=2000, help="workload size replayed by every thread")
+    parser.add_argument('--no-cache', action='store_true', help="disable the assessment cache")
+    args = parser.parse_args(argv)
+
+    engine = MediGuardAI(cache=AssessmentCache(0) if args.no_cache else None)
+    workload = build_workload(args.requests)
+    # The reference run gets its own engine and no assessment cache
+    reference_engine = MediGuardAI(cache=AssessmentCache(0))
+    reference = [run_one(reference_engine, item) for item in workload]
+
+    # Warm the shared caches so the first thread count is not penalised
+    for item in workload:
+        run_one(engine, item)
+    # Global random state must not leak into results
+    random.seed(12345)
+
+    failed = False
+    base = None
+    # Pure-Python sections hold the GIL, so scaling is bounded by the CPUs
+    # and by how much time numpy spends with the GIL released
+    print(f"{os.cpu_count()} CPUs, {args.requests} requests per thread")
+    print(f"{'threads':>7} {'req/s':>12} {'scaling':>8} {'mismatches':>11}")
+    for threads in args.threads:
+        throughput, mismatches = run_threads(engine, workload, reference, threads)
+        base = base or throughput
+        print(f"{threads:>7} {throughput:>12,.0f} {throughput / base:>7.2f}x {len(mismatches):>11}")
+        for index, item, got, expected in mismatches[:5]:
+            print(f"  item {index} {item}: got {got!r}, expected {expected!r}")
+        failed = failed or bool(mismatches)
+
+    if failed:
+        print("FAIL: results differed between threads")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
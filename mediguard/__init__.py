@@ -0,0 +1,30 @@
+"""Headless MediGuard AI triage engine.
+
+Nothing in this package imports Streamlit, so the engine and its tables can be
+used from workers, scripts and tests without the UI stack.
+"""
+
+from .cache import AssessmentCache
+from .engine import MediGuardAI
+from .lexicon import SymptomLexicon, get_lexicon
+
+__all__ = [
+    'AI_ASSISTANT_RESPONSES',
+    'AssessmentCache',
+    'FIRST_AID',
+    'HOME_REMEDIES',
+    'MEDICAL_KNOWLEDGE',
+    'MediGuardAI',
+    'SymptomLexicon',
+    'get_lexicon',
+]
+
+_TABLES = ('AI_ASSISTANT_RESPONSES', 'FIRST_AID', 'HOME_REMEDIES', 'MEDICAL_KNOWLEDGE')
+
+
+def __getattr__(name):
+    # The default tables are read from disk only when first asked for
+    if name in _TABLES:
+        from . import knowledge
+        return getattr(knowledge, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
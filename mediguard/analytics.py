@@ -0,0 +1,215 @@
+"""Columnar symptom-tracker analytics.
+
+A user's history is folded into two (symptoms x days) matrices: entry
+counts and summed severity per symptom per day. New entries are fetched by
+id and added with ``np.add.at``, so a rerun after one new entry costs one
+indexed query and a few array updates however long the history is. Every
+statistic is then a handful of whole-array operations on those matrices:
+
+* frequency: row sums over the requested window
+* streaks: runs of consecutive days found from the row-wise ``diff`` of the
+  presence matrix
+* severity trend: least-squares slope of severity over time, from weighted
+  row sums
+* rolling windows: differences of the cumulative daily totals
+
+Memory per profile is bounded: the matrices cover the ``WINDOW_DAYS`` days
+up to the newest entry (never later than tomorrow) and slide forward as new
+days arrive, so older or far-future entries are left out. Only the first
+``MAX_SYMPTOM_ROWS`` distinct symptom names get a row of their own; any
+further names are counted together under ``OTHER_SYMPTOM``.
+"""
+
+import collections
+import datetime
+import threading
+
+import numpy as np
+
+from .tracker import SEVERITY_LEVELS
+
+# Severity label -> score used for means and trends; unknown labels count as the middle level
+SEVERITY_SCORES = {label: score for score, label in enumerate(SEVERITY_LEVELS, 1)}
+_DEFAULT_SCORE = (len(SEVERITY_LEVELS) + 1) / 2
+
+# Days covered: the longest range the tracker shows plus a week of lead-in for rolling means
+WINDOW_DAYS = 400
+MAX_SYMPTOM_ROWS = 32
+OTHER_SYMPTOM = 'Other'
+
+SymptomSummary = collections.namedtuple(
+    'SymptomSummary', 'symptom count current_streak longest_streak mean_severity severity_trend')
+
+
+class SymptomAnalytics:
+    """Incrementally maintained analytics for one tracker profile."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.last_id = 0
+        self.symptoms = []          # row -> symptom name
+        self._rows = {}             # normalised symptom -> row
+        self._other_row = None      # shared row once MAX_SYMPTOM_ROWS names are in use
+        self._origin = None         # date of column 0
+        self._counts = np.zeros((0, WINDOW_DAYS), dtype=np.int32)
+        self._severity = np.zeros((0, WINDOW_DAYS), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def refresh(self, store):
+        """Fold in entries added since the last refresh; returns how many."""
+        with self._lock:
+            rows = store.entries_after(self.user_id, self.last_id)
+            if rows:
+                self._add(rows)
+            return len(rows)
+
+    def _add(self, rows):
+        ids, dates, symptoms, severities = zip(*rows)
+        self.last_id = max(self.last_id, max(ids))
+        ordinals = np.fromiter((datetime.date.fromisoformat(d).toordinal() for d in dates), dtype=np.int64,
+                               count=len(dates))
+
+        latest = min(int(ordinals.max()), datetime.date.today().toordinal() + 1)
+        if self._origin is None:
+            self._origin = latest - WINDOW_DAYS + 1
+        elif latest >= self._origin + WINDOW_DAYS:
+            self._slide(latest - WINDOW_DAYS + 1 - self._origin)
+        columns = ordinals - self._origin
+        keep = np.flatnonzero((columns >= 0) & (columns < WINDOW_DAYS))
+        if not len(keep):
+            return
+
+        row_index = np.fromiter((self._row(symptoms[i]) for i in keep.tolist()), dtype=np.int64, count=len(keep))
+        self._ensure_rows(len(self.symptoms))
+        scores = np.fromiter((SEVERITY_SCORES.get(severities[i], _DEFAULT_SCORE) for i in keep.tolist()),
+                             dtype=np.float32, count=len(keep))
+        np.add.at(self._counts, (row_index, columns[keep]), 1)
+        np.add.at(self._severity, (row_index, columns[keep]), scores)
+
+    def _row(self, symptom):
+        key = symptom.strip().lower()
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if len(self._rows) < MAX_SYMPTOM_ROWS:
+            row = self._rows[key] = len(self.symptoms)
+            self.symptoms.append(symptom.strip())
+            return row
+        if self._other_row is None:
+            self._other_row = len(self.symptoms)
+            self.symptoms.append(OTHER_SYMPTOM)
+        return self._other_row
+
+    def _slide(self, shift):
+        # Move the window ``shift`` days forward, dropping the oldest columns
+        if shift < WINDOW_DAYS:
+            self._counts[:, :-shift] = self._counts[:, shift:]
+            self._severity[:, :-shift] = self._severity[:, shift:]
+        self._counts[:, -shift:] = 0
+        self._severity[:, -shift:] = 0
+        self._origin += shift
+
+    def _ensure_rows(self, rows):
+        capacity = len(self._counts)
+        if rows <= capacity:
+            return
+        # Grow geometrically so new symptoms stay amortised O(1)
+        pad = ((0, min(max(rows, capacity * 2, 8), MAX_SYMPTOM_ROWS + 1) - capacity), (0, 0))
+        self._counts = np.pad(self._counts, pad)
+        self._severity = np.pad(self._severity, pad)
+
+    def _window(self, end, days):
+        """Counts and severity matrices covering ``days`` days up to ``end``, zero-filled."""
+        rows = len(self.symptoms)
+        counts = np.zeros((rows, days), dtype=np.int32)
+        severity = np.zeros((rows, days), dtype=np.float64)
+        if self._origin is None:
+            return counts, severity
+        last = end.toordinal() - self._origin          # column of ``end``
+        first = last - days + 1
+        lo, hi = max(first, 0), min(last + 1, WINDOW_DAYS)
+        if lo < hi:
+            counts[:, lo - first:hi - first] = self._counts[:rows, lo:hi]
+            severity[:, lo - first:hi - first] = self._severity[:rows, lo:hi]
+        return counts, severity
+
+    def summary(self, end=None, days=30):
+        """One ``SymptomSummary`` per symptom seen in the window, most frequent first.
+
+        Streaks count consecutive days with at least one entry; the current
+        streak is the run reaching ``end``. ``severity_trend`` is the change
+        in severity score per week (positive = worsening).
+        """
+        end = end or datetime.date.today()
+        with self._lock:
+            counts, severity = self._window(end, days)
+
+        frequency = counts.sum(axis=1)
+        present = counts > 0
+
+        # Runs of consecutive days: +1 where a run starts, -1 after it ends
+        edges = np.diff(np.pad(present.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+        lengths = end_cols - start_cols
+        longest = np.zeros(len(frequency), dtype=np.int64)
+        np.maximum.at(longest, start_rows, lengths)
+        current = np.zeros(len(frequency), dtype=np.int64)
+        reaching_end = end_cols == days
+        current[start_rows[reaching_end]] = lengths[reaching_end]
+
+        # Weighted least squares of severity against day index
+        x = np.arange(days, dtype=np.float64)
+        n = frequency.astype(np.float64)
+        sum_x = counts @ x
+        sum_y = severity.sum(axis=1)
+        sum_xy = severity @ x
+        sum_xx = counts @ (x * x)
+        denominator = n * sum_xx - sum_x * sum_x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, sum_y / n, 0.0)
+            slope = np.where(denominator > 0, (n * sum_xy - sum_x * sum_y) / denominator, 0.0)
+
+        order = np.argsort(-frequency, kind='stable')
+        return [
+            SymptomSummary(self.symptoms[row], int(frequency[row]), int(current[row]), int(longest[row]),
+                           round(float(mean[row]), 2), round(float(slope[row]) * 7, 3))
+            for row in order if frequency[row] > 0
+        ]
+
+    def rolling(self, end=None, days=30, window=7):
+        """``(dates, totals, rolling_mean)`` of entries per day over ``days`` days.
+
+        ``rolling_mean`` averages each day with the ``window - 1`` days
+        before it, including days from before the range.
+        """
+        end = end or datetime.date.today()
+        with self._lock:
+            counts, _ = self._window(end, days + window - 1)
+        totals = counts.sum(axis=0)
+        cumulative = np.concatenate(([0], np.cumsum(totals)))
+        rolling_mean = (cumulative[window:] - cumulative[:-window]) / window
+        start = end - datetime.timedelta(days=days - 1)
+        dates = [start + datetime.timedelta(days=i) for i in range(days)]
+        return dates, totals[window - 1:].tolist(), rolling_mean.tolist()
+
+
+class AnalyticsCache:
+    """Per-profile ``SymptomAnalytics`` kept across reruns, least recently used evicted."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, store, user_id):
+        """Analytics for ``user_id``, refreshed with any new entries."""
+        with self._lock:
+            analytics = self._entries.get(user_id)
+            if analytics is None:
+                analytics = self._entries[user_id] = SymptomAnalytics(user_id)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        analytics.refresh(store)
+        return analytics
@@ -0,0 +1,247 @@
+"""Append-only audit log of triage decisions.
+
+``record`` only puts the event on a bounded in-memory queue and returns; a
+daemon thread drains the queue in batches, serialises the events as JSON
+lines and appends them to ``audit.jsonl`` in the log directory. The active
+file is rotated when it reaches ``max_bytes`` or is older than ``max_age``
+seconds: it is renamed with its opening timestamp and gzip-compressed, still
+on the writer thread.
+
+Several processes may share the log directory (the app and
+``mediguard.service`` both default to ``./mediguard_audit``). Every batch
+is appended, and every rotation done, under an advisory lock on
+``audit.lock`` in the directory. A writer whose open file has meanwhile
+been rotated away by another process reopens the active file before
+writing. Rotated files are named with the rotating process's pid and a
+random suffix, so they never overwrite each other. Without ``fcntl``
+(Windows) there is no lock; give each process its own directory there.
+
+A caller is never blocked. If the queue is full (the disk cannot keep up)
+the event is dropped and counted in ``dropped`` and in the
+``mediguard_audit_dropped_total`` metric.
+
+    MEDIGUARD_AUDIT_DIR=/var/log/mediguard  log directory (default ./mediguard_audit; "0" disables)
+    MEDIGUARD_AUDIT_MAX_BYTES=67108864      rotate after this many bytes
+    MEDIGUARD_AUDIT_MAX_AGE=86400           rotate after this many seconds
+"""
+
+import atexit
+import contextlib
+import datetime
+import functools
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIT_DIR = 'mediguard_audit'
+ACTIVE_NAME = 'audit.jsonl'
+LOCK_NAME = 'audit.lock'
+
+
+class AuditLog:
+    def __init__(self, directory=DEFAULT_AUDIT_DIR, max_bytes=64 << 20, max_age=86400.0, batch_size=256,
+                 flush_interval=1.0, queue_size=65536):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.rotations = 0
+        self._queue = queue.Queue(queue_size)
+        self._handle = None
+        self._opened_at = None
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._writer = threading.Thread(target=self._run, name='mediguard-audit', daemon=True)
+        self._writer.start()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, ACTIVE_NAME)
+
+    def record(self, event, **fields):
+        """Queue one event; never blocks and never raises on a full queue."""
+        try:
+            self._queue.put_nowait({'ts': time.time(), 'event': event, **fields})
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc('mediguard_audit_dropped_total')
+
+    def flush(self, timeout=None):
+        """Wait until every event queued so far is on disk; False on timeout."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if not self._write(batch):
+                    return
+            except Exception:
+                # Keep the writer alive; losing one batch beats losing the log
+                logger.exception("audit log write to %s failed", self.path)
+
+    def _write(self, batch):
+        """Write one batch; False once the stop sentinel has been seen."""
+        lines = []
+        waiters = []
+        running = True
+        for item in batch:
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                item['ts'] = datetime.datetime.fromtimestamp(item['ts'], datetime.timezone.utc).isoformat()
+                lines.append(json.dumps(item, ensure_ascii=False, default=str))
+        try:
+            if lines:
+                with self._locked():
+                    rotated = self._maybe_rotate_locked()
+                    if self._handle is not None and not self._is_active():
+                        # Another process rotated the file we had open
+                        self._handle.close()
+                        self._handle = None
+                    if self._handle is None:
+                        self._open()
+                    self._handle.write('\n'.join(lines) + '\n')
+                    self._handle.flush()
+                if rotated:
+                    self._compress(rotated)
+                self.written += len(lines)
+                metrics.inc('mediguard_audit_events_total', len(lines))
+            if not running and self._handle is not None:
+                self._handle.close()
+                self._handle = None
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        return running
+
+    def _open(self):
+        self._opened_at = time.time()
+        try:
+            # A file left by a previous run keeps its age: read its first event
+            with open(self.path, encoding='utf-8') as existing:
+                first = existing.readline()
+            if first:
+                self._opened_at = datetime.datetime.fromisoformat(json.loads(first)['ts']).timestamp()
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as exc:
+            logger.warning("unreadable first audit event in %s: %s", self.path, exc)
+        self._handle = open(self.path, 'a', encoding='utf-8')
+
+    @contextlib.contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_NAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _is_active(self):
+        """Whether our open file is still the active file, not one rotated away."""
+        try:
+            active = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        current = os.fstat(self._handle.fileno())
+        return (active.st_dev, active.st_ino) == (current.st_dev, current.st_ino)
+
+    def _maybe_rotate(self):
+        if self._handle is None:
+            return
+        with self._locked():
+            rotated = self._maybe_rotate_locked()
+        if rotated:
+            self._compress(rotated)
+
+    def _maybe_rotate_locked(self):
+        """Rename the active file away if it is due; returns the new name, or None."""
+        if self._handle is None:
+            return None
+        if not self._is_active():
+            # Already rotated by another process; the next write reopens
+            self._handle.close()
+            self._handle = None
+            return None
+        size = os.fstat(self._handle.fileno()).st_size
+        if size < self.max_bytes and time.time() - self._opened_at < self.max_age:
+            return None
+        self._handle.close()
+        self._handle = None
+
+        stamp = datetime.datetime.fromtimestamp(self._opened_at, datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')
+        rotated = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        os.replace(self.path, rotated)
+        self.rotations += 1
+        metrics.inc('mediguard_audit_rotations_total')
+        return rotated
+
+    def _compress(self, rotated):
+        # Done outside the lock: no process writes to the renamed file any
+        # more, as each checks under the lock that its file is the active one
+        with open(rotated, 'rb') as source, gzip.open(rotated + '.gz', 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+
+
+@functools.lru_cache(maxsize=None)
+def get_audit_log():
+    """The process-wide audit log, or None when auditing is disabled."""
+    directory = os.environ.get('MEDIGUARD_AUDIT_DIR', DEFAULT_AUDIT_DIR)
+    if directory in ('', '0'):
+        return None
+    log = AuditLog(
+        directory,
+        max_bytes=int(os.environ.get('MEDIGUARD_AUDIT_MAX_BYTES', 64 << 20)),
+        max_age=float(os.environ.get('MEDIGUARD_AUDIT_MAX_AGE', 86400)),
+    )
+    # Queued events must reach the disk when the server shuts down
+    atexit.register(log.close)
+    return log
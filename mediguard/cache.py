@@ -0,0 +1,84 @@
+"""Bounded LRU memoisation of assessments.
+
+Keys are the canonical symptom set (lower-cased, stripped, deduplicated and
+sorted) plus the age group and gender fields, so every ordering of the same
+quick-select checklist shares one entry. Entries are tied to a knowledge
+version and are dropped as soon as the engine reports a different one.
+"""
+
+import collections
+import functools
+import os
+import threading
+
+DEFAULT_CACHE_SIZE = 1024
+
+CacheStats = collections.namedtuple('CacheStats', 'hits misses evictions invalidations size maxsize')
+
+
+def canonical_key(user_symptoms, age_group=None, gender=None):
+    symptoms = tuple(sorted({symptom.lower().strip() for symptom in user_symptoms if symptom.strip()}))
+    return symptoms, age_group, gender
+
+
+class AssessmentCache:
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version:
+                self._reset(version)
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        if not self.maxsize:
+            return
+        with self._lock:
+            if version != self._version:
+                self._reset(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._reset(self._version)
+
+    def _reset(self, version):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._version = version
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, self.invalidations,
+                              len(self._entries), self.maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_cache():
+    # Process-wide cache so short-lived engine instances still share results
+    return AssessmentCache(int(os.environ.get('MEDIGUARD_CACHE_SIZE', DEFAULT_CACHE_SIZE)))
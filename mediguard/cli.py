@@ -0,0 +1,180 @@
+"""Bulk triage from the command line.
+
+Streams symptom records from JSONL or CSV files, fans them out over a process
+pool in chunks and writes one JSON result per record, in input order:
+
+    python -m mediguard intake.jsonl more.csv -o results.jsonl --workers 8
+
+JSONL records carry a ``symptoms`` field holding either a list of symptoms or
+a free-text description. CSV files need a ``symptoms`` column, with several
+symptoms separated by ``;``. An ``id`` field is copied to the output if
+present; otherwise the record is identified as ``file:line``. A record
+without symptoms, or with a symptom that is not a string, is not triaged:
+its result carries an ``error`` instead.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import sys
+
+from .engine import MediGuardAI
+
+CSV_SYMPTOM_SEPARATOR = ';'
+
+_ENGINE = None
+
+
+def iter_records(path, fmt=None, symptom_field='symptoms', id_field='id'):
+    """Yield ``{'id': ..., 'symptoms': [...]}`` dicts one at a time.
+
+    Records that cannot be triaged also carry an ``error``.
+    """
+    if fmt is None:
+        fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    source = '<stdin>' if path == '-' else path
+
+    handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for line_no, row in enumerate(reader, 2):
+                record_id = row.get(id_field) or f"{source}:{line_no}"
+                if symptom_field not in (reader.fieldnames or ()):
+                    yield {'id': record_id, 'symptoms': [], 'error': f"no '{symptom_field}' column"}
+                    continue
+                raw = row.get(symptom_field) or ''
+                symptoms = [part.strip() for part in raw.split(CSV_SYMPTOM_SEPARATOR) if part.strip()]
+                yield _checked(record_id, symptoms, symptom_field)
+        else:
+            for line_no, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield {'id': f"{source}:{line_no}", 'symptoms': [], 'error': f"invalid JSON: {exc}"}
+                    continue
+                if not isinstance(row, dict):
+                    yield {'id': f"{source}:{line_no}", 'symptoms': [], 'error': "record is not a JSON object"}
+                    continue
+                record_id = row.get(id_field, f"{source}:{line_no}")
+                raw = row.get(symptom_field)
+                if isinstance(raw, str):
+                    raw = [raw]
+                if raw is not None and not isinstance(raw, list):
+                    yield {'id': record_id, 'symptoms': [], 'error': f"'{symptom_field}' must be a string or a list"}
+                    continue
+                if raw and not all(isinstance(item, str) for item in raw):
+                    yield {'id': record_id, 'symptoms': [], 'error': f"'{symptom_field}' may only hold strings"}
+                    continue
+                yield _checked(record_id, [item.strip() for item in raw or () if item.strip()], symptom_field)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _checked(record_id, symptoms, symptom_field):
+    # Without symptoms the engine would report low risk, which is not an answer
+    if not symptoms:
+        return {'id': record_id, 'symptoms': [], 'error': f"no '{symptom_field}' given"}
+    return {'id': record_id, 'symptoms': symptoms}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def assess_chunk(chunk):
+    # One engine per worker process, reused across chunks
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = MediGuardAI()
+
+    valid = [record for record in chunk if 'error' not in record]
+    assessments = iter(_ENGINE.assess_batch([record['symptoms'] for record in valid]))
+
+    results = []
+    for record in chunk:
+        result = {'id': record['id'], 'symptoms': record['symptoms']}
+        if 'error' in record:
+            result['error'] = record['error']
+        else:
+            assessment = next(assessments)
+            result.update(
+                risk_level=assessment.risk_level,
+                condition=assessment.condition,
+                action=assessment.recommendation['action'],
+                differential=assessment.ranked,
+            )
+        results.append(result)
+    return results
+
+
+def triage(records, workers=None, chunk_size=500):
+    """Yield assessment results for ``records`` in input order.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded no
+    matter how long the input stream is.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(records, chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from assess_chunk(chunk)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(assess_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m mediguard', description='Bulk MediGuard AI triage.')
+    parser.add_argument('inputs', nargs='+', help="JSONL or CSV files ('-' reads JSONL from stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output JSONL file (default: stdout)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="input format (default: from extension)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=500, help="records per task sent to a worker")
+    parser.add_argument('--symptom-field', default='symptoms')
+    parser.add_argument('--id-field', default='id')
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be positive")
+    for path in args.inputs:
+        if path == '-':
+            continue
+        try:
+            open(path, 'rb').close()
+        except OSError as exc:
+            parser.error(f"cannot read {path}: {exc.strerror}")
+
+    records = itertools.chain.from_iterable(
+        iter_records(path, args.format, args.symptom_field, args.id_field) for path in args.inputs
+    )
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for result in triage(records, args.workers, args.chunk_size):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
@@ -0,0 +1,140 @@
+import collections
+import random
+
+from . import metrics
+from .cache import canonical_key, shared_cache
+
+ChatReply = collections.namedtuple('ChatReply', 'intent keyword response')
+
+
+class MediGuardAI:
+    def __init__(self, cache=None, knowledge_base=None):
+        # Defaults to the process-wide cache; pass AssessmentCache(0) to disable
+        self.cache = cache if cache is not None else shared_cache()
+        self._knowledge_base = knowledge_base
+
+    @property
+    def knowledge_base(self):
+        if self._knowledge_base is None:
+            # Resolved on first use so importing the engine stays cheap
+            from .kb import get_knowledge_base
+            self._knowledge_base = get_knowledge_base()
+        return self._knowledge_base
+
+    @property
+    def knowledge(self):
+        """The live ``KnowledgeSnapshot``; hold on to it for the whole request."""
+        return self.knowledge_base.current()
+
+    def memory_footprint(self):
+        """Approximate bytes held by the engine, per component.
+
+        Objects the assessment cache shares with the knowledge snapshot
+        (recommendations, condition names) are counted under ``knowledge``.
+        """
+        from .footprint import deep_sizeof
+
+        knowledge = self.knowledge
+        seen = set()
+        footprint = {
+            'lexicon': deep_sizeof(knowledge.lexicon, seen),
+            'router': deep_sizeof(knowledge.router, seen),
+            'scorer': deep_sizeof(knowledge.scorer, seen),
+        }
+        footprint['knowledge'] = deep_sizeof(knowledge, seen) + sum(footprint.values())
+        footprint['cache'] = deep_sizeof(self.cache, seen)
+        footprint['total'] = footprint['knowledge'] + footprint['cache']
+        return footprint
+
+    def assess(self, user_symptoms, top_k=3, age_group=None, gender=None):
+        """Ranked differential for one patient as an ``Assessment`` tuple."""
+        return self.assess_batch([user_symptoms], top_k, age_group, gender)[0]
+
+    @metrics.timed('mediguard_assess_seconds')
+    def assess_batch(self, batch, top_k=3, age_group=None, gender=None):
+        scorer = self.knowledge.scorer
+
+        results = [None] * len(batch)
+        misses = []
+        for i, user_symptoms in enumerate(batch):
+            key = canonical_key(user_symptoms, age_group, gender) + (top_k,)
+            results[i] = self.cache.get(key, scorer.version)
+            if results[i] is None:
+                misses.append((i, key))
+
+        if misses:
+            # Score the canonical symptom set so the cached entry fits every ordering
+            computed = scorer.assess_batch([key[0] for _, key in misses], top_k)
+            for (i, key), assessment in zip(misses, computed):
+                self.cache.put(key, assessment, scorer.version)
+                results[i] = assessment
+
+        if metrics.ENABLED:
+            metrics.inc('mediguard_assessments_total', len(batch))
+            metrics.inc('mediguard_cache_lookups_total', len(batch) - len(misses), result='hit')
+            metrics.inc('mediguard_cache_lookups_total', len(misses), result='miss')
+            for assessment in results:
+                metrics.inc('mediguard_assess_risk_level_total', risk_level=assessment.risk_level)
+        return results
+
+    def assess_symptoms(self, user_symptoms):
+        assessment = self.assess(user_symptoms)
+        return assessment.risk_level, assessment.condition, assessment.recommendation
+
+    @metrics.timed('mediguard_home_remedies_seconds')
+    def home_remedies(self, user_symptoms):
+        """``(symptom, remedy)`` for each symptom with a matching home remedy."""
+        home_remedies = self.knowledge.home_remedies
+        remedies = []
+        for symptom in user_symptoms:
+            symptom_lower = symptom.lower()
+            for key, remedy in home_remedies.items():
+                if key in symptom_lower:
+                    remedies.append((symptom, remedy))
+                    break
+        return remedies
+
+    def chat_response(self, user_message, seed=None):
+        """Reply text for one chat message; see ``chat``."""
+        return self.chat(user_message, seed).response
+
+    @metrics.timed('mediguard_chat_seconds')
+    def chat(self, user_message, seed=None):
+        """Route one chat message and reply to it as a ``ChatReply``.
+
+        The varied parts of a reply are drawn from a generator private to this
+        call, seeded with ``seed`` (an int or str) or, without one, with the
+        message itself. The same message and seed always give the same reply,
+        whatever other threads are doing.
+        """
+        knowledge = self.knowledge
+        responses = knowledge.assistant_responses
+        intent, keyword = knowledge.router.route(user_message)
+        metrics.inc('mediguard_chat_intent_total', intent=intent)
+
+        if intent == 'emergency':
+            return ChatReply(intent, keyword, responses['emergency'])
+        rng = random.Random(user_message if seed is None else seed)
+        if intent == 'symptom':
+            response = responses['symptoms'][keyword] + " " + rng.choice(responses['general_advice'])
+        elif intent == 'greeting':
+            response = rng.choice(responses['greeting'])
+        elif intent == 'health':
+            response = rng.choice(responses['general_advice'])
+        else:
+            # Default response
+            response = responses['unknown']
+        return ChatReply(intent, keyword, response)
+
+
+def _collect_cache_stats():
+    stats = shared_cache().stats()
+    metrics.set_gauge('mediguard_cache_entries', stats.size)
+    metrics.set_gauge('mediguard_cache_evictions', stats.evictions)
+    metrics.set_gauge('mediguard_cache_invalidations', stats.invalidations)
+    lookups = stats.hits + stats.misses
+    metrics.set_gauge('mediguard_cache_hit_ratio', stats.hits / lookups if lookups else 0.0)
+
+
+if metrics.ENABLED:
+    metrics.register_collector(_collect_cache_stats)
@@ -0,0 +1,398 @@
+"""Streaming export and import of a session's chat and tracker history.
+
+An export is a header record followed by the chat turns, oldest first, and
+then the tracker entries of one profile in the order they were added:
+
+    {"type": "header", "format": 1, "exported_at": "...", "profile": "..."}
+    {"type": "chat", "role": "user", "message": "..."}
+    {"type": "symptom", "date": "2026-10-18", "symptom": "Headache", "severity": "Mild"}
+
+It is written in one of two formats:
+
+* ``jsonl.gz``: one JSON record per line, gzip-compressed;
+* ``mgc``: a compact binary columnar format. After the ``MAGIC`` bytes come
+  blocks of up to ``chunk_size`` records of one type, each a ``<cII`` header
+  (kind, rows, payload bytes) and a zlib-compressed payload. Dates are
+  stored as day-number deltas, repeated strings (symptoms, severities,
+  roles) as a dictionary and codes. An ``E`` block closes the file, so a
+  truncated download is detected on import. No block expands to more than
+  ``MAX_BLOCK_BYTES``; an import refuses larger ones rather than inflate them.
+
+Both are generated as a stream of compressed chunks while the tracker is
+read ``chunk_size`` entries at a time, so memory use does not grow with the
+length of the history. ``ExportStream`` presents that stream as a read-only
+file for download buttons.
+
+``import_history`` detects the format from the first bytes and decodes it
+record by record. Every record is validated; invalid ones are skipped and
+reported, valid tracker entries are written ``chunk_size`` at a time in one
+transaction each. A file holding more than ``MAX_IMPORT_RECORDS`` records
+is cut off there with ``ValueError``; in a ``jsonl.gz`` file blank lines
+count toward that limit, and so does every byte toward ``MAX_IMPORT_BYTES``.
+Tracker dates must fall between ``EARLIEST_ENTRY_DATE`` and tomorrow (to
+allow for time zones). Imported entries are added to the profile's existing
+ones, and imported chat turns go through the session's bounded history like
+any other turn.
+"""
+
+import collections
+import datetime
+import gzip
+import io
+import itertools
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from .tracker import SEVERITY_LEVELS
+
+FORMAT_VERSION = 1
+FORMATS = ('jsonl.gz', 'mgc')
+MIME_TYPES = {'jsonl.gz': 'application/gzip', 'mgc': 'application/octet-stream'}
+
+MAGIC = b'MGCOL\x01\r\n'
+CHUNK_SIZE = 4096
+
+CHAT_ROLES = ('user', 'assistant')
+MAX_MESSAGE_CHARS = 10000
+MAX_SYMPTOM_CHARS = 100
+# Longer JSONL lines cannot hold a valid record and are skipped unread
+MAX_LINE_BYTES = 4 * MAX_MESSAGE_CHARS + 1024
+
+# Bounds on what one upload may expand to
+MAX_BLOCK_BYTES = 16 << 20
+MAX_BLOCK_ROWS = 1 << 16
+MAX_IMPORT_RECORDS = 1 << 20
+MAX_IMPORT_BYTES = 1 << 30
+
+# Older tracker dates are typos or forged; they would also stretch the
+# analytics over centuries of empty days
+EARLIEST_ENTRY_DATE = datetime.date(2000, 1, 1)
+
+ImportReport = collections.namedtuple('ImportReport', 'chat symptoms rejected errors')
+
+_BLOCK = struct.Struct('<cII')
+_COUNT = struct.Struct('<I')
+_HEADER, _CHAT, _SYMPTOM, _END = b'H', b'C', b'S', b'E'
+_KINDS = {'header': _HEADER, 'chat': _CHAT, 'symptom': _SYMPTOM}
+
+
+def iter_records(chat_turns=(), store=None, user_id=None, chunk_size=CHUNK_SIZE):
+    """The export's records: header, chat turns, then ``user_id``'s tracker entries."""
+    yield {'type': 'header', 'format': FORMAT_VERSION,
+           'exported_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+           'profile': user_id}
+    for turn in chat_turns:
+        yield {'type': 'chat', 'role': turn['role'], 'message': turn['message']}
+    if store is None:
+        return
+    after_id = 0
+    while True:
+        rows = store.entries_after(user_id, after_id, limit=chunk_size)
+        for entry_id, entry_date, symptom, severity in rows:
+            yield {'type': 'symptom', 'date': entry_date, 'symptom': symptom, 'severity': severity}
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1][0]
+
+
+def export(fmt, chat_turns=(), store=None, user_id=None, chunk_size=CHUNK_SIZE):
+    """Yield the export in ``fmt`` (one of ``FORMATS``) as chunks of bytes."""
+    records = iter_records(chat_turns, store, user_id, chunk_size)
+    if fmt == 'jsonl.gz':
+        return iter_jsonl_gz(records, chunk_size)
+    if fmt == 'mgc':
+        return iter_columnar(records, chunk_size)
+    raise ValueError(f"unknown export format {fmt!r}; expected one of {FORMATS}")
+
+
+def iter_jsonl_gz(records, chunk_size=CHUNK_SIZE):
+    # wbits=31 writes a gzip container, readable by gzip/zcat
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in _chunked(records, chunk_size):
+        lines = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in chunk)
+        data = compressor.compress(lines.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_columnar(records, chunk_size=CHUNK_SIZE):
+    yield MAGIC
+    for kind, group in itertools.groupby(records, key=lambda record: record['type']):
+        # Chat messages vary in length, so their blocks are also cut by size: an
+        # eighth of the limit in characters stays under it even as 4-byte UTF-8
+        chunks = (_chunked(group, chunk_size, MAX_BLOCK_BYTES // 8, lambda record: len(record['message']))
+                  if kind == 'chat' else _chunked(group, min(chunk_size, MAX_BLOCK_ROWS)))
+        for chunk in chunks:
+            yield _encode_block(_KINDS[kind], chunk)
+    yield _BLOCK.pack(_END, 0, 0)
+
+
+class ExportStream(io.RawIOBase):
+    """Read-only file over a stream of byte chunks, which are generated as they are read."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def read_records(handle):
+    """Yield the records of an export read from the binary file ``handle``, in either format.
+
+    Records that cannot be decoded come back as ``{'error': ...}``. A file in
+    neither format, or a damaged one, raises ``ValueError``.
+    """
+    reader = handle if hasattr(handle, 'peek') else io.BufferedReader(handle)
+    head = reader.peek(len(MAGIC))[:len(MAGIC)]
+    if head.startswith(b'\x1f\x8b'):
+        return _read_jsonl_gz(reader)
+    if head == MAGIC:
+        reader.read(len(MAGIC))
+        return _read_columnar(reader)
+    raise ValueError("not a MediGuard history export")
+
+
+def validate(record):
+    """The reason ``record`` cannot be imported, or None. Normalises the record in place."""
+    kind = record.get('type')
+    if kind == 'header':
+        if record.get('format') != FORMAT_VERSION:
+            return f"unsupported export format version {record.get('format')!r}"
+    elif kind == 'chat':
+        message = record.get('message')
+        if record.get('role') not in CHAT_ROLES:
+            return f"unknown chat role {record.get('role')!r}"
+        if not isinstance(message, str) or not message.strip():
+            return "empty chat message"
+        if len(message) > MAX_MESSAGE_CHARS:
+            return f"chat message longer than {MAX_MESSAGE_CHARS} characters"
+    elif kind == 'symptom':
+        symptom = record.get('symptom')
+        try:
+            entry_date = datetime.date.fromisoformat(record.get('date'))
+        except (TypeError, ValueError):
+            return f"invalid date {record.get('date')!r}"
+        if entry_date < EARLIEST_ENTRY_DATE:
+            return f"date {entry_date.isoformat()} is before {EARLIEST_ENTRY_DATE.isoformat()}"
+        if entry_date > datetime.date.today() + datetime.timedelta(days=1):
+            return f"date {entry_date.isoformat()} is in the future"
+        record['date'] = entry_date.isoformat()
+        if not isinstance(symptom, str) or not symptom.strip():
+            return "empty symptom"
+        if len(symptom) > MAX_SYMPTOM_CHARS:
+            return f"symptom longer than {MAX_SYMPTOM_CHARS} characters"
+        if record.get('severity') not in SEVERITY_LEVELS:
+            return f"unknown severity {record.get('severity')!r}"
+        record['symptom'] = symptom.strip()
+    else:
+        return f"unknown record type {kind!r}"
+    return None
+
+
+def import_history(handle, history=None, store=None, user_id=None, chunk_size=CHUNK_SIZE, max_errors=20):
+    """Load an export into ``history`` (a ChatHistory) and ``user_id``'s tracker entries.
+
+    Either target may be None to skip that part. Returns an ``ImportReport``
+    with the first ``max_errors`` reasons for rejected records; raises
+    ``ValueError`` if the file itself cannot be read.
+    """
+    chat = symptoms = rejected = 0
+    errors = []
+    pending = []
+    try:
+        for number, record in enumerate(read_records(handle), 1):
+            if number > MAX_IMPORT_RECORDS:
+                raise ValueError(f"more than {MAX_IMPORT_RECORDS} records; the rest were not imported")
+            error = record.get('error') or validate(record)
+            if error:
+                rejected += 1
+                if len(errors) < max_errors:
+                    errors.append(f"record {number}: {error}")
+            elif record['type'] == 'chat' and history is not None:
+                history.append(record['role'], record['message'])
+                chat += 1
+            elif record['type'] == 'symptom' and store is not None:
+                pending.append((record['date'], record['symptom'], record['severity']))
+                if len(pending) >= chunk_size:
+                    store.add_many(user_id, pending)
+                    symptoms += len(pending)
+                    pending = []
+    except (OSError, EOFError, zlib.error) as exc:
+        # A corrupt gzip stream; whatever was loaded before it stays
+        raise ValueError(f"damaged export file: {exc}") from exc
+    finally:
+        if pending:
+            store.add_many(user_id, pending)
+            symptoms += len(pending)
+    return ImportReport(chat, symptoms, rejected, errors)
+
+
+def _chunked(iterable, size, max_weight=None, weight=None):
+    # Lists of up to ``size`` items, also cut once their total ``weight`` reaches ``max_weight``
+    if max_weight is None:
+        iterator = iter(iterable)
+        while True:
+            chunk = list(itertools.islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+    chunk, total = [], 0
+    for item in iterable:
+        chunk.append(item)
+        total += weight(item)
+        if len(chunk) >= size or total >= max_weight:
+            yield chunk
+            chunk, total = [], 0
+    if chunk:
+        yield chunk
+
+
+def _read_jsonl_gz(reader):
+    stream = gzip.GzipFile(fileobj=reader)
+    lines = size = 0
+
+    def read_line():
+        # Blank and oversized lines count too, so no upload spins through endless filler
+        nonlocal size
+        line = stream.readline(MAX_LINE_BYTES)
+        size += len(line)
+        if size > MAX_IMPORT_BYTES:
+            raise ValueError(f"expands past {MAX_IMPORT_BYTES} bytes; the rest was not imported")
+        return line
+
+    while True:
+        line = read_line()
+        if not line:
+            return
+        lines += 1
+        if lines > MAX_IMPORT_RECORDS:
+            raise ValueError(f"more than {MAX_IMPORT_RECORDS} lines; the rest were not imported")
+        if not line.endswith(b'\n') and len(line) == MAX_LINE_BYTES:
+            # Skip the rest of an oversized line without holding it
+            while line and not line.endswith(b'\n'):
+                line = read_line()
+            yield {'error': f"line longer than {MAX_LINE_BYTES} bytes"}
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {'error': f"invalid JSON: {exc}"}
+            continue
+        yield record if isinstance(record, dict) else {'error': "record is not an object"}
+
+
+# Binary columnar blocks
+
+def _encode_block(kind, records):
+    if kind == _HEADER:
+        payload = json.dumps(records[0], ensure_ascii=False).encode('utf-8')
+    elif kind == _CHAT:
+        payload = (_pack_dictionary([record['role'] for record in records])
+                   + _pack_strings([record['message'] for record in records]))
+    else:
+        ordinals = np.fromiter((datetime.date.fromisoformat(record['date']).toordinal() for record in records),
+                               dtype='<i4', count=len(records))
+        payload = (np.diff(ordinals, prepend=0).astype('<i4').tobytes()
+                   + _pack_dictionary([record['symptom'] for record in records])
+                   + _pack_dictionary([record['severity'] for record in records]))
+    payload = zlib.compress(payload)
+    return _BLOCK.pack(kind, len(records), len(payload)) + payload
+
+
+def _read_columnar(reader):
+    while True:
+        header = reader.read(_BLOCK.size)
+        if len(header) < _BLOCK.size:
+            raise ValueError("export file is truncated")
+        kind, rows, size = _BLOCK.unpack(header)
+        if kind == _END:
+            return
+        if rows > MAX_BLOCK_ROWS or size > MAX_BLOCK_BYTES:
+            raise ValueError(f"export block of {rows} rows and {size} bytes is over the limit")
+        data = reader.read(size)
+        if len(data) < size:
+            raise ValueError("export file is truncated")
+        try:
+            decompressor = zlib.decompressobj()
+            payload = decompressor.decompress(data, MAX_BLOCK_BYTES)
+            if decompressor.unconsumed_tail:
+                raise ValueError(f"expands past {MAX_BLOCK_BYTES} bytes")
+            yield from _decode_block(kind, rows, payload)
+        except (zlib.error, struct.error, ValueError, IndexError) as exc:
+            raise ValueError(f"damaged export block: {exc}") from exc
+
+
+def _decode_block(kind, rows, payload):
+    if kind == _HEADER:
+        record = json.loads(payload)
+        yield record if isinstance(record, dict) else {'error': "record is not an object"}
+    elif kind == _CHAT:
+        roles, offset = _unpack_dictionary(payload, 0, rows)
+        messages, _ = _unpack_strings(payload, offset)
+        for role, message in zip(roles, messages):
+            yield {'type': 'chat', 'role': role, 'message': message}
+    elif kind == _SYMPTOM:
+        ordinals = np.cumsum(np.frombuffer(payload, dtype='<i4', count=rows), dtype=np.int64)
+        symptoms, offset = _unpack_dictionary(payload, 4 * rows, rows)
+        severities, _ = _unpack_dictionary(payload, offset, rows)
+        for ordinal, symptom, severity in zip(ordinals.tolist(), symptoms, severities):
+            try:
+                date = datetime.date.fromordinal(ordinal).isoformat()
+            except (ValueError, OverflowError):
+                yield {'error': f"invalid day number {ordinal}"}
+                continue
+            yield {'type': 'symptom', 'date': date, 'symptom': symptom, 'severity': severity}
+    else:
+        raise ValueError(f"unknown block kind {kind!r}")
+
+
+def _pack_strings(values):
+    encoded = [value.encode('utf-8') for value in values]
+    lengths = np.fromiter(map(len, encoded), dtype='<u4', count=len(encoded))
+    return _COUNT.pack(len(encoded)) + lengths.tobytes() + b''.join(encoded)
+
+
+def _unpack_strings(payload, offset):
+    (count,) = _COUNT.unpack_from(payload, offset)
+    offset += _COUNT.size
+    lengths = np.frombuffer(payload, dtype='<u4', count=count, offset=offset)
+    offset += lengths.nbytes
+    ends = offset + np.cumsum(lengths, dtype=np.int64)
+    if count and ends[-1] > len(payload):
+        raise ValueError("string column runs past the end of its block")
+    starts = np.concatenate(([offset], ends[:-1])).tolist()
+    values = [payload[start:end].decode('utf-8') for start, end in zip(starts, ends.tolist())]
+    return values, int(ends[-1]) if count else offset
+
+
+def _pack_dictionary(values):
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype='<u4', count=len(values))
+    return _pack_strings(list(index)) + codes.tobytes()
+
+
+def _unpack_dictionary(payload, offset, rows):
+    words, offset = _unpack_strings(payload, offset)
+    codes = np.frombuffer(payload, dtype='<u4', count=rows, offset=offset)
+    if rows and int(codes.max()) >= len(words):
+        raise ValueError("dictionary code out of range")
+    return [words[code] for code in codes.tolist()], offset + codes.nbytes
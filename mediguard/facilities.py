@@ -0,0 +1,203 @@
+"""Nearest-facility lookup over a local hospitals dataset.
+
+Facilities are read from a CSV file or a SQLite database with the columns
+``id, name, lat, lon, phone`` plus one 0/1 column per capability in
+``CAPABILITIES``. They are indexed in a KD-tree over their positions on the
+unit sphere: the straight-line (chord) distance between two such points
+orders facilities exactly like the great-circle distance, which is then
+recovered with the haversine relation ``d = 2R asin(chord / 2)``.
+
+Every tree node also carries the union of its facilities' capabilities, so a
+query for, say, trauma centres skips whole subtrees without one instead of
+scanning every nearby clinic.
+
+    MEDIGUARD_FACILITIES=/srv/data/facilities.sqlite  dataset (default: bundled sample CSV)
+
+The bundled CSV is fictitious sample data: made-up names around central Delhi
+with placeholder 555-01xx phone numbers. Deployments must point
+``MEDIGUARD_FACILITIES`` at a real, maintained dataset.
+"""
+
+import collections
+import csv
+import functools
+import heapq
+import math
+import os
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_FACILITIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'facilities.csv')
+
+# Capability column -> label shown to users, in display order
+CAPABILITIES = {
+    'emergency_24_7': "24/7 Emergency",
+    'trauma_center': "Trauma Center",
+    'pharmacy': "Pharmacy",
+    'specialists': "Specialists",
+    'lab': "Lab Services",
+}
+
+_BITS = {capability: 1 << bit for bit, capability in enumerate(CAPABILITIES)}
+
+# Facilities per leaf; small leaves mean fewer exact distance checks
+LEAF_SIZE = 16
+
+Facility = collections.namedtuple('Facility', 'id name lat lon phone capabilities')
+
+_TRUE = {'1', 'true', 'yes', 'y', 't'}
+
+
+def _to_unit_vector(lat, lon):
+    phi, lam = math.radians(lat), math.radians(lon)
+    cos_phi = math.cos(phi)
+    return cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _facility(row):
+    capabilities = frozenset(
+        capability for capability in CAPABILITIES if str(row.get(capability) or '').strip().lower() in _TRUE)
+    lat, lon = float(row['lat']), float(row['lon'])
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"facility {row.get('id')!r} has invalid coordinates {lat}, {lon}")
+    return Facility(str(row['id']), row['name'], lat, lon, row.get('phone') or '', capabilities)
+
+
+def load_facilities(path):
+    """Facilities from a ``.csv`` file or a SQLite database with a ``facilities`` table."""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as handle:
+            return [_facility(row) for row in csv.DictReader(handle)]
+
+    import sqlite3
+
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        connection.row_factory = sqlite3.Row
+        return [_facility(dict(row)) for row in connection.execute("SELECT * FROM facilities")]
+    finally:
+        connection.close()
+
+
+class FacilityIndex:
+    def __init__(self, facilities):
+        self.facilities = list(facilities)
+        count = len(self.facilities)
+        lat = np.radians([f.lat for f in self.facilities]).reshape(count)
+        lon = np.radians([f.lon for f in self.facilities]).reshape(count)
+        points = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+        masks = np.array([sum(_BITS[capability] for capability in f.capabilities) for f in self.facilities],
+                         dtype=np.int64).reshape(count)
+
+        # Implicit tree in flat lists; node i covers order[start[i]:end[i]]
+        order = np.arange(count)
+        self._start, self._end, self._axis, self._split = [], [], [], []
+        self._left, self._right, self._node_mask = [], [], []
+        if count:
+            self._build(points, masks, order, 0, count)
+
+        # Queries walk plain lists, which index faster than numpy scalars
+        self._order = order.tolist()
+        self._points = [tuple(point) for point in points.tolist()]
+        self._masks = masks.tolist()
+
+    def _build(self, points, masks, order, start, end):
+        node = len(self._start)
+        ids = order[start:end]
+        self._start.append(start)
+        self._end.append(end)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._node_mask.append(int(np.bitwise_or.reduce(masks[ids])))
+        if end - start <= LEAF_SIZE:
+            return node
+
+        # Split on the widest axis at the median; left holds coordinates
+        # <= split and right >= split
+        coords = points[ids]
+        axis = int(np.argmax(coords.max(axis=0) - coords.min(axis=0)))
+        middle = (end - start) // 2
+        order[start:end] = ids[np.argpartition(coords[:, axis], middle)]
+        self._axis[node] = axis
+        self._split[node] = float(points[order[start + middle], axis])
+        self._left[node] = self._build(points, masks, order, start, start + middle)
+        self._right[node] = self._build(points, masks, order, start + middle, end)
+        return node
+
+    def nearest(self, lat, lon, k=3, require=(), max_km=None):
+        """Up to ``k`` facilities as ``(distance_km, Facility)``, closest first.
+
+        ``require`` lists capabilities every result must have; ``max_km``
+        drops facilities further away than that.
+        """
+        unknown = set(require) - set(CAPABILITIES)
+        if unknown:
+            raise ValueError(f"unknown capabilities: {sorted(unknown)}")
+        required = sum(_BITS[capability] for capability in set(require))
+        if k <= 0 or not self.facilities:
+            return []
+
+        query = _to_unit_vector(lat, lon)
+        # Squared chord bound equivalent to max_km
+        bound = math.inf if max_km is None else (2 * math.sin(min(max_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        best = []  # max-heap of (-squared chord, index)
+        points, masks, order = self._points, self._masks, self._order
+        axes, splits, lefts, rights = self._axis, self._split, self._left, self._right
+        node_masks, starts, ends = self._node_mask, self._start, self._end
+
+        def worst():
+            return -best[0][0] if len(best) == k else bound
+
+        def search(node):
+            if node_masks[node] & required != required:
+                return
+            axis = axes[node]
+            if axis < 0:
+                for i in order[starts[node]:ends[node]]:
+                    if masks[i] & required != required:
+                        continue
+                    x, y, z = points[i]
+                    chord = (x - query[0]) ** 2 + (y - query[1]) ** 2 + (z - query[2]) ** 2
+                    if chord <= worst():
+                        if len(best) == k:
+                            heapq.heapreplace(best, (-chord, i))
+                        else:
+                            heapq.heappush(best, (-chord, i))
+                return
+            offset = query[axis] - splits[node]
+            near, far = (lefts[node], rights[node]) if offset < 0 else (rights[node], lefts[node])
+            search(near)
+            if offset * offset <= worst():
+                search(far)
+
+        search(0)
+        results = []
+        for neg_chord, i in sorted(best, reverse=True):
+            chord = math.sqrt(-neg_chord)
+            results.append((2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2)), self.facilities[i]))
+        return results
+
+
+def facilities_path(path=None):
+    return path or os.environ.get('MEDIGUARD_FACILITIES') or DEFAULT_FACILITIES_PATH
+
+
+def using_sample_data(path=None):
+    """Whether lookups are served from the bundled fictitious dataset."""
+    return os.path.abspath(facilities_path(path)) == DEFAULT_FACILITIES_PATH
+
+
+@functools.lru_cache(maxsize=None)
+def get_facility_index(path=None):
+    return FacilityIndex(load_facilities(facilities_path(path)))
@@ -0,0 +1,64 @@
+"""Approximate memory accounting for engine and session objects.
+
+``deep_sizeof`` walks containers, instance attributes and numpy arrays and
+sums ``sys.getsizeof`` over every object reached, counting shared objects
+once. Pass the same ``seen`` set to several calls to measure components
+without double-counting what they share.
+"""
+
+import collections
+import sys
+import types
+
+# Leaf types that cannot reference other objects
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None), range)
+
+# Code and classes are shared process state, not data held by the object
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+_SEQUENCES = (list, tuple, set, frozenset, collections.deque)
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes reachable from ``obj`` that ``seen`` has not counted."""
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    # Visited objects stay referenced until the walk ends: a temporary that
+    # was freed could hand its id to an object not yet counted
+    visited = []
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        visited.append(obj)
+        if isinstance(obj, _SKIPPED):
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMIC):
+            continue
+
+        if hasattr(obj, 'dtype') and hasattr(obj, 'nbytes'):
+            # getsizeof of a numpy array includes its buffer only when the
+            # array owns it; a view's buffer is counted through its base
+            if getattr(obj, 'base', None) is not None:
+                stack.append(obj.base)
+            continue
+
+        if isinstance(obj, dict):
+            # list() snapshots the items so concurrent writers cannot break the walk
+            for key, value in list(obj.items()):
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(obj, _SEQUENCES):
+            stack.extend(list(obj))
+
+        attributes = getattr(obj, '__dict__', None)
+        if isinstance(attributes, dict):
+            stack.append(attributes)
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                stack.append(getattr(obj, slot))
+    return total
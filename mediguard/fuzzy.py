@@ -0,0 +1,82 @@
+"""Typo-tolerant word lookup over a fixed vocabulary.
+
+Every vocabulary word is indexed by its padded character trigrams, bucketed
+by first letter and length. A lookup only visits the buckets whose length is
+within the edit-distance limit, keeps the words sharing enough trigrams to
+possibly be that close (each edit destroys at most three of the query's
+trigrams) and verifies those few with a bounded Levenshtein distance, so the
+cost depends on the bucket sizes rather than on the vocabulary size.
+
+The first letter is never corrected: typos there are rare, and allowing them
+turns ordinary words into symptoms ("never" into "fever", "tough" into
+"cough").
+"""
+
+import collections
+import itertools
+
+
+def trigrams(word):
+    # The leading "  x" gram is left out: every word in a bucket shares it
+    padded = f" {word}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance between ``a`` and ``b``, or ``limit + 1`` if larger."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_best = i
+        for j, char_b in enumerate(b, 1):
+            value = min(previous[j - 1] + (char_a != char_b), current[j - 1] + 1, previous[j] + 1)
+            current.append(value)
+            if value < row_best:
+                row_best = value
+        if row_best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex:
+    def __init__(self, words):
+        self.words = sorted(set(words))
+        # (first letter, length, trigram) -> ids of the words containing it
+        self._postings = {}
+        for word_id, word in enumerate(self.words):
+            for gram in trigrams(word):
+                self._postings.setdefault((word[0], len(word), gram), []).append(word_id)
+
+    def lookup(self, word, max_distance):
+        """Closest word within ``max_distance`` edits as ``(word, distance)``, or None.
+
+        Ties go to the word sharing more trigrams, then alphabetical order.
+        """
+        if not word or max_distance <= 0:
+            return None
+        grams = trigrams(word)
+        # Each edit destroys at most three of the query's grams
+        needed = len(grams) - 3 * max_distance
+        first = word[0]
+
+        postings = self._postings
+        counts = collections.Counter(itertools.chain.from_iterable(
+            postings.get((first, length, gram), ())
+            for length in range(max(1, len(word) - max_distance), len(word) + max_distance + 1)
+            for gram in grams
+        ))
+        candidates = sorted((-shared, word_id) for word_id, shared in counts.items() if shared >= needed)
+
+        best = None
+        for _, word_id in candidates:
+            candidate = self.words[word_id]
+            limit = max_distance if best is None else best[1] - 1
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit:
+                best = (candidate, distance)
+                if distance <= 1:
+                    break
+        return best
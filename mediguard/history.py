@@ -0,0 +1,68 @@
+"""Bounded chat history.
+
+Turns live in a fixed-capacity ring buffer. When it is full the oldest turn
+is evicted: appended to a JSONL spill file if one was configured, otherwise
+just counted, so memory per session stays constant however long the
+conversation runs.
+"""
+
+import collections
+import itertools
+import json
+import os
+
+DEFAULT_CAPACITY = 200
+
+
+class ChatHistory:
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_path=None):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.evicted = 0
+        self._turns = collections.deque(maxlen=capacity)
+
+    def append(self, role, message):
+        if len(self._turns) == self.capacity:
+            self._evict(self._turns[0])
+        self._turns.append({"role": role, "message": message})
+
+    def recent(self, count, offset=0):
+        """Up to ``count`` turns ending ``offset`` turns before the newest, oldest first."""
+        newest_first = itertools.islice(reversed(self._turns), offset, offset + count)
+        return list(newest_first)[::-1]
+
+    def spilled(self):
+        """Yield evicted turns back from the spill file, oldest first."""
+        if not self.spill_path:
+            return
+        try:
+            with open(self.spill_path, encoding='utf-8') as handle:
+                for line in handle:
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def clear(self):
+        self._turns.clear()
+        self.evicted = 0
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    @property
+    def total(self):
+        # Turns ever recorded, including evicted ones
+        return self.evicted + len(self._turns)
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __iter__(self):
+        return iter(self._turns)
+
+    def _evict(self, turn):
+        self.evicted += 1
+        if self.spill_path:
+            with open(self.spill_path, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps(turn, ensure_ascii=False) + '\n')
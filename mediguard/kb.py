@@ -0,0 +1,341 @@
+"""Versioned knowledge-base files, compiled snapshots and hot reload.
+
+The clinical tables live in a JSON (or, with PyYAML installed, YAML) file.
+Compiling them builds the symptom lexicon, the chat intent router and the
+differential scorer; the result is pickled next to the source file as a
+snapshot keyed by the file's SHA-256, so later processes load the compiled
+matchers instead of rebuilding them.
+
+The numpy arrays of the compiled scorer are written out-of-band after the
+pickle and memory-mapped read-only when a snapshot is loaded, so every worker
+process on a host shares one copy of them through the page cache.
+
+A knowledge file may also be an overlay of a base file (see
+``mediguard.locales``). Its mappings are merged key by key over the base and
+other values replace the base ones. Its snapshot is keyed by both files.
+
+A ``KnowledgeBase`` hands out the current ``KnowledgeSnapshot``. Callers take
+one reference per request and use it throughout, so ``reload`` can compile a
+new snapshot on the side and swap the reference without locking or
+disturbing requests already in flight. ``watch`` polls the source file from a
+daemon thread and reloads it when it changes.
+
+    MEDIGUARD_KNOWLEDGE=/srv/kb/knowledge.yaml   source file (default: bundled JSON)
+    MEDIGUARD_SNAPSHOT_DIR=/var/cache/mediguard  where snapshots are written
+    MEDIGUARD_KNOWLEDGE_POLL=5                   seconds between file checks
+
+Precompile a snapshot as a deploy step with::
+
+    python -m mediguard.kb path/to/knowledge.json
+    python -m mediguard.kb locales/es.json --base path/to/knowledge.json
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import sys
+import threading
+import time
+
+from . import metrics
+from .knowledge import DEFAULT_KNOWLEDGE_PATH, load_common_words
+from .lexicon import SymptomLexicon
+from .router import IntentRouter
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled layout of the compiled objects, or the way they
+# are compiled, changes
+SNAPSHOT_FORMAT = 7
+
+# Out-of-band buffers start on this boundary so mapped arrays stay aligned
+_BUFFER_ALIGNMENT = 64
+
+REQUIRED_KEYS = (
+    'version', 'tier_threshold', 'medical_knowledge', 'home_remedies', 'first_aid', 'assistant_responses',
+    'emergency_keywords', 'greeting_keywords', 'health_keywords', 'extra_symptom_terms',
+)
+
+
+def parse_source(data, path):
+    """Parse the raw bytes of a knowledge file according to its extension."""
+    return validate(decode_source(data, path), path)
+
+
+def decode_source(data, path):
+    """The top-level mapping of a knowledge or overlay file, unvalidated."""
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(f"reading {path} requires PyYAML (pip install pyyaml)") from None
+        tables = yaml.safe_load(data)
+    else:
+        tables = json.loads(data)
+
+    if not isinstance(tables, dict):
+        raise ValueError(f"{path}: expected a mapping at the top level")
+    return tables
+
+
+def validate(tables, path):
+    missing = [key for key in REQUIRED_KEYS if key not in tables]
+    if missing:
+        raise ValueError(f"{path}: missing keys {missing}")
+    for risk_level in SymptomLexicon.TIER_ORDER:
+        if risk_level not in tables['medical_knowledge']:
+            raise ValueError(f"{path}: medical_knowledge has no '{risk_level}' tier")
+    return tables
+
+
+def merge_tables(base, overlay):
+    """``overlay`` laid over ``base``: mappings merge recursively, other values replace."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = merge_tables(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+class KnowledgeSnapshot:
+    """Immutable view of one knowledge file with its compiled matchers."""
+
+    def __init__(self, tables, digest):
+        # numpy is only pulled in when a snapshot is compiled or loaded
+        from .scoring import DifferentialScorer
+
+        self.digest = digest
+        # Content hash in the version so any edit invalidates cached assessments
+        self.version = f"{tables['version']}+{digest[:12]}"
+        self.medical_knowledge = tables['medical_knowledge']
+        self.home_remedies = tables['home_remedies']
+        self.first_aid = tables['first_aid']
+        self.assistant_responses = tables['assistant_responses']
+        self.lexicon = SymptomLexicon.from_knowledge(
+            self.medical_knowledge, self.home_remedies, self.first_aid, tables['extra_symptom_terms'],
+            tables.get('synonyms'), tables.get('fuzzy_max_distance', 2),
+            load_common_words() + tuple(tables.get('common_words', ())))
+        self.router = IntentRouter.from_knowledge(
+            self.assistant_responses, tables['emergency_keywords'], tables['greeting_keywords'],
+            tables['health_keywords'])
+        self.scorer = DifferentialScorer(
+            self.medical_knowledge, self.lexicon, tables['tier_threshold'], version=self.version)
+
+
+def snapshot_path(source_path, snapshot_dir=None):
+    snapshot_dir = snapshot_dir or os.environ.get('MEDIGUARD_SNAPSHOT_DIR') or os.path.dirname(source_path)
+    return os.path.join(snapshot_dir, os.path.basename(source_path) + '.snapshot')
+
+
+def _aligned(offset):
+    return -(-offset // _BUFFER_ALIGNMENT) * _BUFFER_ALIGNMENT
+
+
+def save_snapshot(snapshot, path):
+    # Layout: header, (payload length, buffer spans), pickle payload, then
+    # the out-of-band array buffers. The header is pickled separately so a
+    # stale snapshot is rejected without unpickling the compiled objects
+    buffers = []
+    payload = pickle.dumps(snapshot, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    spans = []
+    offset = 0
+    for raw in raws:
+        offset = _aligned(offset)
+        spans.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as handle:
+            pickle.dump((SNAPSHOT_FORMAT, snapshot.digest), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((len(payload), spans), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            handle.write(payload)
+            start = _aligned(handle.tell())
+            for (offset, _), raw in zip(spans, raws):
+                handle.write(b'\0' * (start + offset - handle.tell()))
+                handle.write(raw)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_snapshot(path, digest):
+    """The snapshot at ``path`` if it was compiled from ``digest``, else None.
+
+    Its arrays are read-only views of the mapped file. The snapshot is
+    only ever replaced, never rewritten in place, so the mapping stays valid.
+    """
+    try:
+        with open(path, 'rb') as handle:
+            if pickle.load(handle) != (SNAPSHOT_FORMAT, digest):
+                return None
+            payload_length, spans = pickle.load(handle)
+            payload = handle.read(payload_length)
+            start = _aligned(handle.tell())
+            view = memoryview(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)) if spans else None
+        return pickle.loads(payload, buffers=[view[start + offset:start + offset + size] for offset, size in spans])
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning("ignoring unreadable knowledge snapshot %s: %s", path, exc)
+        return None
+
+
+def load(source_path, snapshot_dir=None, base_path=None):
+    """Snapshot for ``source_path``, compiling and saving it when needed.
+
+    With ``base_path`` the source is an overlay merged over that file.
+    """
+    with open(source_path, 'rb') as handle:
+        data = handle.read()
+    hasher = hashlib.sha256(data)
+    if base_path is not None:
+        with open(base_path, 'rb') as handle:
+            base_data = handle.read()
+        # Length-prefixed so the pair cannot collide with a single file
+        hasher.update(len(base_data).to_bytes(8, 'little') + base_data)
+    # The bundled word list is compiled into the lexicon too
+    hasher.update('\n'.join(load_common_words()).encode('utf-8'))
+    digest = hasher.hexdigest()
+
+    path = snapshot_path(source_path, snapshot_dir)
+    snapshot = load_snapshot(path, digest)
+    if snapshot is not None:
+        metrics.inc('mediguard_knowledge_loads_total', source='snapshot')
+        return snapshot
+
+    if base_path is None:
+        tables = parse_source(data, source_path)
+    else:
+        tables = validate(
+            merge_tables(decode_source(base_data, base_path), decode_source(data, source_path)), source_path)
+    snapshot = KnowledgeSnapshot(tables, digest)
+    metrics.inc('mediguard_knowledge_loads_total', source='compiled')
+    try:
+        save_snapshot(snapshot, path)
+    except OSError as exc:
+        # A read-only install still works, it just compiles at every start
+        logger.warning("could not write knowledge snapshot %s: %s", path, exc)
+    return snapshot
+
+
+class KnowledgeBase:
+    def __init__(self, path=DEFAULT_KNOWLEDGE_PATH, snapshot_dir=None, base_path=None):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.base_path = base_path
+        self.reloads = 0
+        self.last_error = None
+        self._snapshot = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._closed = threading.Event()
+
+    def _file_stamp(self):
+        stamp = ()
+        for path in (self.path, self.base_path):
+            if path is not None:
+                stat = os.stat(path)
+                stamp += (stat.st_mtime_ns, stat.st_size)
+        return stamp
+
+    def current(self):
+        """The live snapshot; take it once per request and keep using it."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._stamp = self._file_stamp()
+                    self._snapshot = load(self.path, self.snapshot_dir, self.base_path)
+                snapshot = self._snapshot
+        return snapshot
+
+    def reload(self, force=False):
+        """Swap in a new snapshot if the file changed; return whether it did.
+
+        A file that fails to parse or compile is logged and the previous
+        snapshot stays live.
+        """
+        with self._lock:
+            stamp = None
+            try:
+                stamp = self._file_stamp()
+                if not force and self._snapshot is not None and stamp == self._stamp:
+                    return False
+                snapshot = load(self.path, self.snapshot_dir, self.base_path)
+            except Exception as exc:
+                # Remember the broken file so it is retried only once it changes again
+                self._stamp = stamp
+                self.last_error = exc
+                metrics.inc('mediguard_knowledge_reload_errors_total')
+                logger.error("knowledge reload from %s failed, keeping the current snapshot: %s", self.path, exc)
+                return False
+            self._stamp = stamp
+            self.last_error = None
+            if self._snapshot is not None and snapshot.digest == self._snapshot.digest:
+                return False
+            # A single reference assignment; readers see the old or the new snapshot
+            self._snapshot = snapshot
+            self.reloads += 1
+        metrics.inc('mediguard_knowledge_reloads_total')
+        logger.info("knowledge reloaded from %s (version %s)", self.path, snapshot.version)
+        return True
+
+    def watch(self, interval=None):
+        """Start polling the source file for changes, once per knowledge base."""
+        if interval is None:
+            interval = float(os.environ.get('MEDIGUARD_KNOWLEDGE_POLL', 5))
+        with self._lock:
+            if self._watcher is not None or interval <= 0:
+                return
+            self._watcher = threading.Thread(
+                target=self._poll, args=(interval,), name='mediguard-knowledge-watch', daemon=True)
+        self._watcher.start()
+
+    def close(self):
+        """Stop the watcher; snapshots already handed out stay usable."""
+        self._closed.set()
+
+    def _poll(self, interval):
+        while not self._closed.wait(interval):
+            self.reload()
+
+
+@functools.lru_cache(maxsize=None)
+def get_knowledge_base():
+    return KnowledgeBase(os.environ.get('MEDIGUARD_KNOWLEDGE') or DEFAULT_KNOWLEDGE_PATH)
+
+
+def main(argv=None):
+    import argparse
+
+    # Run as ``-m`` this module is ``__main__``; compile through the package
+    # so the pickled classes resolve in other processes
+    from mediguard import kb
+
+    parser = argparse.ArgumentParser(prog='python -m mediguard.kb',
+                                     description='Compile a knowledge file into a snapshot.')
+    parser.add_argument('source', nargs='?', default=os.environ.get('MEDIGUARD_KNOWLEDGE') or DEFAULT_KNOWLEDGE_PATH)
+    parser.add_argument('--snapshot-dir', help="where to write the snapshot (default: next to the source)")
+    parser.add_argument('--base', help="compile the source as an overlay (locale pack) of this knowledge file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    snapshot = kb.load(args.source, args.snapshot_dir, args.base)
+    print(f"{kb.snapshot_path(args.source, args.snapshot_dir)}: version {snapshot.version}, "
+          f"{len(snapshot.lexicon.terms)} terms, {len(snapshot.scorer.conditions)} conditions "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Default medical knowledge tables used by the MediGuard AI engine.
+
+The tables are maintained in ``data/knowledge.json`` and exposed here as
+module constants, exactly as shipped. The file is read on first access to
+any of them, so importing the package stays cheap. Running services read the
+live tables through ``mediguard.kb`` instead, which also picks up edits to
+the file without a restart.
+"""
+
+import functools
+import os
+
+DEFAULT_KNOWLEDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'knowledge.json')
+# Ordinary English words the lexicon must not spell-correct into symptoms
+COMMON_WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'common_words.txt')
+
+# Module constant -> key in the knowledge file
+_CONSTANTS = {
+    # Versioned with the file so cached assessments are discarded when it changes
+    'KNOWLEDGE_VERSION': 'version',
+    # Symptoms, conditions, per-condition symptom weights and advice per risk tier
+    'MEDICAL_KNOWLEDGE': 'medical_knowledge',
+    # Minimum condition score for its tier to be reported
+    'TIER_THRESHOLD': 'tier_threshold',
+    'HOME_REMEDIES': 'home_remedies',
+    'FIRST_AID': 'first_aid',
+    'AI_ASSISTANT_RESPONSES': 'assistant_responses',
+    # Chat intent keywords, checked in this priority order: emergency, the
+    # AI_ASSISTANT_RESPONSES['symptoms'] keys, greetings, then general health
+    'EMERGENCY_KEYWORDS': 'emergency_keywords',
+    'GREETING_KEYWORDS': 'greeting_keywords',
+    'HEALTH_KEYWORDS': 'health_keywords',
+    # Words the free-text box recognised before the lexicon existed
+    'EXTRA_SYMPTOM_TERMS': 'extra_symptom_terms',
+    # Lay phrases and their symptom term ("breathless" -> "shortness of breath")
+    'SYMPTOM_SYNONYMS': 'synonyms',
+    # Largest edit distance tolerated when correcting misspelt words
+    'FUZZY_MAX_DISTANCE': 'fuzzy_max_distance',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_defaults():
+    import json
+
+    with open(DEFAULT_KNOWLEDGE_PATH, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+@functools.lru_cache(maxsize=None)
+def load_common_words():
+    """The words of ``data/common_words.txt``; knowledge files may add more under ``common_words``."""
+    with open(COMMON_WORDS_PATH, encoding='utf-8') as handle:
+        return tuple(word for line in handle for word in line.partition('#')[0].split())
+
+
+def __getattr__(name):
+    if name not in _CONSTANTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = load_defaults()[_CONSTANTS[name]]
+    return value
@@ -0,0 +1,386 @@
+import bisect
+import re
+import weakref
+
+from .fuzzy import TrigramIndex
+
+# Letters in any script; digits and underscores separate words
+_WORD = re.compile(r"[^\W\d_]+")
+# Words and the runs between them; correction only ever rewrites words
+_TOKEN = re.compile(r"[^\W\d_]+|[\W\d_]+")
+
+# Misspelt words are only corrected from this length on; shorter ones are
+# too often a different, valid word one edit away
+FUZZY_MIN_LENGTH = 5
+
+# Memoised corrections per lexicon; free text reuses the same words a lot
+_CORRECTION_CACHE_SIZE = 65536
+
+
+def fold(text):
+    """Lower-cased ``text`` without accents ("Náuseas, MAREO" -> "nauseas, mareo").
+
+    Keywords and input are both folded, so users who type without accents,
+    or with them, match the same terms.
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+    import unicodedata
+
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class SymptomLexicon:
+    """Aho-Corasick matcher over every symptom term in the knowledge tables.
+
+    The automaton is compiled once; a single pass over the text reports every
+    term that occurs on word boundaries together with its risk tier (``None``
+    for terms that only appear in the remedy / first-aid tables). Synonyms
+    are reported as the term they stand for. Terms and text are matched
+    accent-folded (see ``fold``).
+
+    Before matching, words missing from the lexicon's vocabulary are replaced
+    by the closest vocabulary word found through a trigram index, allowing
+    one edit per two letters beyond the third, capped at ``max_distance``
+    ("feaver" -> "fever", "headake" -> "headache"). ``max_distance=0`` turns
+    this off. Words listed in ``common_words`` are real words, not typos, and
+    are never corrected ("couch" stays "couch", not "cough"). A word that only
+    occurs inside longer terms ("tight" in "tight chest") is reached by one
+    edit at most, since a looser match there turns a sentence's ordinary
+    words into a symptom phrase.
+    """
+
+    TIER_ORDER = ('high_risk', 'medium_risk', 'low_risk')
+
+    def __init__(self, terms, aliases=None, max_distance=2, common_words=()):
+        # terms: mapping of lowercase term -> tier (or None)
+        # aliases: mapping of lowercase synonym (also in terms) -> term it stands for
+        self.terms = dict(terms)
+        self.aliases = dict(aliases or {})
+        self.max_distance = max_distance
+        self.vocabulary = frozenset(word for term in self.terms for word in _WORD.findall(term))
+        self.common_words = frozenset(fold(word) for word in common_words) - self.vocabulary
+        # Vocabulary words that are a term on their own
+        self._whole_terms = frozenset(term for term in self.terms if _WORD.fullmatch(term))
+        self._fuzzy = TrigramIndex(self.vocabulary)
+        self._corrections = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for term in self.terms:
+            node = 0
+            for char in term:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(term)
+
+        # Breadth-first pass to wire failure links and merge outputs
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @classmethod
+    def from_knowledge(cls, medical_knowledge, home_remedies=(), first_aid=(), extra_terms=(), synonyms=None,
+                       max_distance=2, common_words=()):
+        terms = {}
+        # Terms are keyed folded; one whose folding changes it is reported as spelt
+        aliases = {}
+        # Highest tier wins when a term is listed under several tiers
+        for risk_level in reversed(cls.TIER_ORDER):
+            for symptom in medical_knowledge[risk_level]['symptoms']:
+                terms[fold(symptom)] = risk_level
+                if fold(symptom) != symptom.lower():
+                    aliases[fold(symptom)] = symptom.lower()
+        for term in list(home_remedies) + list(first_aid) + list(extra_terms):
+            if fold(term) not in terms:
+                terms[fold(term)] = None
+                if fold(term) != term.lower():
+                    aliases[fold(term)] = term.lower()
+
+        for synonym, term in (synonyms or {}).items():
+            key = fold(term)
+            if key not in terms:
+                raise ValueError(f"synonym {synonym.lower()!r} refers to unknown term {term.lower()!r}")
+            if fold(synonym) not in terms:
+                terms[fold(synonym)] = terms[key]
+                aliases[fold(synonym)] = aliases.get(key, key)
+        return cls(terms, aliases, max_distance, common_words)
+
+    def __getstate__(self):
+        # The correction memo is per-process scratch; keep it out of snapshots
+        state = self.__dict__.copy()
+        state['_corrections'] = {}
+        return state
+
+    def correct_word(self, word, max_distance=None):
+        """``word`` or, if it is not in the vocabulary, its closest match."""
+        if max_distance is None:
+            max_distance = self.max_distance
+        if len(word) < FUZZY_MIN_LENGTH or word in self.vocabulary or word in self.common_words:
+            return word
+        key = (word, max_distance)
+        corrected = self._corrections.get(key)
+        if corrected is None:
+            match = self._fuzzy.lookup(word, min(max_distance, (len(word) - 3) // 2))
+            if match and (match[1] <= 1 or match[0] in self._whole_terms):
+                corrected = match[0]
+            else:
+                corrected = word
+            if len(self._corrections) >= _CORRECTION_CACHE_SIZE:
+                self._corrections.clear()
+            self._corrections[key] = corrected
+        return corrected
+
+    def correct(self, text, max_distance=None):
+        """Folded ``text`` with misspelt words replaced by vocabulary words."""
+        text = fold(text)
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance <= 0:
+            return text
+        # Look each distinct unknown word up once; most texts need no rewrite
+        replacements = {}
+        for word in set(_WORD.findall(text)) - self.vocabulary:
+            corrected = self.correct_word(word, max_distance)
+            if corrected != word:
+                replacements[word] = corrected
+        if not replacements:
+            return text
+        return _WORD.sub(lambda match: replacements.get(match.group(), match.group()), text)
+
+    def find_all(self, text, max_distance=None):
+        """Return ``(term, tier, start, end)`` for every whole-word match.
+
+        Offsets refer to ``correct(text)``, which only differs from the
+        folded input where a misspelt word was replaced.
+        """
+        text = self.correct(text, max_distance)
+        goto, fail, out, aliases = self._goto, self._fail, self._out, self.aliases
+        matches = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < len(text) and text[end].isalnum():
+                continue
+            for term in out[node]:
+                start = end - len(term)
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                matches.append((aliases.get(term, term), self.terms[term], start, end))
+        matches.sort(key=lambda match: (match[2], -match[3]))
+        return matches
+
+    def extract(self, text, max_distance=None):
+        """Distinct matched terms in order of first appearance."""
+        seen = []
+        for term, _, _, _ in self.find_all(text, max_distance):
+            if term not in seen:
+                seen.append(term)
+        return seen
+
+    def highest_tier(self, matches):
+        tiers = {tier for _, tier, _, _ in matches}
+        for risk_level in self.TIER_ORDER:
+            if risk_level in tiers:
+                return risk_level
+        return None
+
+
+def _common_prefix(a, b):
+    """Length of the common prefix of two strings, compared slice by slice in C."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a, b, limit):
+    """Length of the common suffix of two strings, at most ``limit``."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalExtractor:
+    """``SymptomLexicon.find_all`` kept up to date as a text is edited.
+
+    The text is split into alternating word and non-word tokens. For each
+    token the extractor remembers where it starts in the text and in the
+    corrected text, and the automaton state on entering it. An edit only
+    rescans from the token holding the first changed character. Once the
+    scan reaches the unchanged tail at a token where the automaton is back at
+    its root, the remaining tokens and matches are reused with shifted
+    offsets. Typing at the end therefore costs one word, whatever the length
+    of the text.
+
+    Holds per-session state only. The lexicon is passed to every ``update``
+    and only weakly referenced, so the shared lexicon is neither counted in a
+    session's size nor pickled with it; a restored extractor rescans once.
+    """
+
+    def __init__(self):
+        self._lexicon_ref = None
+        self._max_distance = None
+        self.reset()
+
+    def reset(self):
+        self.text = ''
+        self.corrected = ''
+        self._raw_starts = []
+        self._corr_starts = []
+        self._nodes = []
+        self._matches = []   # in scan order, i.e. by end offset
+        self._ends = []
+        self.scanned = 0
+        self.reused = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lexicon_ref'] = None
+        return state
+
+    def update(self, text, lexicon, max_distance=None):
+        """Bring the matches in line with ``text``; returns the characters rescanned."""
+        if max_distance is None:
+            max_distance = lexicon.max_distance
+        if self._lexicon_ref is None or self._lexicon_ref() is not lexicon or max_distance != self._max_distance:
+            self.reset()
+            self._lexicon_ref = weakref.ref(lexicon)
+            self._max_distance = max_distance
+        old, new = self.text, fold(text)
+        if new == old:
+            self.scanned = self.reused = 0
+            return 0
+
+        old_raw_starts, old_corr_starts, old_nodes = self._raw_starts, self._corr_starts, self._nodes
+        old_matches, old_ends, old_corrected = self._matches, self._ends, self.corrected
+
+        # Restart at the token holding the last unchanged character: it may
+        # grow, and everything before it is untouched
+        prefix = _common_prefix(old, new)
+        index = bisect.bisect_right(old_raw_starts, prefix - 1) - 1 if prefix and old_raw_starts else 0
+        raw_pos = old_raw_starts[index] if old_raw_starts else 0
+        corr_pos = old_corr_starts[index] if old_raw_starts else 0
+        node = old_nodes[index] if old_raw_starts else 0
+
+        raw_starts, corr_starts, nodes = old_raw_starts[:index], old_corr_starts[:index], old_nodes[:index]
+        # Matches ending where the restart token begins were checked against
+        # its first character, which did not change
+        keep = bisect.bisect_right(old_ends, corr_pos)
+        matches, ends = old_matches[:keep], old_ends[:keep]
+        built = old_corrected[:corr_pos]
+
+        tail_start = len(new) - _common_suffix(old, new, min(len(old), len(new)) - prefix)
+        shift = len(new) - len(old)
+        goto, fail, out, aliases, terms = lexicon._goto, lexicon._fail, lexicon._out, lexicon.aliases, lexicon.terms
+        scan_from = raw_pos
+        self.reused = 0
+
+        for token in _TOKEN.finditer(new, raw_pos):
+            start_raw = token.start()
+            if node == 0 and start_raw > tail_start:
+                # Same characters from here on and a fresh automaton: reuse the old scan
+                old_index = bisect.bisect_left(old_raw_starts, start_raw - shift)
+                if old_index < len(old_raw_starts) and old_raw_starts[old_index] == start_raw - shift \
+                        and old_nodes[old_index] == 0:
+                    old_corr = old_corr_starts[old_index]
+                    moved = corr_pos - old_corr
+                    raw_starts.extend(offset + shift for offset in old_raw_starts[old_index:])
+                    corr_starts.extend(offset + moved for offset in old_corr_starts[old_index:])
+                    nodes.extend(old_nodes[old_index:])
+                    first = bisect.bisect_right(old_ends, old_corr)
+                    matches.extend((term, tier, begin + moved, end + moved)
+                                   for term, tier, begin, end in old_matches[first:])
+                    ends.extend(end + moved for end in old_ends[first:])
+                    built += old_corrected[old_corr:]
+                    self.reused = len(new) - start_raw
+                    break
+
+            raw_starts.append(start_raw)
+            corr_starts.append(corr_pos)
+            nodes.append(node)
+            word = token.group()
+            if max_distance > 0 and word[0].isalpha():
+                word = lexicon.correct_word(word, max_distance)
+            built += word
+            # The character after the token, as find_all would see it
+            following = new[token.end()] if token.end() < len(new) else ''
+
+            for offset, char in enumerate(word):
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+                if not out[node]:
+                    continue
+                end = corr_pos + offset + 1
+                after = word[offset + 1] if offset + 1 < len(word) else following
+                if after.isalnum():
+                    continue
+                for term in out[node]:
+                    begin = end - len(term)
+                    if begin > 0 and built[begin - 1].isalnum():
+                        continue
+                    matches.append((aliases.get(term, term), terms[term], begin, end))
+                    ends.append(end)
+            corr_pos += len(word)
+
+        self.text, self.corrected = new, built
+        self._raw_starts, self._corr_starts, self._nodes = raw_starts, corr_starts, nodes
+        self._matches, self._ends = matches, ends
+        self.scanned = len(new) - scan_from - self.reused
+        return self.scanned
+
+    def matches(self):
+        """``(term, tier, start, end)`` exactly as ``find_all`` reports them."""
+        return sorted(self._matches, key=lambda match: (match[2], -match[3]))
+
+    def extract(self):
+        """Distinct matched terms in order of first appearance."""
+        seen = []
+        for term, _, _, _ in self.matches():
+            if term not in seen:
+                seen.append(term)
+        return seen
+
+    def highest_tier(self):
+        tiers = {tier for _, tier, _, _ in self._matches}
+        for risk_level in SymptomLexicon.TIER_ORDER:
+            if risk_level in tiers:
+                return risk_level
+        return None
+
+
+def get_lexicon():
+    """Lexicon of the live knowledge snapshot, compiled on first use."""
+    from .kb import get_knowledge_base
+    return get_knowledge_base().current().lexicon
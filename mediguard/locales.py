@@ -0,0 +1,145 @@
+"""Per-locale knowledge packs, loaded on first use and shared read-only.
+
+A pack is a knowledge file in the locale directory named after its locale
+(``es.json``, ``pt-BR.yaml``). It only carries what it translates: it is an
+overlay of the base knowledge file (see ``mediguard.kb``), so any table it
+leaves out falls back to the default locale.
+
+Nothing is read for a locale until a session first asks for it. Its pack is
+then compiled into a snapshot, or loaded from one, and wrapped in an engine
+with its own assessment cache, which every session using that locale shares.
+Snapshot arrays are memory-mapped read-only, so worker processes share those
+pages. Besides the default locale at most ``max_loaded`` locales stay
+resident; asking for another evicts the least recently used one, and
+``evict`` drops one explicitly. Sessions still holding an evicted engine
+keep using it until they let go of it.
+
+    MEDIGUARD_LOCALE_DIR=/srv/kb/locales  pack directory (default: bundled packs)
+    MEDIGUARD_DEFAULT_LOCALE=en           locale served by the base knowledge file
+    MEDIGUARD_LOCALES_LOADED=4            extra locales kept resident
+"""
+
+import collections
+import functools
+import os
+import threading
+
+from .cache import DEFAULT_CACHE_SIZE, AssessmentCache
+from .engine import MediGuardAI
+from .kb import KnowledgeBase, get_knowledge_base
+
+DEFAULT_LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'locales')
+DEFAULT_LOCALE = 'en'
+
+PACK_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# Display names for the locale picker; unknown codes are shown as they are
+LANGUAGE_NAMES = {
+    'ar': "العربية", 'bn': "বাংলা", 'de': "Deutsch", 'en': "English", 'es': "Español", 'fr': "Français",
+    'hi': "हिन्दी", 'it': "Italiano", 'ja': "日本語", 'mr': "मराठी", 'pt': "Português", 'ru': "Русский",
+    'ta': "தமிழ்", 'te': "తెలుగు", 'ur': "اردو", 'zh': "中文",
+}
+
+
+def language_name(locale):
+    return LANGUAGE_NAMES.get(locale) or LANGUAGE_NAMES.get(locale.split('-')[0]) or locale
+
+
+class LocalePacks:
+    def __init__(self, directory=DEFAULT_LOCALE_DIR, default_locale=DEFAULT_LOCALE, max_loaded=4,
+                 knowledge_base=None, snapshot_dir=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.default_locale = default_locale
+        self.max_loaded = max_loaded
+        self.snapshot_dir = snapshot_dir
+        self.cache_size = cache_size
+        self.evictions = 0
+        # The default locale is the plain engine over the base knowledge
+        self._default = MediGuardAI(knowledge_base=knowledge_base)
+        self._engines = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._watching = False
+        self._watch_interval = None
+
+    def _pack_paths(self):
+        """Locale -> pack file, rescanned on every call so new packs need no restart."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return {}
+        paths = {}
+        for name in sorted(names):
+            locale, extension = os.path.splitext(name)
+            if extension in PACK_EXTENSIONS and locale != self.default_locale:
+                paths.setdefault(locale, os.path.join(self.directory, name))
+        return paths
+
+    def available(self):
+        """Every servable locale, default first."""
+        return (self.default_locale,) + tuple(self._pack_paths())
+
+    def resolve(self, locale):
+        """The best available locale for ``locale``: exact, then language only, then the default."""
+        if not locale:
+            return self.default_locale
+        available = {code.lower(): code for code in self.available()}
+        locale = locale.replace('_', '-').lower()
+        return available.get(locale) or available.get(locale.split('-')[0]) or self.default_locale
+
+    def engine(self, locale=None):
+        """The shared engine for ``locale``, loading its pack on first use."""
+        locale = self.resolve(locale)
+        if locale == self.default_locale:
+            return self._default
+        with self._lock:
+            engine = self._engines.get(locale)
+            if engine is not None:
+                self._engines.move_to_end(locale)
+                return engine
+            knowledge_base = KnowledgeBase(self._pack_paths()[locale], self.snapshot_dir,
+                                           base_path=self._default.knowledge_base.path)
+            engine = self._engines[locale] = MediGuardAI(AssessmentCache(self.cache_size), knowledge_base)
+            if self._watching:
+                knowledge_base.watch(self._watch_interval)
+            while len(self._engines) > self.max_loaded:
+                _, evicted = self._engines.popitem(last=False)
+                self._release(evicted)
+        return engine
+
+    def loaded(self):
+        """Locales currently resident, default first, then least recently used first."""
+        with self._lock:
+            return (self.default_locale,) + tuple(self._engines)
+
+    def evict(self, locale):
+        """Drop a loaded locale; it is loaded again on its next use. The default stays."""
+        with self._lock:
+            engine = self._engines.pop(locale, None)
+        if engine is None:
+            return False
+        self._release(engine)
+        return True
+
+    def watch(self, interval=None):
+        """Reload packs, loaded now or later, when they or the base file change."""
+        with self._lock:
+            self._watching = True
+            self._watch_interval = interval
+            engines = list(self._engines.values())
+        self._default.knowledge_base.watch(interval)
+        for engine in engines:
+            engine.knowledge_base.watch(interval)
+
+    def _release(self, engine):
+        engine.knowledge_base.close()
+        self.evictions += 1
+
+
+@functools.lru_cache(maxsize=None)
+def get_locale_packs():
+    return LocalePacks(
+        os.environ.get('MEDIGUARD_LOCALE_DIR') or DEFAULT_LOCALE_DIR,
+        os.environ.get('MEDIGUARD_DEFAULT_LOCALE') or DEFAULT_LOCALE,
+        int(os.environ.get('MEDIGUARD_LOCALES_LOADED', 4)),
+        knowledge_base=get_knowledge_base(),
+    )
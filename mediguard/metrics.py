@@ -0,0 +1,273 @@
+"""Opt-in hot-path instrumentation with Prometheus text export.
+
+Everything here is inert unless ``MEDIGUARD_METRICS=1`` is set when the
+package is imported: ``timed`` then hands back the undecorated function and
+``timer`` is a shared no-op context manager, so production paths pay nothing.
+
+When enabled, latency histograms and counters are kept in process memory and
+exported in the Prometheus text format, either by ``render_prometheus``,
+written atomically to ``MEDIGUARD_METRICS_FILE`` every
+``MEDIGUARD_METRICS_INTERVAL`` seconds, or served on
+``http://127.0.0.1:$MEDIGUARD_METRICS_PORT/metrics``.
+
+``MEDIGUARD_PROFILE=cprofile`` or ``MEDIGUARD_PROFILE=tracemalloc``
+additionally captures a profile of the instrumented sections. It is written
+to ``MEDIGUARD_PROFILE_DIR`` (default: the working directory) at exit. The
+cProfile capture follows one thread at a time: sections entered on other
+threads while it is busy are timed but not profiled.
+"""
+
+import atexit
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+ENABLED = os.environ.get('MEDIGUARD_METRICS', '') not in ('', '0')
+PROFILE_MODE = os.environ.get('MEDIGUARD_PROFILE', '').lower() if ENABLED else ''
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_collectors = []
+_exporters_started = False
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name, value, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[(name, _labels_key(labels))] = value
+
+
+def observe(name, seconds, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels_key(labels))
+    index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # per-bucket counts (last slot is +Inf), sum, count
+            histogram = _histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        histogram[0][index] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+
+def register_collector(collect):
+    """Register a callable run at export time to refresh gauges."""
+    with _lock:
+        _collectors.append(collect)
+
+
+@contextlib.contextmanager
+def _measure(name, labels):
+    start = time.perf_counter()
+    profiler = _profiler_enter() if PROFILE_MODE == 'cprofile' else None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            _profiler_exit(profiler)
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timer(name, **labels):
+    """Context manager recording the block's duration in histogram ``name``."""
+    if not ENABLED:
+        return contextlib.nullcontext()
+    return _measure(name, labels)
+
+
+def timed(name, **labels):
+    """Decorator form of ``timer``; returns ``fn`` untouched when disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _measure(name, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for key, value in pairs)
+    return '{' + body + '}'
+
+
+def render_prometheus():
+    for collect in list(_collectors):
+        collect()
+
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: (list(value[0]), value[1], value[2]) for key, value in _histograms.items()}
+
+    lines = []
+    for kind, series in (('counter', counters), ('gauge', gauges)):
+        seen = set()
+        for (name, labels), value in sorted(series.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} {kind}")
+                seen.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    seen = set()
+    for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+        if name not in seen:
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path):
+    # Write then rename so a scraper never reads a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        handle.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def start_exporters():
+    """Start the file and HTTP exporters configured by the environment, once."""
+    global _exporters_started
+    if not ENABLED:
+        return
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    path = os.environ.get('MEDIGUARD_METRICS_FILE')
+    if path:
+        interval = float(os.environ.get('MEDIGUARD_METRICS_INTERVAL', 15))
+
+        def write_periodically():
+            while True:
+                time.sleep(interval)
+                write_textfile(path)
+
+        threading.Thread(target=write_periodically, name='mediguard-metrics-file', daemon=True).start()
+        atexit.register(write_textfile, path)
+
+    port = os.environ.get('MEDIGUARD_METRICS_PORT')
+    if port:
+        import http.server
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', int(port)), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='mediguard-metrics-http', daemon=True).start()
+
+
+# Profiling capture ---------------------------------------------------------
+
+_profile_dir = os.environ.get('MEDIGUARD_PROFILE_DIR', '.')
+_profiler = None
+_profile_owner = None
+_profile_depth = 0
+
+
+def _profiler_enter():
+    # One cProfile.Profile for the whole process, held by one thread at a time.
+    # Python 3.12+ allows a single active profiler, so sections running on
+    # other threads meanwhile go unprofiled rather than failing.
+    global _profiler, _profile_owner, _profile_depth
+    import cProfile
+
+    thread = threading.get_ident()
+    with _lock:
+        if _profile_owner not in (None, thread):
+            return None
+        if _profiler is None:
+            _profiler = cProfile.Profile()
+        _profile_owner = thread
+        _profile_depth += 1
+        if _profile_depth > 1:
+            return _profiler
+        try:
+            _profiler.enable()
+        except ValueError:
+            # Another profiler (a debugger, an outer cProfile run) is active
+            _profile_owner, _profile_depth = None, 0
+            return None
+    return _profiler
+
+
+def _profiler_exit(profiler):
+    global _profile_owner, _profile_depth
+    with _lock:
+        _profile_depth -= 1
+        if _profile_depth == 0:
+            profiler.disable()
+            _profile_owner = None
+
+
+def _dump_profiles():
+    os.makedirs(_profile_dir, exist_ok=True)
+    if PROFILE_MODE == 'cprofile' and _profiler is not None:
+        _profiler.dump_stats(os.path.join(_profile_dir, f"mediguard-{os.getpid()}.prof"))
+    elif PROFILE_MODE == 'tracemalloc':
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(os.path.join(_profile_dir, f"mediguard-{os.getpid()}.tracemalloc.txt"), 'w',
+                  encoding='utf-8') as handle:
+            handle.write(f"current {current} bytes, peak {peak} bytes\n")
+            for stat in snapshot.statistics('lineno')[:50]:
+                handle.write(f"{stat}\n")
+
+
+if PROFILE_MODE == 'tracemalloc':
+    import tracemalloc
+
+    tracemalloc.start()
+if PROFILE_MODE in ('cprofile', 'tracemalloc'):
+    atexit.register(_dump_profiles)
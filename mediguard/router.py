@@ -0,0 +1,93 @@
+"""Single-pass intent routing for chat messages.
+
+Messages are split into word tokens once and every keyword of every intent
+lives in one index keyed by its first token, so "hi" no longer fires inside
+"this" or "chills" and the cost per message does not grow with the size of
+the intent tables. The highest-priority keyword found wins, with ties inside
+an intent going to the keyword listed first, exactly like the old sequence of
+per-tier scans. Keywords and messages are compared accent-folded, so
+"corazón" and "corazon" are the same word.
+
+A keyword word of four letters or more also matches its regular inflections
+("pains", "attacks", "coughing", "emergencies", Spanish "dolores"), as the
+old substring scan did, without letting "hi" fire inside "his".
+"""
+
+import re
+
+from .lexicon import fold
+
+_TOKEN = re.compile(r"[\w']+")
+
+# Shorter keyword words only match themselves
+_INFLECT_MIN_LENGTH = 4
+
+
+def _forms(word):
+    """``word`` and its regular plural, past and -ing forms."""
+    if len(word) < _INFLECT_MIN_LENGTH:
+        return frozenset((word,))
+    forms = {word, word + 's', word + 'es', word + 'ed', word + 'ing'}
+    if word.endswith('e'):
+        forms.update((word + 'd', word[:-1] + 'ing'))
+    if word.endswith('y'):
+        forms.update((word[:-1] + 'ies', word[:-1] + 'ied'))
+    return frozenset(forms)
+
+
+class IntentRouter:
+    def __init__(self, intents):
+        # intents: sequence of (intent, keywords) in priority order
+        self._index = {}
+        for tier, (intent, keywords) in enumerate(intents):
+            for position, keyword in enumerate(keywords):
+                tokens = tuple(_TOKEN.findall(fold(keyword)))
+                if tokens:
+                    rank = (tier, position, intent, ' '.join(tokens))
+                    phrase = tuple(_forms(token) for token in tokens)
+                    for form in phrase[0]:
+                        self._index.setdefault(form, []).append((phrase, rank))
+        for candidates in self._index.values():
+            candidates.sort(key=lambda candidate: candidate[1])
+
+    @classmethod
+    def from_knowledge(cls, assistant_responses, emergency_keywords, greeting_keywords, health_keywords):
+        return cls([
+            ('emergency', emergency_keywords),
+            ('symptom', list(assistant_responses['symptoms'])),
+            ('greeting', greeting_keywords),
+            ('health', health_keywords),
+        ])
+
+    def route(self, message):
+        """Return ``(intent, keyword)``, or ``('unknown', None)`` without a match."""
+        tokens = _TOKEN.findall(fold(message))
+        # Set intersection does the bulk of the work in C; most tokens are
+        # never keyword starts
+        hits = self._index.keys() & tokens
+        best = None
+        for token in hits:
+            for phrase, rank in self._index[token]:
+                if best is not None and rank >= best:
+                    break
+                if len(phrase) == 1 or self._contains(tokens, phrase):
+                    best = rank
+                    break
+        if best is None:
+            return 'unknown', None
+        return best[2], best[3]
+
+    @staticmethod
+    def _contains(tokens, phrase):
+        # phrase: one set of accepted forms per keyword word
+        size = len(phrase)
+        for start in range(len(tokens) - size + 1):
+            if all(token in forms for token, forms in zip(tokens[start:start + size], phrase)):
+                return True
+        return False
+
+
+def get_router():
+    """Router of the live knowledge snapshot."""
+    from .kb import get_knowledge_base
+    return get_knowledge_base().current().router
@@ -0,0 +1,168 @@
+"""Weighted differential scoring over the condition profiles.
+
+Symptoms and conditions form a weight matrix built from the ``profiles`` in
+``MEDICAL_KNOWLEDGE``. A batch of patients is encoded as a binary matrix and
+scored with a single matrix product; each row yields a ranked condition list
+and a risk tier derived from the scores.
+"""
+
+import collections
+
+import numpy as np
+
+from .knowledge import KNOWLEDGE_VERSION, MEDICAL_KNOWLEDGE, TIER_THRESHOLD
+from .lexicon import SymptomLexicon, get_lexicon
+
+Assessment = collections.namedtuple('Assessment', 'risk_level condition recommendation ranked matched')
+
+DEFAULT_CONDITION = 'General Discomfort'
+DEFAULT_RISK_LEVEL = 'low_risk'
+
+# Per-string encodings are memoised; the set of distinct inputs is small.
+# A value depends only on its key, so threads racing on the memo can only
+# repeat work, never see a wrong encoding
+_ENCODING_CACHE_SIZE = 65536
+
+
+class DifferentialScorer:
+    def __init__(self, knowledge=None, lexicon=None, threshold=TIER_THRESHOLD, version=KNOWLEDGE_VERSION):
+        self.knowledge = knowledge or MEDICAL_KNOWLEDGE
+        self.version = version
+        self.lexicon = lexicon or get_lexicon()
+        self.threshold = threshold
+        self.tiers = list(SymptomLexicon.TIER_ORDER)
+
+        known_symptoms = set()
+        for risk_level in self.tiers:
+            known_symptoms.update(symptom.lower() for symptom in self.knowledge[risk_level]['symptoms'])
+
+        self.conditions = []
+        self.condition_tiers = []
+        for tier_index, risk_level in enumerate(self.tiers):
+            for condition in self.knowledge[risk_level]['profiles']:
+                self.conditions.append(condition)
+                self.condition_tiers.append(tier_index)
+
+        self.symptoms = sorted({
+            symptom.lower()
+            for risk_level in self.tiers
+            for profile in self.knowledge[risk_level]['profiles'].values()
+            for symptom in profile
+        })
+        unknown = set(self.symptoms) - known_symptoms
+        if unknown:
+            raise ValueError(f"profiles reference symptoms missing from the tier lists: {sorted(unknown)}")
+        self.symptom_index = {symptom: i for i, symptom in enumerate(self.symptoms)}
+        # Symptoms spelt out inside a longer one ("fever" in "high fever"); the
+        # longer symptom carries their weight, so they are not scored twice
+        self._nested = {}
+        for outer, i in self.symptom_index.items():
+            nested = frozenset(j for inner, j in self.symptom_index.items()
+                               if inner != outer and f" {inner} " in f" {outer} ")
+            if nested:
+                self._nested[i] = nested
+
+        self.weights = np.zeros((len(self.symptoms), len(self.conditions)), dtype=np.float32)
+        column = 0
+        for risk_level in self.tiers:
+            for profile in self.knowledge[risk_level]['profiles'].values():
+                for symptom, weight in profile.items():
+                    self.weights[self.symptom_index[symptom.lower()], column] = weight
+                column += 1
+
+        self.condition_tiers = np.asarray(self.condition_tiers)
+        # Boolean (tiers x conditions) mask used to take per-tier maxima
+        self._tier_mask = np.stack([self.condition_tiers == i for i in range(len(self.tiers))])
+        self._encodings = {}
+
+    def __getstate__(self):
+        # The encoding memo is per-process scratch; keep it out of snapshots
+        state = self.__dict__.copy()
+        state['_encodings'] = {}
+        return state
+
+    def encode_one(self, user_symptoms):
+        indices = set()
+        for item in user_symptoms:
+            encoded = self._encodings.get(item)
+            if encoded is None:
+                key = item.lower().strip()
+                if key in self.symptom_index:
+                    encoded = (self.symptom_index[key],)
+                else:
+                    encoded = tuple(
+                        self.symptom_index[term]
+                        for term, _, _, _ in self.lexicon.find_all(key)
+                        if term in self.symptom_index
+                    )
+                if len(self._encodings) >= _ENCODING_CACHE_SIZE:
+                    self._encodings.clear()
+                self._encodings[item] = encoded
+            indices.update(encoded)
+        for i in [i for i in indices if i in self._nested]:
+            indices -= self._nested[i]
+        return indices
+
+    def encode(self, batch):
+        """Binary (patients x symptoms) matrix for a batch of symptom lists."""
+        matrix = np.zeros((len(batch), len(self.symptoms)), dtype=np.float32)
+        rows, cols = [], []
+        for row, user_symptoms in enumerate(batch):
+            for col in self.encode_one(user_symptoms):
+                rows.append(row)
+                cols.append(col)
+        matrix[rows, cols] = 1.0
+        return matrix
+
+    def score_matrix(self, encoded, top_k=3):
+        """Score an encoded batch.
+
+        Returns ``(scores, tier_index, ranked)``: the raw condition scores,
+        the reported tier per patient (``-1`` when nothing reaches the
+        threshold) and the column indices of the top-k conditions.
+        """
+        scores = encoded @ self.weights
+
+        # Per-tier best score, then the highest-priority tier over threshold
+        tier_best = np.where(self._tier_mask[None, :, :], scores[:, None, :], -np.inf).max(axis=2)
+        over = tier_best >= self.threshold
+        tier_index = np.where(over.any(axis=1), over.argmax(axis=1), -1)
+
+        top_k = min(top_k, len(self.conditions))
+        ranked = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        return scores, tier_index, ranked
+
+    def assess_batch(self, batch, top_k=3):
+        encoded = self.encode(batch)
+        scores, tier_index, ranked = self.score_matrix(encoded, top_k)
+
+        # Best condition inside the reported tier; ties resolve to table order
+        in_tier = self.condition_tiers[None, :] == tier_index[:, None]
+        best_in_tier = np.where(in_tier, scores, -np.inf).argmax(axis=1)
+
+        results = []
+        for row in range(len(batch)):
+            # Tuples throughout so results can be shared from the cache
+            matched = tuple(self.symptoms[col] for col in np.flatnonzero(encoded[row]))
+            ranking = tuple(
+                (self.conditions[col], round(float(scores[row, col]), 3))
+                for col in ranked[row]
+                if scores[row, col] > 0
+            )
+            if tier_index[row] < 0:
+                risk_level, condition = DEFAULT_RISK_LEVEL, DEFAULT_CONDITION
+            else:
+                risk_level = self.tiers[tier_index[row]]
+                condition = self.conditions[best_in_tier[row]]
+            recommendation = self.knowledge[risk_level]['recommendation']
+            results.append(Assessment(risk_level, condition, recommendation, ranking, matched))
+        return results
+
+    def assess(self, user_symptoms, top_k=3):
+        return self.assess_batch([user_symptoms], top_k)[0]
+
+
+def get_scorer():
+    """Scorer of the live knowledge snapshot."""
+    from .kb import get_knowledge_base
+    return get_knowledge_base().current().scorer
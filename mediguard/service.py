@@ -0,0 +1,326 @@
+"""Local asyncio HTTP API for the triage engine.
+
+    python -m mediguard.service --port 8765 --max-batch 64 --max-wait-ms 2
+
+Endpoints (JSON in, JSON out):
+
+    POST /assess   {"symptoms": [...], "age_group": ..., "gender": ..., "top_k": 3}
+    POST /chat     {"message": "...", "seed": ...}
+    GET  /healthz
+    GET  /metrics  (Prometheus text; empty unless MEDIGUARD_METRICS=1)
+
+Concurrent requests are coalesced into micro-batches: a batch is dispatched
+as soon as ``max_batch`` requests are queued or ``max_wait`` has passed since
+the first one arrived, and is served by one shared engine instance on the
+event loop's default executor, so the loop keeps accepting and parsing
+requests while a batch is scored. The
+knowledge file is watched and reloaded in place while the service runs, and
+every decision is queued to the audit log (see ``mediguard.audit``).
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import sys
+
+from . import metrics
+from .audit import get_audit_log
+from .engine import MediGuardAI
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1 << 20
+# A request line or header line longer than this is refused, as is a
+# request with more header lines than MAX_HEADERS
+MAX_LINE_BYTES = 1 << 16
+MAX_HEADERS = 100
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    def __init__(self, handler, max_batch=64, max_wait=0.002):
+        # handler: callable taking a list of items and returning a list of results;
+        # an exception in place of a result fails only that item's request
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                # Scoring is CPU-bound; keep it off the event loop
+                results = await loop.run_in_executor(None, self.handler, [item for item, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class TriageService:
+    def __init__(self, engine=None, max_batch=64, max_wait=0.002, audit=None):
+        self.engine = engine or MediGuardAI()
+        # An AuditLog; recording only queues, so batches never wait on disk
+        self.audit = audit
+        self.assess_batcher = MicroBatcher(self._assess_batch, max_batch, max_wait)
+        self.chat_batcher = MicroBatcher(self._chat_batch, max_batch, max_wait)
+
+    def _assess_batch(self, requests):
+        # assess_batch takes one patient context, so group requests that share one
+        groups = collections.defaultdict(list)
+        for index, request in enumerate(requests):
+            groups[(request['age_group'], request['gender'], request['top_k'])].append(index)
+
+        results = [None] * len(requests)
+        version = self.engine.knowledge.version
+        for (age_group, gender, top_k), indices in groups.items():
+            try:
+                assessments = self.engine.assess_batch(
+                    [requests[i]['symptoms'] for i in indices], top_k, age_group, gender)
+            except Exception as exc:
+                # Only the requests sharing this patient context fail
+                for i in indices:
+                    results[i] = exc
+                continue
+            for i, assessment in zip(indices, assessments):
+                if self.audit is not None:
+                    self.audit.record('assessment', source='api', symptoms=requests[i]['symptoms'],
+                                      matched=assessment.matched, risk_level=assessment.risk_level,
+                                      condition=assessment.condition, age_group=age_group, gender=gender,
+                                      knowledge_version=version)
+                results[i] = {
+                    'risk_level': assessment.risk_level,
+                    'condition': assessment.condition,
+                    'action': assessment.recommendation['action'],
+                    'advice': assessment.recommendation['advice'],
+                    'steps': assessment.recommendation['steps'],
+                    'differential': assessment.ranked,
+                    'matched': assessment.matched,
+                }
+        return results
+
+    def _chat_batch(self, requests):
+        results = []
+        version = self.engine.knowledge.version
+        for message, seed in requests:
+            try:
+                reply = self.engine.chat(message, seed)
+            except Exception as exc:
+                results.append(exc)
+                continue
+            if self.audit is not None:
+                self.audit.record('chat', source='api', message=message, intent=reply.intent,
+                                  matched=reply.keyword, seed=seed, knowledge_version=version)
+            results.append({'response': reply.response})
+        return results
+
+    async def dispatch(self, method, path, body):
+        """Return ``(status, payload)`` for one request."""
+        if path == '/healthz':
+            return 200, {'status': 'ok', 'knowledge_version': self.engine.knowledge.version}
+        if path == '/metrics':
+            return 200, metrics.render_prometheus()
+        if path not in ('/assess', '/chat'):
+            return 404, {'error': f"unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': "use POST"}
+
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError as exc:
+            return 400, {'error': f"invalid JSON: {exc}"}
+        if not isinstance(request, dict):
+            return 400, {'error': "request body must be a JSON object"}
+
+        if path == '/chat':
+            message = request.get('message')
+            if not isinstance(message, str):
+                return 400, {'error': "'message' must be a string"}
+            seed = request.get('seed')
+            if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+                return 400, {'error': "'seed' must be an integer or a string"}
+            return 200, await self.chat_batcher.submit((message, seed))
+
+        symptoms = request.get('symptoms')
+        if isinstance(symptoms, str):
+            symptoms = [symptoms]
+        if not isinstance(symptoms, list) or not all(isinstance(item, str) for item in symptoms):
+            return 400, {'error': "'symptoms' must be a string or a list of strings"}
+        top_k = request.get('top_k', 3)
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            return 400, {'error': "'top_k' must be a positive integer"}
+        for field in ('age_group', 'gender'):
+            if not isinstance(request.get(field), (str, type(None))):
+                return 400, {'error': f"'{field}' must be a string"}
+        return 200, await self.assess_batcher.submit({
+            'symptoms': symptoms,
+            'age_group': request.get('age_group'),
+            'gender': request.get('gender'),
+            'top_k': top_k,
+        })
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ValueError:
+                    # Over the stream limit; the rest of the line cannot be skipped
+                    await self._respond(writer, 400, {'error': "request line too long"}, False)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "malformed request line"}, False)
+                    break
+
+                headers = {}
+                try:
+                    for _ in range(MAX_HEADERS + 1):
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    else:
+                        raise ValueError("too many header lines")
+                except ValueError:
+                    await self._respond(writer, 431, {'error': "request headers too large"}, False)
+                    break
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a length the body cannot be skipped, so the connection ends here
+                    await self._respond(writer, 400, {'error': "invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                except Exception:
+                    logger.exception("request %s %s failed", method, target)
+                    status, payload = 500, {'error': "internal error"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765, ready=None):
+        # Compile or load the knowledge snapshot before accepting traffic
+        self.engine.knowledge
+        self.engine.knowledge_base.watch()
+        self.assess_batcher.start()
+        self.chat_batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.assess_batcher.stop()
+            await self.chat_batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m mediguard.service', description='MediGuard AI triage API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=64, help="largest micro-batch sent to the engine")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help="longest a request waits for its batch to fill")
+    args = parser.parse_args(argv)
+
+    service = TriageService(max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000.0, audit=get_audit_log())
+
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        print(f"MediGuard AI service listening on http://{address[0]}:{address[1]}", flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Per-session state under a process-wide memory budget.
+
+The app keeps what each session owns (chat history, paging cursors, render
+timings) in a plain dict checked out from the ``SessionManager`` for the
+length of one script run, rather than in ``st.session_state``. When a run
+checks its dict back in, the manager measures it (``deep_sizeof``) and adds
+it to the total of resident sessions.
+
+Once that total is over the budget, the least recently used sessions that
+are not in a run and have been idle for at least ``min_idle`` seconds are
+compacted: pickled, zlib-compressed and written to the spill directory. Their
+memory is released and only the bookkeeping stays resident, until the total
+is back under ``LOW_WATER`` of the budget. A spilled session is read back
+transparently the next time it is checked out.
+
+Sessions whose browser tab was closed are never checked out again, so a
+periodic sweep (run from ``checkin``) also spills every session idle for
+``idle_ttl`` seconds, budget or not. Spill files not claimed within
+``max_age`` seconds belong to sessions that never came back; they are
+deleted and the sessions forgotten.
+
+Widget values stay in Streamlit's own session state and are not managed.
+
+    MEDIGUARD_SESSION_BUDGET=268435456     bytes of resident session state (default 256 MiB)
+    MEDIGUARD_SESSION_DIR=/var/lib/mg      spill directory (default ./mediguard_sessions)
+    MEDIGUARD_SESSION_MIN_IDLE=60          seconds idle before a session may be spilled
+    MEDIGUARD_SESSION_IDLE_TTL=1800        seconds idle before a session is spilled regardless
+    MEDIGUARD_SESSION_MAX_AGE=86400        seconds a spill file is kept
+"""
+
+import collections
+import contextlib
+import functools
+import logging
+import os
+import pickle
+import threading
+import time
+import zlib
+
+from . import metrics
+from .footprint import deep_sizeof
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_DIR = 'mediguard_sessions'
+DEFAULT_BUDGET = 256 << 20
+
+# Spilling stops once resident state is back under this fraction of the budget
+LOW_WATER = 0.8
+
+SessionStats = collections.namedtuple('SessionStats', 'session_id bytes resident idle_seconds spilled_bytes restores')
+ManagerStats = collections.namedtuple(
+    'ManagerStats', 'sessions resident resident_bytes budget spilled spilled_bytes spills restores expired evicted')
+
+
+class _Entry:
+    __slots__ = ('data', 'bytes', 'last_used', 'pins', 'spilled_bytes', 'restores', 'lock')
+
+    def __init__(self):
+        self.data = None
+        self.bytes = 0
+        self.last_used = time.monotonic()
+        self.pins = 0
+        self.spilled_bytes = 0
+        self.restores = 0
+        self.lock = threading.Lock()
+
+
+class SessionManager:
+    def __init__(self, directory=DEFAULT_SESSION_DIR, budget=DEFAULT_BUDGET, min_idle=60.0, max_age=86400.0,
+                 idle_ttl=1800.0):
+        self.directory = directory
+        self.budget = budget
+        self.min_idle = min_idle
+        self.max_age = max_age
+        self.idle_ttl = idle_ttl
+        self.resident_bytes = 0
+        self.spills = 0
+        self.restores = 0
+        self.expired = 0
+        self.evicted = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + self._sweep_interval()
+        os.makedirs(directory, exist_ok=True)
+
+    def _sweep_interval(self):
+        return min(self.idle_ttl, self.max_age, 3600)
+
+    def _path(self, session_id):
+        if not session_id.isalnum():
+            raise ValueError(f"invalid session id {session_id!r}")
+        return os.path.join(self.directory, f"{session_id}.session")
+
+    @contextlib.contextmanager
+    def session(self, session_id):
+        """Check out the session's dict for one run; it is measured when the run ends."""
+        data = self.checkout(session_id)
+        try:
+            yield data
+        finally:
+            self.checkin(session_id)
+
+    def checkout(self, session_id):
+        """The session's dict, restored from disk if it was spilled. Pair with ``checkin``."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _Entry()
+            entry.pins += 1
+            entry.last_used = time.monotonic()
+        with entry.lock:
+            if entry.data is None:
+                entry.data = self._restore(session_id, entry)
+            return entry.data
+
+    def checkin(self, session_id):
+        with self._lock:
+            entry = self._entries[session_id]
+        with entry.lock:
+            size = deep_sizeof(entry.data)
+            with self._lock:
+                self.resident_bytes += size - entry.bytes
+                entry.bytes = size
+                entry.pins -= 1
+                entry.last_used = time.monotonic()
+                over_budget = self.resident_bytes > self.budget
+        if over_budget:
+            self.enforce()
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self._sweep_interval()
+            self.evict_idle()
+            self.expire()
+
+    def enforce(self):
+        """Spill cold sessions until resident state is under ``LOW_WATER`` of the budget."""
+        now = time.monotonic()
+        with self._lock:
+            excess = self.resident_bytes - self.budget * LOW_WATER
+            cold = sorted(
+                (entry.last_used, session_id) for session_id, entry in self._entries.items()
+                if entry.data is not None and entry.pins == 0 and now - entry.last_used >= self.min_idle)
+        spilled = 0
+        for _, session_id in cold:
+            if excess <= 0:
+                break
+            freed = self._spill(session_id)
+            excess -= freed
+            spilled += bool(freed)
+        return spilled
+
+    def evict_idle(self):
+        """Spill every session idle for ``idle_ttl`` seconds; returns how many were spilled."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [session_id for session_id, entry in self._entries.items()
+                    if entry.data is not None and entry.pins == 0 and now - entry.last_used >= self.idle_ttl]
+        evicted = sum(bool(self._spill(session_id)) for session_id in idle)
+        with self._lock:
+            self.evicted += evicted
+        return evicted
+
+    def _spill(self, session_id):
+        """Write one session to disk and drop it from memory; returns the bytes freed."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is None:
+            return 0
+        with entry.lock:
+            if entry.data is None or entry.pins:
+                return 0
+            path = self._path(session_id)
+            try:
+                blob = zlib.compress(pickle.dumps(entry.data, protocol=pickle.HIGHEST_PROTOCOL))
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as handle:
+                    handle.write(blob)
+                os.replace(tmp_path, path)
+            except Exception:
+                # An unpicklable or unwritable session simply stays resident
+                logger.exception("could not spill session %s", session_id)
+                return 0
+            with self._lock:
+                if entry.pins:
+                    # Checked out while it was being written; the run keeps using the dict
+                    os.remove(path)
+                    return 0
+                freed = entry.bytes
+                entry.data = None
+                entry.bytes = 0
+                entry.spilled_bytes = len(blob)
+                self.resident_bytes -= freed
+                self.spills += 1
+        metrics.inc('mediguard_session_spills_total')
+        return freed
+
+    def _restore(self, session_id, entry):
+        if not entry.spilled_bytes:
+            return {}
+        path = self._path(session_id)
+        try:
+            with open(path, 'rb') as handle:
+                data = pickle.loads(zlib.decompress(handle.read()))
+        except FileNotFoundError:
+            # Expired while the user was away; they start over
+            data = {}
+        except Exception:
+            logger.exception("could not restore session %s, starting it afresh", session_id)
+            data = {}
+        else:
+            os.remove(path)
+            entry.restores += 1
+            with self._lock:
+                self.restores += 1
+            metrics.inc('mediguard_session_restores_total')
+        entry.spilled_bytes = 0
+        return data
+
+    def expire(self):
+        """Delete spill files older than ``max_age`` and forget their sessions."""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for name in os.listdir(self.directory):
+            session_id, extension = os.path.splitext(name)
+            path = os.path.join(self.directory, name)
+            if extension != '.session':
+                continue
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                entry = self._entries.get(session_id)
+                if entry is not None and (entry.data is not None or entry.pins):
+                    continue
+                self._entries.pop(session_id, None)
+                os.remove(path)
+            removed += 1
+        with self._lock:
+            self.expired += removed
+        return removed
+
+    def discard(self, session_id):
+        """Forget a session entirely, in memory and on disk."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self.resident_bytes -= entry.bytes
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(session_id))
+
+    def session_stats(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            return SessionStats(session_id, entry.bytes, entry.data is not None,
+                                time.monotonic() - entry.last_used, entry.spilled_bytes, entry.restores)
+
+    def stats(self):
+        with self._lock:
+            resident = sum(entry.data is not None for entry in self._entries.values())
+            spilled = [entry.spilled_bytes for entry in self._entries.values() if entry.data is None]
+            return ManagerStats(len(self._entries), resident, self.resident_bytes, self.budget, len(spilled),
+                                sum(spilled), self.spills, self.restores, self.expired, self.evicted)
+
+    def sessions(self):
+        """``SessionStats`` for every known session, largest first."""
+        with self._lock:
+            ids = list(self._entries)
+        stats = [self.session_stats(session_id) for session_id in ids]
+        return sorted((s for s in stats if s is not None), key=lambda s: -s.bytes)
+
+
+@functools.lru_cache(maxsize=None)
+def get_session_manager():
+    manager = SessionManager(
+        os.environ.get('MEDIGUARD_SESSION_DIR') or DEFAULT_SESSION_DIR,
+        budget=int(os.environ.get('MEDIGUARD_SESSION_BUDGET', DEFAULT_BUDGET)),
+        min_idle=float(os.environ.get('MEDIGUARD_SESSION_MIN_IDLE', 60)),
+        max_age=float(os.environ.get('MEDIGUARD_SESSION_MAX_AGE', 86400)),
+        idle_ttl=float(os.environ.get('MEDIGUARD_SESSION_IDLE_TTL', 1800)),
+    )
+    if metrics.ENABLED:
+        def collect():
+            stats = manager.stats()
+            metrics.set_gauge('mediguard_sessions_resident', stats.resident)
+            metrics.set_gauge('mediguard_session_resident_bytes', stats.resident_bytes)
+            metrics.set_gauge('mediguard_sessions_spilled', stats.spilled)
+        metrics.register_collector(collect)
+    return manager
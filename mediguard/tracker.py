@@ -0,0 +1,237 @@
+"""Persistent symptom tracker backed by SQLite.
+
+The database runs in WAL mode so readers never wait on the writer. Entries
+are indexed on ``(user_id, entry_date, id)`` and read back newest first in
+keyset-paginated pages, which keeps a page lookup cheap no matter how many
+months of history a user has. New entries are buffered and written in
+one transaction once ``batch_size`` of them are waiting, or by a background
+thread ``flush_interval`` seconds after the oldest arrived.
+
+Row ids are assigned by SQLite as entries are written and never change
+afterwards. Reads that hand out ids (``entries`` cursors and
+``entries_after``) write the buffer first, so users always see their own
+writes and every id they are given is final; ``count`` only merges the
+buffered entries into what the database returns.
+
+Saved profiles are opened with a name and a passphrase. Each name gets its
+own random salt, stored under a hash of the name, and the profile's user id
+is derived from the passphrase with that salt. The same passphrase thus
+opens different profiles under different names, and the database holds
+neither names nor passphrases.
+"""
+
+import atexit
+import datetime
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'mediguard_tracker.db'
+
+# Severity labels offered to users, mildest first
+SEVERITY_LEVELS = ('Mild', 'Medium', 'Severe')
+
+# Saved profiles are unlocked with a passphrase of at least this length
+MIN_PASSPHRASE_LENGTH = 12
+PASSPHRASE_ITERATIONS = 200_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS symptom_entries (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    entry_date TEXT NOT NULL,
+    symptom TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symptom_entries_user_date
+    ON symptom_entries (user_id, entry_date, id);
+CREATE INDEX IF NOT EXISTS idx_symptom_entries_user_id
+    ON symptom_entries (user_id, id);
+CREATE TABLE IF NOT EXISTS tracker_profiles (
+    name_key TEXT PRIMARY KEY,
+    salt BLOB NOT NULL
+);
+"""
+
+PROFILE_SALT_BYTES = 16
+
+
+class SymptomStore:
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=64, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # One connection shared by Streamlit's script threads, guarded by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # (user_id, entry_date, symptom, severity, created_at) not yet written
+        self._pending = []
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = None
+
+    def add(self, user_id, symptom, severity='Medium', entry_date=None):
+        entry_date = entry_date or datetime.date.today()
+        if isinstance(entry_date, datetime.date):
+            entry_date = entry_date.isoformat()
+        with self._lock:
+            self._pending.append((user_id, entry_date, symptom, severity, time.time()))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+                return
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name='mediguard-tracker', daemon=True)
+                self._flusher.start()
+        self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def entries(self, user_id, start=None, end=None, limit=20, before=None):
+        """A page of entries, newest first.
+
+        ``start`` and ``end`` bound the entry date (inclusive). Pass the
+        ``cursor`` of the last entry of a page as ``before`` to get the next.
+        """
+        clauses = ["user_id = ?"]
+        params = [user_id]
+        if start is not None:
+            clauses.append("entry_date >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("entry_date <= ?")
+            params.append(_iso(end))
+        if before is not None:
+            clauses.append("(entry_date < ? OR (entry_date = ? AND id < ?))")
+            params.extend([before[0], before[0], before[1]])
+        params.append(limit)
+
+        query = (f"SELECT id, entry_date, symptom, severity FROM symptom_entries "
+                 f"WHERE {' AND '.join(clauses)} ORDER BY entry_date DESC, id DESC LIMIT ?")
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'date': entry_date, 'symptom': symptom, 'severity': severity, 'cursor': (entry_date, entry_id)}
+            for entry_id, entry_date, symptom, severity in rows
+        ]
+
+    def entries_after(self, user_id, after_id=0, limit=None):
+        """``(id, entry_date, symptom, severity)`` rows with ids above ``after_id``, oldest first.
+
+        With ``limit`` at most that many rows are returned; pass the id of the
+        last one as ``after_id`` to read on.
+        """
+        with self._lock:
+            self._flush_locked()
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT id, entry_date, symptom, severity FROM symptom_entries "
+                "WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (user_id, after_id, -1 if limit is None else limit),
+            )]
+
+    def add_many(self, user_id, rows):
+        """Write ``(entry_date, symptom, severity)`` rows at once, in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._pending.extend((user_id, _iso(entry_date), symptom, severity, now)
+                                 for entry_date, symptom, severity in rows)
+            self._flush_locked()
+
+    def count(self, user_id, start=None, end=None):
+        query = "SELECT COUNT(*) FROM symptom_entries WHERE user_id = ?"
+        params = [user_id]
+        if start is not None:
+            query += " AND entry_date >= ?"
+            params.append(_iso(start))
+        if end is not None:
+            query += " AND entry_date <= ?"
+            params.append(_iso(end))
+        with self._lock:
+            written = self._conn.execute(query, params).fetchone()[0]
+            pending = sum(
+                1 for pending_user, entry_date, _, _, _ in self._pending
+                if pending_user == user_id
+                and (start is None or entry_date >= _iso(start)) and (end is None or entry_date <= _iso(end)))
+        return written + pending
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            self._conn.close()
+        self._wake.set()
+
+    def _run_flusher(self):
+        # Writes the buffer flush_interval seconds after it stops being empty
+        while True:
+            self._wake.wait()
+            if self._closed:
+                return
+            self._wake.clear()
+            time.sleep(self.flush_interval)
+            with self._lock:
+                if self._closed:
+                    return
+                try:
+                    self._flush_locked()
+                except sqlite3.Error:
+                    # The entries stay buffered and are retried on the next flush
+                    logger.exception("could not write tracker entries")
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        # On an error the batch stays buffered and is retried by the next flush
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO symptom_entries (user_id, entry_date, symptom, severity, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def profile_user_id(self, name, passphrase):
+        """Tracker user id of the saved profile ``name`` opened with ``passphrase``.
+
+        The profile's salt is created on first use. Names are compared
+        case-insensitively, ignoring surrounding and repeated whitespace.
+        """
+        name_key = hashlib.sha256(' '.join(name.lower().split()).encode('utf-8')).hexdigest()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO tracker_profiles (name_key, salt) VALUES (?, ?)",
+                               (name_key, os.urandom(PROFILE_SALT_BYTES)))
+            salt = self._conn.execute(
+                "SELECT salt FROM tracker_profiles WHERE name_key = ?", (name_key,)).fetchone()[0]
+        return passphrase_user_id(passphrase, salt)
+
+
+def passphrase_user_id(passphrase, salt):
+    """Tracker user id derived from ``passphrase`` and a profile's ``salt`` (bytes)."""
+    key = hashlib.pbkdf2_hmac('sha256', passphrase.encode('utf-8'), salt, PASSPHRASE_ITERATIONS)
+    return 'p-' + key.hex()[:32]
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime.date) else value
+
+
+@functools.lru_cache(maxsize=None)
+def get_store(path=None):
+    store = SymptomStore(path or os.environ.get('MEDIGUARD_TRACKER_DB', DEFAULT_DB_PATH))
+    # Buffered entries must not be lost when the server shuts down
+    atexit.register(store.flush)
+    return store
@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+
+from mediguard.analytics import (MAX_SYMPTOM_ROWS, OTHER_SYMPTOM, WINDOW_DAYS, AnalyticsCache,
+                                 SymptomAnalytics)
+from mediguard.tracker import SymptomStore
+
+TODAY = datetime.date.today()
+
+
+def days_ago(days):
+    return TODAY - datetime.timedelta(days=days)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SymptomStore(str(tmp_path / 'tracker.db'))
+    yield store
+    store.close()
+
+
+def test_summary_counts_streaks_and_trend(store):
+    for day in range(5):
+        store.add('alice', 'Headache', 'Mild' if day > 2 else 'Severe', days_ago(day))
+    store.add('alice', 'Cough', 'Medium', days_ago(10))
+    store.add('alice', 'cough ', 'Medium', days_ago(11))
+
+    summary = AnalyticsCache().get(store, 'alice').summary(TODAY, 30)
+    assert [(row.symptom, row.count, row.current_streak, row.longest_streak) for row in summary] == [
+        ('Headache', 5, 5, 5), ('Cough', 2, 0, 2)]
+    # Severity went from Mild to Severe over the five days
+    assert summary[0].severity_trend > 0
+
+
+def test_rolling_totals(store):
+    for day in (0, 0, 1, 8):
+        store.add('alice', 'Rash', 'Mild', days_ago(day))
+    analytics = SymptomAnalytics('alice')
+    analytics.refresh(store)
+    dates, totals, rolling_mean = analytics.rolling(TODAY, days=3, window=7)
+    assert dates == [days_ago(2), days_ago(1), TODAY]
+    assert totals == [0, 1, 2]
+    assert rolling_mean == pytest.approx([1 / 7, 1 / 7, 3 / 7])
+
+
+def test_refresh_only_reads_new_entries(store):
+    analytics = SymptomAnalytics('alice')
+    store.add('alice', 'Fever', 'Mild', TODAY)
+    assert analytics.refresh(store) == 1
+    assert analytics.refresh(store) == 0
+    store.add('alice', 'Fever', 'Mild', TODAY)
+    assert analytics.refresh(store) == 1
+    assert analytics.summary(TODAY, 7)[0].count == 2
+
+
+def test_far_dates_do_not_grow_the_matrices(store):
+    store.add('alice', 'Cough', 'Mild', datetime.date(1, 1, 1))
+    store.add('alice', 'Cough', 'Mild', datetime.date(9999, 12, 31))
+    store.add('alice', 'Cough', 'Mild', TODAY)
+    analytics = SymptomAnalytics('alice')
+    analytics.refresh(store)
+    assert analytics._counts.nbytes <= 8 * WINDOW_DAYS * 4
+    assert [(row.symptom, row.count) for row in analytics.summary(TODAY, 365)] == [('Cough', 1)]
+
+
+def test_window_slides_forward(store):
+    analytics = SymptomAnalytics('alice')
+    store.add('alice', 'Cough', 'Mild', days_ago(WINDOW_DAYS + 50))
+    analytics.refresh(store)
+    store.add('alice', 'Cough', 'Mild', TODAY)
+    analytics.refresh(store)
+    # The old entry slid out of the window
+    assert analytics.summary(TODAY, WINDOW_DAYS)[0].count == 1
+
+
+def test_extra_symptom_names_share_one_row(store):
+    for i in range(MAX_SYMPTOM_ROWS + 10):
+        store.add('alice', f"symptom {i}", 'Mild', TODAY)
+    analytics = SymptomAnalytics('alice')
+    analytics.refresh(store)
+    assert len(analytics.symptoms) == MAX_SYMPTOM_ROWS + 1
+    summary = {row.symptom: row.count for row in analytics.summary(TODAY, 7)}
+    assert summary[OTHER_SYMPTOM] == 10
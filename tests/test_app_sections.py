@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+streamlit_testing = pytest.importorskip('streamlit.testing.v1')
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app1.py')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('MEDIGUARD_TRACKER_DB', str(tmp_path / 'tracker.db'))
+    monkeypatch.setenv('MEDIGUARD_AUDIT_DIR', '0')
+    monkeypatch.setenv('MEDIGUARD_SESSION_DIR', str(tmp_path / 'sessions'))
+    app = streamlit_testing.AppTest.from_file(APP_PATH, default_timeout=60).run()
+    app.checkbox(key='disclaimer').check().run()
+    return app
+
+
+def test_widget_state_survives_switching_sections(app):
+    app.checkbox(key='quick_Cough').check().run()
+    app.selectbox(key='patient_age').set_value("51-70").run()
+
+    app.radio(key='section').set_value("📱 Health Tools").run()
+    app.text_input(key='tracker_symptom').input("Back pain").run()
+    app.select_slider(key='tracker_severity').set_value('Severe').run()
+
+    app.radio(key='section').set_value("🤖 AI Assistant").run()
+    app.radio(key='section').set_value("🏠 Symptom Checker").run()
+    assert not app.exception
+    assert app.checkbox(key='quick_Cough').value
+    assert app.selectbox(key='patient_age').value == "51-70"
+
+    app.radio(key='section').set_value("📱 Health Tools").run()
+    assert app.text_input(key='tracker_symptom').value == "Back pain"
+    assert app.select_slider(key='tracker_severity').value == 'Severe'
+
+
+def test_every_quick_select_symptom_is_scored(app, tmp_path):
+    from mediguard.kb import KnowledgeBase
+
+    scorer = KnowledgeBase(snapshot_dir=str(tmp_path / 'snapshots')).current().scorer
+    quick = [checkbox.label for checkbox in app.checkbox if checkbox.key.startswith('quick_')]
+    assert len(quick) == 16
+    for symptom in quick:
+        assessment = scorer.assess([symptom])
+        assert assessment.matched and assessment.ranked, symptom
+
+
+def test_tracker_profiles_need_name_and_passphrase(app):
+    app.radio(key='section').set_value("📱 Health Tools").run()
+
+    def open_profile(name, passphrase="correct horse battery"):
+        app.text_input(key='tracker_profile_name').input(name).run()
+        app.text_input(key='tracker_passphrase').input(passphrase).run()
+
+    open_profile("Alice")
+    app.text_input(key='tracker_symptom').input("Back pain").run()
+    next(button for button in app.button if button.label == "Add to Tracker").click().run()
+    assert any("Back pain" in md.value for md in app.markdown)
+
+    # Same passphrase, other name: a different, empty profile
+    open_profile("Bob")
+    assert not any("Back pain" in md.value for md in app.markdown)
+
+    open_profile("Alice", "short")
+    assert any("at least" in warning.value for warning in app.warning)
+
+    open_profile("alice")
+    assert not app.exception
+    assert any("Back pain" in md.value for md in app.markdown)
+
+
+def test_text_preview_is_only_reassessed_when_the_symptoms_change(app):
+    from mediguard.cache import shared_cache
+
+    app.radio(key='input_method').set_value("Describe Your Symptoms").run()
+    app.text_area(key='symptom_text').input("I have a cough").run()
+    assert any("Most likely: Common Cold" in caption.value for caption in app.caption)
+
+    def lookups():
+        stats = shared_cache().stats()
+        return stats.hits + stats.misses
+
+    before = lookups()
+    app.text_area(key='symptom_text').input("I have a cough since yesterday").run()
+    assert lookups() == before
+    app.text_area(key='symptom_text').input("I have a cough and a runny nose").run()
+    assert lookups() == before + 1
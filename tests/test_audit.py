@@ -0,0 +1,92 @@
+import glob
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from mediguard.audit import ACTIVE_NAME, AuditLog
+
+
+def read_events(directory):
+    events = []
+    for path in sorted(glob.glob(os.path.join(directory, 'audit-*.jsonl.gz'))):
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            events.extend(json.loads(line) for line in handle)
+    active = os.path.join(directory, ACTIVE_NAME)
+    if os.path.exists(active):
+        with open(active, encoding='utf-8') as handle:
+            events.extend(json.loads(line) for line in handle)
+    return events
+
+
+@pytest.fixture
+def make_log(tmp_path):
+    logs = []
+
+    def make(**options):
+        log = AuditLog(str(tmp_path), **options)
+        logs.append(log)
+        return log
+
+    yield make
+    for log in logs:
+        log.close()
+
+
+def test_events_are_written_as_json_lines(make_log, tmp_path):
+    log = make_log()
+    log.record('assessment', symptoms=["cough"], matched=('cough',), risk_level='low_risk')
+    log.record('chat', message="héllo", intent='greeting')
+    assert log.flush(5)
+    [first, second] = read_events(str(tmp_path))
+    assert first['event'] == 'assessment' and first['matched'] == ['cough']
+    assert second['message'] == "héllo" and second['ts'].endswith('+00:00')
+
+
+def test_size_rotation_compresses_and_keeps_every_event(make_log, tmp_path):
+    log = make_log(max_bytes=2000, batch_size=8)
+    for i in range(300):
+        log.record('chat', i=i)
+        if i % 20 == 0:
+            assert log.flush(5)
+    log.close()
+    assert log.rotations > 0
+    assert len(glob.glob(str(tmp_path / 'audit-*.jsonl.gz'))) == log.rotations
+    assert not glob.glob(str(tmp_path / 'audit-*.jsonl'))
+    assert sorted(event['i'] for event in read_events(str(tmp_path))) == list(range(300))
+
+
+def test_two_writers_share_a_directory(make_log, tmp_path):
+    first, second = make_log(max_bytes=1500, batch_size=4), make_log(max_bytes=1500, batch_size=4)
+    for i in range(200):
+        (first if i % 2 else second).record('chat', i=i)
+        if i % 10 == 0:
+            assert first.flush(5) and second.flush(5)
+    first.close()
+    second.close()
+    assert sorted(event['i'] for event in read_events(str(tmp_path))) == list(range(200))
+
+
+def test_age_rotation_counts_from_the_first_event_on_disk(make_log, tmp_path):
+    old = time.time() - 3600
+    (tmp_path / ACTIVE_NAME).write_text(
+        json.dumps({'ts': time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(old)), 'event': 'chat'}) + '\n',
+        encoding='utf-8')
+    log = make_log(max_age=60)
+    log.record('chat')
+    assert log.flush(5)
+    log.record('chat')
+    assert log.flush(5)
+    assert log.rotations == 1
+    assert len(read_events(str(tmp_path))) == 3
+
+
+def test_a_full_queue_drops_instead_of_blocking(make_log):
+    log = make_log(queue_size=1)
+    # With the writer stopped nothing drains the queue
+    log.close()
+    log.record('chat')
+    log.record('chat')
+    assert log.dropped == 1
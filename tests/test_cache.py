@@ -0,0 +1,71 @@
+import json
+import shutil
+
+import pytest
+
+from mediguard.cache import AssessmentCache, canonical_key
+from mediguard.engine import MediGuardAI
+from mediguard.kb import KnowledgeBase
+from mediguard.knowledge import DEFAULT_KNOWLEDGE_PATH
+
+
+def test_canonical_key_ignores_order_case_and_duplicates():
+    assert canonical_key(["Cough ", "fever", "cough", " "], '18-30') == (('cough', 'fever'), '18-30', None)
+    assert canonical_key(["fever", "Cough"]) == canonical_key(["cough", "FEVER"])
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AssessmentCache(2)
+    cache.put('a', 1, 'v1')
+    cache.put('b', 2, 'v1')
+    assert cache.get('a', 'v1') == 1
+    cache.put('c', 3, 'v1')
+    assert (cache.get('a', 'v1'), cache.get('b', 'v1'), cache.get('c', 'v1')) == (1, None, 3)
+    assert cache.stats()[:3] == (3, 1, 1)
+
+
+def test_a_new_version_drops_every_entry():
+    cache = AssessmentCache()
+    cache.put('a', 1, 'v1')
+    assert cache.get('a', 'v2') is None
+    assert cache.stats().invalidations == 1
+    cache.put('a', 2, 'v2')
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = AssessmentCache(0)
+    cache.put('a', 1, 'v1')
+    assert cache.get('a', 'v1') is None
+    with pytest.raises(ValueError):
+        AssessmentCache(-1)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / 'knowledge.json'
+    shutil.copyfile(DEFAULT_KNOWLEDGE_PATH, path)
+    return MediGuardAI(AssessmentCache(), KnowledgeBase(str(path), snapshot_dir=str(tmp_path)))
+
+
+def test_orderings_share_one_entry(engine):
+    first = engine.assess(["Cough", "Runny Nose"])
+    assert engine.assess(["runny nose", "cough", "cough"]) is first
+    assert engine.cache.stats()[:2] == (1, 1)
+    assert engine.assess(["cough", "runny nose"], age_group='71+') is not first
+
+
+def test_knowledge_reload_invalidates_cached_assessments(engine):
+    assert engine.assess(["cough"]).condition == 'Common Cold'
+
+    path = engine.knowledge_base.path
+    with open(path, encoding='utf-8') as handle:
+        tables = json.load(handle)
+    tables['medical_knowledge']['low_risk']['profiles']['Seasonal Illness']['cough'] = 0.9
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(tables, handle)
+    assert engine.knowledge_base.reload(force=True)
+
+    assert engine.assess(["cough"]).condition == 'Seasonal Illness'
+    assert engine.cache.stats().invalidations == 1
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from mediguard import cli
+
+
+def run(tmp_path, *inputs):
+    output = tmp_path / 'results.jsonl'
+    assert cli.main([*map(str, inputs), '-o', str(output), '--workers', '1']) == 0
+    return [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+
+
+def test_jsonl_records_are_triaged_in_order(tmp_path):
+    intake = tmp_path / 'intake.jsonl'
+    intake.write_text('{"id": 1, "symptoms": ["chest pain", "shortness of breath"]}\n'
+                      '\n'
+                      '{"id": 2, "symptoms": "I have a runny nose and I keep sneezing"}\n', encoding='utf-8')
+    results = run(tmp_path, intake)
+    assert [(result['id'], result['risk_level']) for result in results] == [(1, 'high_risk'), (2, 'low_risk')]
+
+
+@pytest.mark.parametrize('line, error', [
+    ('{"id": 7}', "no 'symptoms' given"),
+    ('{"id": 7, "symptoms": ""}', "no 'symptoms' given"),
+    ('{"id": 7, "symptoms": []}', "no 'symptoms' given"),
+    ('{"id": 7, "symptoms": [null, "cough"]}', "'symptoms' may only hold strings"),
+    ('{"id": 7, "symptoms": [{"name": "cough"}]}', "'symptoms' may only hold strings"),
+    ('{"id": 7, "symptoms": 3}', "'symptoms' must be a string or a list"),
+])
+def test_records_without_usable_symptoms_are_not_triaged(tmp_path, line, error):
+    intake = tmp_path / 'intake.jsonl'
+    intake.write_text(line + '\n', encoding='utf-8')
+    [result] = run(tmp_path, intake)
+    assert result == {'id': 7, 'symptoms': [], 'error': error}
+
+
+def test_csv_without_a_symptoms_column_or_with_an_empty_cell(tmp_path):
+    missing = tmp_path / 'missing.csv'
+    missing.write_text('id,complaint\n1,cough\n', encoding='utf-8')
+    empty = tmp_path / 'empty.csv'
+    empty.write_text('id,symptoms\n2,\n3,fever; cough\n', encoding='utf-8')
+    results = run(tmp_path, missing, empty)
+    assert [result.get('error') for result in results] == ["no 'symptoms' column", "no 'symptoms' given", None]
+    assert results[2]['symptoms'] == ['fever', 'cough']
+
+
+def test_line_number_ids_name_their_file(tmp_path):
+    first, second = tmp_path / 'a.jsonl', tmp_path / 'b.jsonl'
+    first.write_text('not json\n', encoding='utf-8')
+    second.write_text('[1]\n', encoding='utf-8')
+    results = run(tmp_path, first, second)
+    assert [result['id'] for result in results] == [f"{first}:1", f"{second}:1"]
+
+
+def test_missing_input_is_reported_without_a_traceback(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([str(tmp_path / 'nope.jsonl')])
+    assert exit_info.value.code == 2
+    assert "cannot read" in capsys.readouterr().err
@@ -0,0 +1,82 @@
+import random
+import threading
+
+import pytest
+
+from mediguard.cache import AssessmentCache
+from mediguard.engine import MediGuardAI
+from mediguard.kb import KnowledgeBase
+
+SYMPTOMS = ["Fever", "Cough", "Headache", "Chest Pain", "Shortness of Breath", "Dizziness", "Nausea", "Rash",
+            "Sore Throat", "Runny Nose", "Fatigue", "Vomiting", "Abdominal Pain", "Chills", "Sneezing"]
+MESSAGES = ["Hello", "What should I do for fever?", "I have a headache", "Give me health tips",
+            "my chest pain is getting worse", "can you suggest something for a cough", "thanks, bye"]
+NARRATIVES = ["I have a headake and feaver since morning", "feeling breathless and dizzy after climbing stairs",
+              "sore throat, runny nose and a bit of coughing", "my son has a mild rash and high fever"]
+
+THREADS = 8
+
+
+@pytest.fixture(scope='module')
+def knowledge_base(tmp_path_factory):
+    return KnowledgeBase(snapshot_dir=str(tmp_path_factory.mktemp('snapshots')))
+
+
+def build_workload(count, seed=0):
+    rng = random.Random(seed)
+    workload = []
+    for i in range(count):
+        kind = rng.choice(('assess', 'chat', 'extract'))
+        if kind == 'assess':
+            workload.append(('assess', rng.sample(SYMPTOMS, rng.randint(1, 4)), rng.choice(["18-30", "31-50"])))
+        elif kind == 'chat':
+            workload.append(('chat', rng.choice(MESSAGES), f"session-{i % 17}:{i}"))
+        else:
+            workload.append(('extract', rng.choice(NARRATIVES), None))
+    return workload
+
+
+def run_one(engine, item):
+    kind, payload, extra = item
+    if kind == 'assess':
+        assessment = engine.assess(payload, age_group=extra)
+        return assessment.risk_level, assessment.condition, assessment.ranked
+    if kind == 'chat':
+        return engine.chat_response(payload, seed=extra)
+    return tuple(engine.knowledge.lexicon.extract(payload))
+
+
+@pytest.mark.parametrize('cache_size', [0, 64])
+def test_shared_engine_gives_single_threaded_results(knowledge_base, cache_size):
+    workload = build_workload(600)
+    reference_engine = MediGuardAI(AssessmentCache(0), knowledge_base)
+    reference = [run_one(reference_engine, item) for item in workload]
+
+    # A small cache keeps evicting, so threads race on its bookkeeping
+    engine = MediGuardAI(AssessmentCache(cache_size), knowledge_base)
+    mismatches = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(offset):
+        barrier.wait()
+        for step in range(len(workload)):
+            index = (offset + step) % len(workload)
+            result = run_one(engine, workload[index])
+            if result != reference[index]:
+                mismatches.append((workload[index], result, reference[index]))
+
+    pool = [threading.Thread(target=worker, args=(n * len(workload) // THREADS,)) for n in range(THREADS)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    assert mismatches == []
+
+
+def test_chat_replies_ignore_global_random_state(knowledge_base):
+    engine = MediGuardAI(AssessmentCache(0), knowledge_base)
+    random.seed(1)
+    first = [engine.chat_response("Give me health tips", seed=seed) for seed in range(20)]
+    random.seed(2)
+    assert [engine.chat_response("Give me health tips", seed=seed) for seed in range(20)] == first
+    assert len(set(first)) > 1
@@ -0,0 +1,88 @@
+import datetime
+import gzip
+import io
+import json
+
+import pytest
+
+from mediguard import export
+from mediguard.history import ChatHistory
+from mediguard.tracker import SymptomStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SymptomStore(str(tmp_path / 'tracker.db'))
+    yield store
+    store.close()
+
+
+def jsonl_gz(*lines):
+    return io.BytesIO(gzip.compress(''.join(line + '\n' for line in lines).encode('utf-8')))
+
+
+HEADER = json.dumps({'type': 'header', 'format': export.FORMAT_VERSION})
+
+
+@pytest.mark.parametrize('fmt', export.FORMATS)
+def test_round_trip(store, tmp_path, fmt):
+    today = datetime.date.today()
+    for day in range(30):
+        store.add('alice', 'Headache', 'Mild', today - datetime.timedelta(days=day))
+    turns = [{'role': 'user', 'message': "I have a headache"}, {'role': 'assistant', 'message': "Rest and hydrate."}]
+    data = b''.join(export.export(fmt, turns, store, 'alice', chunk_size=7))
+
+    target = SymptomStore(str(tmp_path / 'imported.db'))
+    history = ChatHistory()
+    report = export.import_history(io.BytesIO(data), history, target, 'bob', chunk_size=7)
+    assert report == export.ImportReport(2, 30, 0, [])
+    assert list(history) == turns
+    assert [row[1:] for row in target.entries_after('bob')] == [row[1:] for row in store.entries_after('alice')]
+    target.close()
+
+
+def test_dates_outside_the_plausible_range_are_rejected(store):
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    records = [
+        {'type': 'symptom', 'date': '0001-01-01', 'symptom': 'Cough', 'severity': 'Mild'},
+        {'type': 'symptom', 'date': '9999-12-31', 'symptom': 'Cough', 'severity': 'Mild'},
+        {'type': 'symptom', 'date': '1999-12-31', 'symptom': 'Cough', 'severity': 'Mild'},
+        {'type': 'symptom', 'date': tomorrow.isoformat(), 'symptom': 'Cough', 'severity': 'Mild'},
+    ]
+    report = export.import_history(jsonl_gz(HEADER, *map(json.dumps, records)), store=store, user_id='alice')
+    assert (report.symptoms, report.rejected) == (1, 3)
+    assert [row[1] for row in store.entries_after('alice')] == [tomorrow.isoformat()]
+
+
+@pytest.mark.parametrize('fmt', export.FORMATS)
+def test_far_dates_are_rejected_in_both_formats(store, fmt):
+    records = [{'type': 'header', 'format': export.FORMAT_VERSION},
+               {'type': 'symptom', 'date': '0001-01-01', 'symptom': 'Cough', 'severity': 'Mild'}]
+    encode = export.iter_jsonl_gz if fmt == 'jsonl.gz' else export.iter_columnar
+    report = export.import_history(io.BytesIO(b''.join(encode(records))), store=store, user_id='alice')
+    assert (report.symptoms, report.rejected) == (0, 1)
+
+
+def test_blank_lines_count_toward_the_record_limit(monkeypatch):
+    monkeypatch.setattr(export, 'MAX_IMPORT_RECORDS', 1000)
+    upload = io.BytesIO(gzip.compress(HEADER.encode() + b'\n' * 5000))
+    with pytest.raises(ValueError, match="more than 1000 lines"):
+        export.import_history(upload)
+
+
+def test_non_object_header_is_rejected():
+    report = export.import_history(jsonl_gz('[1, 2]'))
+    assert report.rejected == 1
+
+
+def test_columnar_block_expanding_past_the_limit_is_refused(monkeypatch):
+    records = [{'type': 'chat', 'role': 'user', 'message': 'x' * 5000}]
+    data = b''.join(export.iter_columnar(records))
+    monkeypatch.setattr(export, 'MAX_BLOCK_BYTES', 1024)
+    with pytest.raises(ValueError, match="expands past"):
+        export.import_history(io.BytesIO(data), ChatHistory())
+
+
+def test_unknown_files_are_refused():
+    with pytest.raises(ValueError, match="not a MediGuard history export"):
+        export.import_history(io.BytesIO(b"id,symptom\n1,cough\n"))
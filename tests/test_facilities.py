@@ -0,0 +1,91 @@
+import random
+import sqlite3
+
+import pytest
+
+from mediguard.facilities import (CAPABILITIES, DEFAULT_FACILITIES_PATH, Facility, FacilityIndex, haversine_km,
+                                  load_facilities)
+
+
+def random_facilities(count, seed=0):
+    rng = random.Random(seed)
+    facilities = []
+    for i in range(count):
+        # Mostly clustered around one city, with a few far away and near the poles
+        if i % 10:
+            lat, lon = 28.6 + rng.gauss(0, 0.3), 77.2 + rng.gauss(0, 0.3)
+        else:
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        capabilities = frozenset(capability for capability in CAPABILITIES if rng.random() < 0.3)
+        facilities.append(Facility(str(i), f"Facility {i}", lat, lon, '', capabilities))
+    return facilities
+
+
+def brute_force(facilities, lat, lon, k, require=(), max_km=None):
+    distances = sorted(
+        (haversine_km(lat, lon, f.lat, f.lon), f.id) for f in facilities
+        if set(require) <= f.capabilities)
+    return [(distance, facility_id) for distance, facility_id in distances
+            if max_km is None or distance <= max_km][:k]
+
+
+@pytest.fixture(scope='module')
+def facilities():
+    return random_facilities(2000)
+
+
+@pytest.fixture(scope='module')
+def index(facilities):
+    return FacilityIndex(facilities)
+
+
+@pytest.mark.parametrize('require', [(), ('trauma_center',), ('emergency_24_7', 'lab'), tuple(CAPABILITIES)])
+def test_matches_brute_force(facilities, index, require):
+    rng = random.Random(1)
+    for _ in range(50):
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        if rng.random() < 0.7:
+            lat, lon = 28.6 + rng.gauss(0, 0.5), 77.2 + rng.gauss(0, 0.5)
+        k = rng.choice([1, 3, 10])
+        max_km = rng.choice([None, 5.0, 50.0])
+        found = [(distance, facility.id) for distance, facility in index.nearest(lat, lon, k, require, max_km)]
+        expected = brute_force(facilities, lat, lon, k, require, max_km)
+        assert [facility_id for _, facility_id in found] == [facility_id for _, facility_id in expected]
+        assert [distance for distance, _ in found] == pytest.approx([distance for distance, _ in expected])
+
+
+def test_antimeridian_neighbours_are_found():
+    index = FacilityIndex([Facility('east', "East", 0.0, 179.9, '', frozenset()),
+                           Facility('far', "Far", 0.0, 170.0, '', frozenset())])
+    [(distance, facility)] = index.nearest(0.0, -179.9, k=1)
+    assert facility.id == 'east' and distance == pytest.approx(22.24, abs=0.01)
+
+
+def test_edge_cases(index):
+    assert index.nearest(0, 0, k=0) == []
+    assert FacilityIndex([]).nearest(0, 0) == []
+    with pytest.raises(ValueError, match="unknown capabilities"):
+        index.nearest(0, 0, require=['helipad'])
+
+
+def test_csv_and_sqlite_sources_agree(tmp_path):
+    from_csv = load_facilities(DEFAULT_FACILITIES_PATH)
+    assert from_csv
+
+    path = str(tmp_path / 'facilities.sqlite')
+    connection = sqlite3.connect(path)
+    connection.execute(f"CREATE TABLE facilities (id, name, lat, lon, phone, {', '.join(CAPABILITIES)})")
+    connection.executemany(
+        f"INSERT INTO facilities VALUES ({', '.join('?' * (5 + len(CAPABILITIES)))})",
+        [(f.id, f.name, f.lat, f.lon, f.phone, *(int(c in f.capabilities) for c in CAPABILITIES))
+         for f in from_csv])
+    connection.commit()
+    connection.close()
+    assert load_facilities(path) == from_csv
+
+
+def test_invalid_coordinates_are_rejected(tmp_path):
+    path = tmp_path / 'facilities.csv'
+    path.write_text("id,name,lat,lon,phone\n1,Nowhere,95,0,\n", encoding='utf-8')
+    with pytest.raises(ValueError, match="invalid coordinates"):
+        load_facilities(str(path))
@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from mediguard import kb
+from mediguard.kb import KnowledgeBase, load, snapshot_path
+from mediguard.knowledge import DEFAULT_KNOWLEDGE_PATH
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'knowledge.json'
+    shutil.copyfile(DEFAULT_KNOWLEDGE_PATH, path)
+    return str(path)
+
+
+def edit(path, change):
+    with open(path, encoding='utf-8') as handle:
+        tables = json.load(handle)
+    change(tables)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(tables, handle)
+
+
+def test_snapshot_round_trip(source, monkeypatch):
+    compiled = load(source)
+    assert os.path.exists(snapshot_path(source))
+
+    # Loading a current snapshot must not compile anything
+    monkeypatch.setattr(kb.KnowledgeSnapshot, '__init__', None)
+    loaded = load(source)
+    assert loaded.version == compiled.version
+    assert not loaded.scorer.weights.flags.writeable
+    assert (loaded.scorer.weights == compiled.scorer.weights).all()
+    for symptoms in (["chest pain"], ["feaver and headake"], ["dolor"]):
+        assert loaded.scorer.assess(symptoms) == compiled.scorer.assess(symptoms)
+    assert loaded.router.route("I think I'm having a heart attack") == ('emergency', 'heart attack')
+
+
+def test_stale_or_corrupt_snapshots_are_recompiled(source, monkeypatch):
+    digest = load(source).digest
+    monkeypatch.setattr(kb, 'SNAPSHOT_FORMAT', kb.SNAPSHOT_FORMAT + 1)
+    assert kb.load_snapshot(snapshot_path(source), digest) is None
+    assert load(source).digest == digest
+    assert kb.load_snapshot(snapshot_path(source), digest) is not None
+
+    with open(snapshot_path(source), 'r+b') as handle:
+        handle.seek(200)
+        handle.write(b'\xff' * 64)
+    assert load(source).scorer.assess(["cough"]).condition == 'Common Cold'
+
+
+def test_reload_swaps_in_edited_knowledge(source):
+    knowledge_base = KnowledgeBase(source)
+    before = knowledge_base.current()
+    assert not knowledge_base.reload()
+
+    edit(source, lambda tables: tables['emergency_keywords'].append('anaphylaxis'))
+    assert knowledge_base.reload(force=True)
+    after = knowledge_base.current()
+    assert after.version != before.version and knowledge_base.reloads == 1
+    assert after.router.route("possible anaphylaxis")[0] == 'emergency'
+    # Requests that took the old snapshot keep using it
+    assert before.router.route("possible anaphylaxis")[0] != 'emergency'
+
+
+def test_a_broken_file_keeps_the_current_snapshot(source):
+    knowledge_base = KnowledgeBase(source)
+    before = knowledge_base.current()
+    edit(source, lambda tables: tables.pop('medical_knowledge'))
+    assert not knowledge_base.reload(force=True)
+    assert knowledge_base.current() is before
+    assert isinstance(knowledge_base.last_error, ValueError)
+
+
+def test_overlay_is_keyed_by_both_files(source, tmp_path):
+    overlay = tmp_path / 'es.json'
+    overlay.write_text(json.dumps({'synonyms': {'tos': 'cough'}}), encoding='utf-8')
+    first = load(str(overlay), base_path=source)
+    assert first.lexicon.extract("tengo tos") == ['cough']
+
+    edit(source, lambda tables: tables.update(version='test'))
+    assert load(str(overlay), base_path=source).digest != first.digest
@@ -0,0 +1,50 @@
+import pytest
+
+from mediguard.engine import MediGuardAI
+from mediguard.kb import KnowledgeBase
+
+
+@pytest.fixture(scope='module')
+def knowledge_base(tmp_path_factory):
+    return KnowledgeBase(snapshot_dir=str(tmp_path_factory.mktemp('snapshots')))
+
+
+@pytest.fixture(scope='module')
+def lexicon(knowledge_base):
+    return knowledge_base.current().lexicon
+
+
+@pytest.mark.parametrize('text', [
+    "tonight chest feels fine",
+    "fell asleep on the couch",
+    "what a blessing",
+    "I was playing chess all afternoon",
+    "I heard to breathe you need air",
+    "suddenly numbness is not what I meant",
+    "I was cooking dinner",
+    "fewer visits this year",
+])
+def test_ordinary_words_are_not_corrected_into_symptoms(lexicon, text):
+    assert lexicon.extract(text) == []
+
+
+def test_several_is_not_severe(lexicon):
+    assert lexicon.extract("I have several pain points in my back") == ['pain']
+
+
+@pytest.mark.parametrize('text', ["tonight chest feels fine", "I have several pain points in my back"])
+def test_ordinary_sentences_stay_low_risk(knowledge_base, text):
+    assessment = MediGuardAI(knowledge_base=knowledge_base).assess([text])
+    assert assessment.risk_level == 'low_risk'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("feaver and headake", ['fever', 'headache']),
+    ("I have coughs and fevers", ['cough', 'fever']),
+    ("shortnes of breath", ['shortness of breath']),
+    ("difficult breathing", ['difficulty breathing']),
+    ("sevre bleeding", ['severe bleeding', 'bleeding']),
+    ("vomitting and dizzyness", ['vomiting', 'dizziness']),
+])
+def test_typos_are_still_corrected(lexicon, text, expected):
+    assert lexicon.extract(text) == expected
@@ -0,0 +1,57 @@
+import pytest
+
+from mediguard.lexicon import IncrementalExtractor, fold
+from mediguard.locales import LocalePacks
+
+
+@pytest.fixture(scope='module')
+def spanish(tmp_path_factory):
+    packs = LocalePacks(snapshot_dir=str(tmp_path_factory.mktemp('snapshots')))
+    return packs.engine('es')
+
+
+def test_fold_strips_accents_and_case():
+    assert fold("Escalofríos, NÁUSEAS y Corazón") == "escalofrios, nauseas y corazon"
+    assert fold("headache") == "headache"
+
+
+@pytest.mark.parametrize('message', [
+    "Creo que es un ataque al corazón",
+    "creo que es un ataque al corazon",
+    "Tengo un dolor en el pecho muy fuerte",
+    "Me duele el pecho desde anoche",
+    "Mi padre se desmayó",
+    "No puedo respirar",
+    "tengo dolores de pecho",
+])
+def test_spanish_emergencies_route_to_emergency(spanish, message):
+    assert spanish.chat(message, 1).intent == 'emergency'
+
+
+def test_accented_words_are_not_split(spanish):
+    lexicon = spanish.knowledge.lexicon
+    assert lexicon.extract("Tengo escalofríos, náuseas y DOLOR DE CABEZA") == ['chills', 'nausea', 'headache']
+    assert lexicon.extract("tengo escalofrios") == ['chills']
+
+
+def test_incremental_extraction_matches_full_scan_on_accented_text(spanish):
+    lexicon = spanish.knowledge.lexicon
+    extractor = IncrementalExtractor()
+    text = ""
+    for addition in ["Tengo escalofríos", " y mareo", ", además dolor de garganta", " y sarpullido"]:
+        text += addition
+        extractor.update(text, lexicon)
+        assert extractor.matches() == lexicon.find_all(text)
+
+
+@pytest.mark.parametrize('text, terms, condition', [
+    ("tengo fiebre alta y escalofríos", ['high fever', 'chills'], 'Severe Infection'),
+    ("tengo vómitos y náuseas", ['vomiting', 'nausea'], 'Gastroenteritis'),
+    ("dolor abdominal desde ayer", ['abdominal pain'], 'Gastroenteritis'),
+    ("mucho sangrado abundante", ['severe bleeding'], 'Severe Trauma'),
+])
+def test_common_spanish_phrasings_are_scored(spanish, text, terms, condition):
+    assessment = spanish.assess([text])
+    assert set(terms) <= set(spanish.knowledge.lexicon.extract(text))
+    assert set(assessment.matched) == set(terms)
+    assert assessment.condition == condition
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import mediguard
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import import_budget  # noqa: E402
+
+
+def test_import_stays_lean():
+    # Heavy modules are only pulled in when a snapshot or a store is first used
+    probe = ("import sys, mediguard; "
+             "print(sorted(m for m in ('streamlit', 'numpy', 'sqlite3', 'asyncio', 'yaml') if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_import_budget():
+    # Generous next to the 5 ms budget: this guards against regressions
+    # that load the knowledge or numpy at import, not against timing noise
+    assert import_budget.main(['--budget-ms', '50', '--runs', '3']) == 0
+
+
+def test_tables_are_loaded_on_first_use():
+    assert set(mediguard.MEDICAL_KNOWLEDGE) == {'high_risk', 'medium_risk', 'low_risk'}
+    assert 'fever' in mediguard.HOME_REMEDIES
+    with pytest.raises(AttributeError):
+        mediguard.NOT_A_TABLE
@@ -0,0 +1,52 @@
+import pytest
+
+from mediguard.kb import KnowledgeBase
+from mediguard.knowledge import load_defaults
+
+
+@pytest.fixture(scope='module')
+def router(tmp_path_factory):
+    return KnowledgeBase(snapshot_dir=str(tmp_path_factory.mktemp('snapshots'))).current().router
+
+
+def baseline_is_emergency(message):
+    # The substring scan the chat used before the router existed
+    return any(keyword in message.lower() for keyword in load_defaults()['emergency_keywords'])
+
+
+@pytest.mark.parametrize('message', [
+    "I have chest pains",
+    "he had heart attacks before",
+    "I think I'm having a heart attack",
+    "CHEST PAIN since this morning",
+    "my dad had two strokes",
+    "I can't breathe",
+    "he is dying",
+    "this is an emergency",
+    "she is unconscious",
+])
+def test_emergencies_found_by_the_baseline_still_are(router, message):
+    assert baseline_is_emergency(message)
+    assert router.route(message)[0] == 'emergency'
+
+
+def test_irregular_plurals_of_emergency_keywords(router):
+    assert router.route("we had several emergencies") == ('emergency', 'emergency')
+
+
+@pytest.mark.parametrize('message, keyword', [
+    ("my headaches are bad", 'headache'),
+    ("fevers at night", 'fever'),
+    ("coughing a lot", 'cough'),
+])
+def test_inflected_symptoms_route_to_their_advice(router, message, keyword):
+    assert router.route(message) == ('symptom', keyword)
+
+
+@pytest.mark.parametrize('message', ["this is fine", "his arm", "studying hard", "thanks"])
+def test_keywords_do_not_fire_inside_other_words(router, message):
+    assert router.route(message) == ('unknown', None)
+
+
+def test_greetings(router):
+    assert router.route("Hi there") == ('greeting', 'hi')
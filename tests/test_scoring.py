@@ -0,0 +1,51 @@
+import pytest
+
+from mediguard.kb import KnowledgeBase
+
+
+@pytest.fixture(scope='module')
+def scorer(tmp_path_factory):
+    return KnowledgeBase(snapshot_dir=str(tmp_path_factory.mktemp('snapshots'))).current().scorer
+
+
+@pytest.mark.parametrize('symptoms, condition', [
+    (["Fever"], 'Flu'),
+    (["Fatigue"], 'Flu'),
+    (["Chills"], 'Flu'),
+    (["Rash"], 'Allergies'),
+    (["Nausea"], 'Gastroenteritis'),
+    (["Vomiting"], 'Gastroenteritis'),
+    (["Abdominal Pain"], 'Gastroenteritis'),
+    (["Dizziness"], 'Dehydration'),
+])
+def test_common_single_symptoms_are_scored(scorer, symptoms, condition):
+    assessment = scorer.assess(symptoms)
+    assert (assessment.risk_level, assessment.condition) == ('low_risk', condition)
+    assert assessment.matched
+
+
+def test_misspelt_fever_contributes(scorer):
+    assessment = scorer.assess(["feaver and headake"])
+    assert assessment.matched == ('fever', 'headache')
+    assert dict(assessment.ranked)['Flu'] == pytest.approx(1.4)
+
+
+def test_longer_terms_keep_their_own_weights(scorer):
+    assert scorer.assess(["high fever"]).condition == 'Severe Infection'
+    assert scorer.assess(["vomiting blood"]).matched == ('vomiting blood',)
+    assert scorer.assess(["chest pain"]).risk_level == 'high_risk'
+
+
+def test_nothing_recognised_is_general_discomfort(scorer):
+    assessment = scorer.assess(["my elbow itches"])
+    assert (assessment.condition, assessment.matched, assessment.ranked) == ('General Discomfort', (), ())
+
+
+@pytest.mark.parametrize('symptoms, matched', [
+    (["I have a high fever"], ('high fever',)),
+    (["high fever", "fever"], ('high fever',)),
+    (["she is vomiting blood"], ('vomiting blood',)),
+    (["a mild rash and a fever"], ('fever', 'mild rash')),
+])
+def test_symptoms_inside_longer_ones_are_not_scored_twice(scorer, symptoms, matched):
+    assert scorer.assess(symptoms).matched == matched
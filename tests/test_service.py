@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from mediguard.cache import AssessmentCache
+from mediguard.engine import MediGuardAI
+from mediguard.kb import KnowledgeBase
+from mediguard.service import MAX_BODY_BYTES, MAX_HEADERS, MAX_LINE_BYTES, MicroBatcher, TriageService
+
+
+class RecordingAudit:
+    def __init__(self):
+        self.records = []
+
+    def record(self, kind, **fields):
+        self.records.append((kind, fields))
+
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    knowledge_base = KnowledgeBase(snapshot_dir=str(tmp_path_factory.mktemp('snapshots')))
+    return MediGuardAI(AssessmentCache(0), knowledge_base)
+
+
+def run_service(service, scenario):
+    async def main():
+        service.assess_batcher.start()
+        service.chat_batcher.start()
+        try:
+            return await scenario()
+        finally:
+            await service.assess_batcher.stop()
+            await service.chat_batcher.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_are_batched(engine):
+    audit = RecordingAudit()
+    service = TriageService(engine, max_batch=4, max_wait=0.05, audit=audit)
+    bodies = [json.dumps({'symptoms': ["cough"] if i % 2 else "chest pain"}).encode() for i in range(8)]
+
+    async def scenario():
+        return await asyncio.gather(*(service.dispatch('POST', '/assess', body) for body in bodies))
+
+    responses = run_service(service, scenario)
+    assert [status for status, _ in responses] == [200] * 8
+    assert [payload['risk_level'] for _, payload in responses[:2]] == ['high_risk', 'low_risk']
+    assert (service.assess_batcher.batches, service.assess_batcher.items) == (2, 8)
+    assert [kind for kind, _ in audit.records] == ['assessment'] * 8
+    assert {fields['knowledge_version'] for _, fields in audit.records} == {engine.knowledge.version}
+
+
+def test_chat_replies_are_deterministic_per_seed(engine):
+    service = TriageService(engine)
+
+    async def scenario():
+        body = json.dumps({'message': "hello", 'seed': 7}).encode()
+        return await asyncio.gather(service.dispatch('POST', '/chat', body), service.dispatch('POST', '/chat', body))
+
+    first, second = run_service(service, scenario)
+    assert first == second and first[0] == 200
+
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('GET', '/nope', b'', 404),
+    ('GET', '/assess', b'', 405),
+    ('POST', '/assess', b'{', 400),
+    ('POST', '/assess', b'[]', 400),
+    ('POST', '/assess', b'{"symptoms": [1]}', 400),
+    ('POST', '/assess', b'{"symptoms": ["cough"], "top_k": 0}', 400),
+    ('POST', '/assess', b'{"symptoms": ["cough"], "gender": 1}', 400),
+    ('POST', '/chat', b'{"message": 3}', 400),
+    ('POST', '/chat', b'{"message": "hi", "seed": true}', 400),
+])
+def test_invalid_requests_are_refused(engine, method, path, body, status):
+    service = TriageService(engine)
+    assert run_service(service, lambda: service.dispatch(method, path, body))[0] == status
+
+
+def test_batches_are_scored_off_the_event_loop():
+    threads = []
+
+    def handler(items):
+        threads.append(threading.get_ident())
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(handler)
+        batcher.start()
+        try:
+            return await batcher.submit(1)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == 1
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_a_failing_item_fails_only_its_own_request():
+    def handler(items):
+        return [ValueError(item) if item < 0 else item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch=8, max_wait=0.05)
+        batcher.start()
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(-1), batcher.submit(3),
+                                        return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    ok, failed, also_ok = asyncio.run(scenario())
+    assert (ok, also_ok) == (2, 6)
+    assert isinstance(failed, ValueError)
+
+
+async def http_exchange(port, raw):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+def test_http_round_trip(engine):
+    service = TriageService(engine)
+
+    async def scenario():
+        ready = asyncio.get_running_loop().create_future()
+        server_task = asyncio.create_task(service.serve('127.0.0.1', 0, ready.set_result))
+        server = await ready
+        port = server.sockets[0].getsockname()[1]
+        body = b'{"symptoms": ["runny nose", "sneezing"]}'
+        try:
+            kept_alive = await http_exchange(port, (
+                b"POST /assess HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s"
+                b"GET /healthz HTTP/1.1\r\nConnection: close\r\n\r\n") % (len(body), body))
+            too_large = await http_exchange(
+                port, b"POST /assess HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY_BYTES + 1))
+            malformed = await http_exchange(port, b"nonsense\r\n\r\n")
+            long_line = await http_exchange(port, b"GET /" + b"a" * MAX_LINE_BYTES + b" HTTP/1.1\r\n\r\n")
+            long_header = await http_exchange(
+                port, b"GET /healthz HTTP/1.1\r\nX-Big: " + b"a" * MAX_LINE_BYTES + b"\r\n\r\n")
+            many_headers = await http_exchange(
+                port, b"GET /healthz HTTP/1.1\r\n" + b"X-A: 1\r\n" * (MAX_HEADERS + 1) + b"\r\n")
+            enough_headers = await http_exchange(
+                port, b"GET /healthz HTTP/1.1\r\n" + b"X-A: 1\r\n" * (MAX_HEADERS - 1) + b"Connection: close\r\n\r\n")
+        finally:
+            server_task.cancel()
+            await asyncio.gather(server_task, return_exceptions=True)
+        return kept_alive, too_large, malformed, long_line, long_header, many_headers, enough_headers
+
+    kept_alive, too_large, malformed, long_line, long_header, many_headers, enough_headers = asyncio.run(scenario())
+    assert kept_alive.count(b"HTTP/1.1 200 OK") == 2
+    assert b'"condition": "Common Cold"' in kept_alive and b'"knowledge_version"' in kept_alive
+    assert too_large.startswith(b"HTTP/1.1 413 ")
+    assert malformed.startswith(b"HTTP/1.1 400 ")
+    assert long_line.startswith(b"HTTP/1.1 400 ")
+    assert long_header.startswith(b"HTTP/1.1 431 ")
+    assert many_headers.startswith(b"HTTP/1.1 431 ")
+    assert enough_headers.startswith(b"HTTP/1.1 200 ")
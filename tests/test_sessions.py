@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+
+from mediguard.sessions import SessionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return SessionManager(str(tmp_path), budget=50_000, min_idle=0)
+
+
+def fill(manager, session_id, size):
+    with manager.session(session_id) as data:
+        data['history'] = [f"{i:0100d}" for i in range(size // 150)]
+
+
+def test_cold_sessions_spill_and_restore_intact(manager, tmp_path):
+    fill(manager, 'a1', 30_000)
+    with manager.session('a1') as data:
+        data['cursor'] = 7
+    fill(manager, 'b2', 30_000)
+
+    stats = manager.stats()
+    assert (stats.spills, stats.spilled) == (1, 1)
+    assert stats.resident_bytes <= manager.budget
+    assert os.path.exists(tmp_path / 'a1.session')
+    assert not manager.session_stats('a1').resident
+
+    with manager.session('a1') as data:
+        assert data['cursor'] == 7 and len(data['history']) == 200
+    assert not os.path.exists(tmp_path / 'a1.session')
+    assert manager.session_stats('a1').restores == 1
+
+
+def test_sessions_in_a_run_or_recently_used_stay_resident(manager, tmp_path):
+    fill(manager, 'a1', 30_000)
+    manager.checkout('a1')
+    fill(manager, 'b2', 30_000)
+    # Only b2 may go while a1 is checked out
+    assert manager.session_stats('a1').resident and not manager.session_stats('b2').resident
+    manager.checkin('a1')
+
+    recent = SessionManager(str(tmp_path / 'recent'), budget=10_000, min_idle=60)
+    fill(recent, 'a1', 30_000)
+    assert recent.stats().spills == 0
+
+
+def test_unclaimed_spill_files_expire(manager, tmp_path):
+    fill(manager, 'a1', 30_000)
+    fill(manager, 'b2', 30_000)
+    path = tmp_path / 'a1.session'
+    old = time.time() - manager.max_age - 10
+    os.utime(path, (old, old))
+    assert manager.expire() == 1
+    assert not path.exists() and manager.session_stats('a1') is None
+    with manager.session('a1') as data:
+        assert data == {}
+
+
+def test_discard_forgets_a_session(manager, tmp_path):
+    fill(manager, 'a1', 30_000)
+    fill(manager, 'b2', 30_000)
+    manager.discard('a1')
+    manager.discard('b2')
+    assert manager.stats().sessions == 0 and manager.resident_bytes == 0
+    assert not os.listdir(tmp_path)
+
+
+def test_session_ids_cannot_escape_the_directory(manager):
+    with pytest.raises(ValueError):
+        manager._path('../etc/passwd')
+
+
+def test_sessions_idle_past_the_ttl_are_spilled_on_the_next_sweep(tmp_path):
+    manager = SessionManager(str(tmp_path), budget=1 << 30, min_idle=60, idle_ttl=0.05)
+    fill(manager, 'a1', 30_000)
+    time.sleep(0.1)
+    # Checking another session in runs the sweep; a1's tab is gone
+    fill(manager, 'b2', 30_000)
+    assert not manager.session_stats('a1').resident
+    assert manager.session_stats('b2').resident
+    assert manager.stats().evicted == 1
+
+    with manager.session('a1') as data:
+        assert len(data['history']) == 200
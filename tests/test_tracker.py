@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+from mediguard.tracker import SymptomStore
+
+TODAY = datetime.date.today()
+
+
+def days_ago(days):
+    return TODAY - datetime.timedelta(days=days)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SymptomStore(str(tmp_path / 'tracker.db'), batch_size=4, flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_pages_run_newest_first_across_buffered_and_written_entries(store):
+    for day in range(10):
+        store.add('alice', f"symptom {day}", 'Mild', days_ago(day))
+    store.add('bob', 'Cough', 'Mild', TODAY)
+
+    seen, before = [], None
+    while True:
+        page = store.entries('alice', limit=3, before=before)
+        if not page:
+            break
+        seen.extend(entry['symptom'] for entry in page)
+        before = page[-1]['cursor']
+    assert seen == [f"symptom {day}" for day in range(10)]
+    assert store.count('alice') == 10
+    assert store.count('alice', start=days_ago(2), end=TODAY) == 3
+    assert [entry['date'] for entry in store.entries('alice', start=days_ago(1))] == [
+        TODAY.isoformat(), days_ago(1).isoformat()]
+
+
+def test_entries_after_sees_writes_before_and_after_the_flush(store):
+    store.add('alice', 'Cough', 'Mild', TODAY)
+    [(first_id, *_)] = store.entries_after('alice')
+    store.add('alice', 'Fever', 'Severe', TODAY)
+    assert [row[2] for row in store.entries_after('alice', first_id)] == ['Fever']
+    store.flush()
+    assert [row[2] for row in store.entries_after('alice', first_id)] == ['Fever']
+    assert [row[2] for row in store.entries_after('alice', limit=1)] == ['Cough']
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / 'tracker.db')
+    store = SymptomStore(path, flush_interval=60)
+    store.add('alice', 'Cough', 'Mild', TODAY)
+    store.add_many('alice', [(days_ago(1), 'Rash', 'Medium')])
+    store.close()
+
+    reopened = SymptomStore(path)
+    assert [row[1:] for row in reopened.entries_after('alice')] == [
+        (TODAY.isoformat(), 'Cough', 'Mild'), (days_ago(1).isoformat(), 'Rash', 'Medium')]
+    reopened.close()
+
+
+def test_ids_stay_stable_when_another_writer_shares_the_database(tmp_path):
+    path = str(tmp_path / 'tracker.db')
+    first, second = SymptomStore(path, flush_interval=60), SymptomStore(path, flush_interval=60)
+    first.add('alice', 'Cough', 'Mild', TODAY)
+    second.add('bob', 'Fever', 'Mild', TODAY)
+    bob_ids = [row[0] for row in second.entries_after('bob')]
+    first.add('alice', 'Rash', 'Mild', TODAY)
+    alice_ids = [row[0] for row in first.entries_after('alice')]
+    second.close()
+    first.close()
+
+    reopened = SymptomStore(path)
+    assert [row[0] for row in reopened.entries_after('bob')] == bob_ids
+    assert [row[0] for row in reopened.entries_after('alice')] == alice_ids
+    assert not set(bob_ids) & set(alice_ids)
+    reopened.close()
+
+
+def test_profiles_are_salted_per_name(store, tmp_path):
+    passphrase = "correct horse battery"
+    alice = store.profile_user_id("Alice", passphrase)
+    assert alice == store.profile_user_id("  alice ", passphrase)
+    assert alice.startswith('p-') and "alice" not in alice
+    # Another name with the same passphrase is a different profile
+    assert store.profile_user_id("Bob", passphrase) != alice
+    assert store.profile_user_id("Alice", passphrase + "!") != alice
+
+    # The salt is persistent, and separate databases salt independently
+    store.close()
+    reopened = SymptomStore(store.path)
+    assert reopened.profile_user_id("Alice", passphrase) == alice
+    reopened.close()
+    other = SymptomStore(str(tmp_path / 'other.db'))
+    assert other.profile_user_id("Alice", passphrase) != alice
+    other.close()